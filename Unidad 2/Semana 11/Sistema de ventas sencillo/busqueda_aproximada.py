@@ -0,0 +1,147 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - BÚSQUEDA APROXIMADA
+Este archivo contiene la distancia de edición (Levenshtein) y la clase ArbolBK, un índice
+métrico que encuentra nombres parecidos sin comparar la consulta contra todos los productos.
+"""
+
+
+def levenshtein(a: str, b: str) -> int:
+    """
+    Calcula la distancia de edición entre dos textos (inserciones, borrados y sustituciones).
+    Usa el algoritmo de vectores de bits de Myers/Hyyrö: cada columna de la tabla de
+    programación dinámica se representa con enteros, así el costo es O(len(a)) operaciones
+    sobre enteros en lugar de O(len(a) * len(b)) comparaciones.
+
+    Args:
+        a (str): Primer texto
+        b (str): Segundo texto
+
+    Returns:
+        int: Número mínimo de ediciones para transformar a en b
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if not m:
+        return len(a)
+
+    # Máscara de posiciones de cada carácter del texto más corto
+    posiciones = {}
+    for i, caracter in enumerate(b):
+        posiciones[caracter] = posiciones.get(caracter, 0) | (1 << i)
+
+    todos = (1 << m) - 1
+    ultimo = 1 << (m - 1)
+    vp, vn, distancia = todos, 0, m  # Diferencias verticales positivas/negativas
+    for caracter in a:
+        eq = posiciones.get(caracter, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & todos)
+        hn = vp & xh
+        if hp & ultimo:
+            distancia += 1
+        elif hn & ultimo:
+            distancia -= 1
+        hp = ((hp << 1) | 1) & todos
+        hn = (hn << 1) & todos
+        vp = hn | (~(xv | hp) & todos)
+        vn = hp & xv
+    return distancia
+
+
+class ArbolBK:
+    """
+    Árbol BK (Burkhard-Keller) sobre claves de texto.
+    Cada nodo guarda una clave, los IDs que la usan y sus hijos indexados por distancia.
+    Por la desigualdad triangular, al buscar con tolerancia t desde un nodo a distancia d
+    solo hace falta visitar los hijos con distancia entre d - t y d + t.
+    """
+
+    def __init__(self):
+        """Constructor de la clase ArbolBK (árbol vacío)."""
+        self._raiz = None  # Nodo: [clave, conjunto de IDs, {distancia: nodo hijo}]
+        self._total = 0
+
+    def insertar(self, clave: str, id):
+        """
+        Agrega un ID bajo la clave indicada.
+
+        Args:
+            clave (str): Texto normalizado
+            id: Identificador asociado
+        """
+        self._total += 1
+        if self._raiz is None:
+            self._raiz = [clave, {id}, {}]
+            return
+
+        nodo = self._raiz
+        while True:
+            distancia = levenshtein(clave, nodo[0])
+            if distancia == 0:
+                nodo[1].add(id)
+                return
+            hijo = nodo[2].get(distancia)
+            if hijo is None:
+                nodo[2][distancia] = [clave, {id}, {}]
+                return
+            nodo = hijo
+
+    def eliminar(self, clave: str, id) -> bool:
+        """
+        Quita un ID de la clave indicada. El nodo se conserva (sin IDs) para no
+        reorganizar el árbol; simplemente deja de aparecer en los resultados.
+
+        Args:
+            clave (str): Texto normalizado con el que se insertó
+            id: Identificador a quitar
+
+        Returns:
+            bool: True si el ID estaba en el árbol
+        """
+        nodo = self._raiz
+        while nodo is not None:
+            distancia = levenshtein(clave, nodo[0])
+            if distancia == 0:
+                if id in nodo[1]:
+                    nodo[1].discard(id)
+                    self._total -= 1
+                    return True
+                return False
+            nodo = nodo[2].get(distancia)
+        return False
+
+    def buscar(self, clave: str, max_distancia: int) -> list:
+        """
+        Busca las claves a distancia menor o igual a max_distancia.
+
+        Args:
+            clave (str): Texto normalizado a buscar
+            max_distancia (int): Distancia de edición máxima admitida
+
+        Returns:
+            list: Tuplas (distancia, clave, id) ordenadas por distancia y luego por clave
+        """
+        if self._raiz is None:
+            return []
+
+        resultados = []
+        pendientes = [self._raiz]
+        while pendientes:
+            nodo = pendientes.pop()
+            distancia = levenshtein(clave, nodo[0])
+            if distancia <= max_distancia:
+                resultados.extend((distancia, nodo[0], id) for id in nodo[1])
+            for distancia_hijo, hijo in nodo[2].items():
+                if distancia - max_distancia <= distancia_hijo <= distancia + max_distancia:
+                    pendientes.append(hijo)
+
+        resultados.sort(key=lambda r: (r[0], r[1], str(r[2])))
+        return resultados
+
+    def __len__(self) -> int:
+        """Devuelve la cantidad de IDs indexados"""
+        return self._total
@@ -0,0 +1,83 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - CANDADOS
+Este archivo contiene el candado de lectura/escritura usado por Inventario en modo concurrente
+y un candado nulo con la misma interfaz para el modo de un solo hilo.
+"""
+
+import threading  # Para la variable de condición
+from contextlib import contextmanager, nullcontext
+
+
+class CandadoLecturaEscritura:
+    """
+    Candado que permite varios lectores simultáneos o un único escritor.
+    Da preferencia a los escritores: si uno está esperando, los nuevos lectores aguardan,
+    así una lectura continua no puede bloquear las escrituras indefinidamente.
+    No es reentrante: un hilo no debe pedir el candado mientras ya lo tiene.
+    """
+
+    def __init__(self):
+        """Constructor de la clase CandadoLecturaEscritura."""
+        self._condicion = threading.Condition(threading.Lock())
+        self._lectores = 0  # Lectores que tienen el candado
+        self._escribiendo = False  # True si un escritor tiene el candado
+        self._escritores_esperando = 0
+
+    def adquirir_lectura(self):
+        """Bloquea hasta obtener acceso compartido"""
+        with self._condicion:
+            while self._escribiendo or self._escritores_esperando:
+                self._condicion.wait()
+            self._lectores += 1
+
+    def liberar_lectura(self):
+        """Libera el acceso compartido"""
+        with self._condicion:
+            self._lectores -= 1
+            if self._lectores == 0:
+                self._condicion.notify_all()
+
+    def adquirir_escritura(self):
+        """Bloquea hasta obtener acceso exclusivo"""
+        with self._condicion:
+            self._escritores_esperando += 1
+            while self._escribiendo or self._lectores:
+                self._condicion.wait()
+            self._escritores_esperando -= 1
+            self._escribiendo = True
+
+    def liberar_escritura(self):
+        """Libera el acceso exclusivo"""
+        with self._condicion:
+            self._escribiendo = False
+            self._condicion.notify_all()
+
+    @contextmanager
+    def lectura(self):
+        """Uso: with candado.lectura(): ..."""
+        self.adquirir_lectura()
+        try:
+            yield
+        finally:
+            self.liberar_lectura()
+
+    @contextmanager
+    def escritura(self):
+        """Uso: with candado.escritura(): ..."""
+        self.adquirir_escritura()
+        try:
+            yield
+        finally:
+            self.liberar_escritura()
+
+
+class CandadoNulo:
+    """
+    Candado que no bloquea nada. Se usa cuando el inventario trabaja en un solo hilo.
+    """
+
+    def lectura(self):
+        return nullcontext()
+
+    def escritura(self):
+        return nullcontext()
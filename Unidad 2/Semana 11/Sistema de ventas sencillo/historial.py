@@ -0,0 +1,435 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - HISTORIALES
+Este archivo contiene las clases SerieTemporal e HistorialValores, que registran cada cambio
+de un valor numérico (cantidad, precio, valoración) en series de solo-anexado respaldadas por
+arreglos compactos y persistidas en un archivo binario con marcas de tiempo y valores
+codificados por diferencias.
+
+Formato del archivo (secuencia de registros):
+    0x00 varint(marca_absoluta)                          -> inicio de sesión de escritura
+    0x01 varint(id) varint(Δmarca) varint(Δvalor)        -> cambio de valor
+Los enteros con signo usan codificación zigzag. Δmarca es respecto del registro anterior
+de la sesión y Δvalor respecto del último valor escrito para ese producto en la sesión.
+Los valores se guardan como enteros multiplicados por la escala del historial
+(1 para cantidades, 10000 para precios con cuatro decimales).
+Si el programa se corta a mitad de una escritura, el registro incompleto del final se
+descarta (y se recorta del archivo) al leerlo o antes de volver a escribir.
+"""
+
+import array  # Arreglos compactos de enteros de 64 bits
+import bisect  # Búsqueda binaria sobre las marcas de tiempo
+import os  # Para comprobar si el archivo ya tiene registros
+import threading  # Las ventas registran cambios desde varios hilos
+import time  # Para la marca de tiempo de cada cambio
+from datetime import datetime
+
+INICIO_SESION = 0
+CAMBIO = 1
+
+
+def _a_segundos(instante) -> int:
+    """Convierte un datetime o un número (segundos desde epoch) a segundos enteros"""
+    if isinstance(instante, datetime):
+        return int(instante.timestamp())
+    return int(instante)
+
+
+def _escribir_varint(destino: bytearray, valor: int):
+    """Anexa un entero con signo en codificación zigzag + varint"""
+    valor = (valor << 1) ^ (valor >> 63)  # zigzag: los negativos pequeños también ocupan poco
+    while valor >= 0x80:
+        destino.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    destino.append(valor)
+
+
+def _leer_varint(datos: bytes, posicion: int) -> tuple:
+    """Lee un entero zigzag + varint; devuelve (valor, nueva posición)"""
+    resultado = desplazamiento = 0
+    while True:
+        byte = datos[posicion]
+        posicion += 1
+        resultado |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            break
+        desplazamiento += 7
+    return (resultado >> 1) ^ -(resultado & 1), posicion
+
+
+def _recorrer(datos: bytes, series: dict = None) -> tuple:
+    """
+    Recorre los registros completos de un historial.
+
+    Args:
+        datos (bytes): Contenido del archivo
+        series (dict, optional): {id: SerieTemporal} donde anexar los cambios leídos
+
+    Returns:
+        tuple: (posición donde termina el último registro completo, marca más reciente o None)
+    """
+    posicion, marca, valores = 0, 0, {}
+    maxima = None
+    while posicion < len(datos):
+        inicio = posicion
+        tipo = datos[posicion]
+        try:
+            if tipo == INICIO_SESION:
+                marca, posicion = _leer_varint(datos, posicion + 1)
+                valores = {}
+                continue
+            if tipo != CAMBIO:
+                return inicio, maxima  # Byte desconocido: lo que sigue está dañado
+            id, posicion = _leer_varint(datos, posicion + 1)
+            delta_marca, posicion = _leer_varint(datos, posicion)
+            delta_valor, posicion = _leer_varint(datos, posicion)
+        except IndexError:
+            return inicio, maxima  # Registro cortado a mitad de escritura
+        marca += delta_marca
+        maxima = marca if maxima is None else max(maxima, marca)
+        valores[id] = valores.get(id, 0) + delta_valor
+        if series is not None:
+            series.setdefault(id, SerieTemporal()).anexar(marca, valores[id])
+    return posicion, maxima
+
+
+class SerieTemporal:
+    """
+    Serie de (marca de tiempo, valor) de solo-anexado, guardada en dos arreglos paralelos.
+    Las marcas nunca retroceden, por eso las consultas por rango usan búsqueda binaria.
+    """
+
+    __slots__ = ('marcas', 'valores')
+
+    def __init__(self):
+        """Constructor de la clase SerieTemporal (serie vacía)."""
+        self.marcas = array.array('q')
+        self.valores = array.array('q')
+
+    def anexar(self, marca: int, valor: int):
+        """Agrega un punto; si el reloj retrocedió se conserva la última marca"""
+        if self.marcas and marca < self.marcas[-1]:
+            marca = self.marcas[-1]
+        self.marcas.append(marca)
+        self.valores.append(valor)
+
+    def rango(self, desde: int, hasta: int) -> list:
+        """Devuelve los puntos con desde <= marca <= hasta en O(log n + k)"""
+        inicio = bisect.bisect_left(self.marcas, desde)
+        fin = bisect.bisect_right(self.marcas, hasta)
+        return list(zip(self.marcas[inicio:fin], self.valores[inicio:fin]))
+
+    def valor_en(self, instante: int):
+        """Devuelve el último valor registrado en o antes del instante (None si no hay)"""
+        indice = bisect.bisect_right(self.marcas, instante)
+        return self.valores[indice - 1] if indice else None
+
+    def punto_en(self, instante: int):
+        """Devuelve el último punto (marca, valor) en o antes del instante (None si no hay)"""
+        indice = bisect.bisect_right(self.marcas, instante)
+        return (self.marcas[indice - 1], self.valores[indice - 1]) if indice else None
+
+    def suma(self, desde: int, hasta: int) -> int:
+        """Suma los valores con desde <= marca <= hasta en O(log n + k)"""
+        inicio = bisect.bisect_left(self.marcas, desde)
+        fin = bisect.bisect_right(self.marcas, hasta)
+        return sum(self.valores[inicio:fin])
+
+    def quitar_ultimo(self):
+        """Quita el último punto (un cambio que se revirtió antes de guardarse)"""
+        self.marcas.pop()
+        self.valores.pop()
+
+    def __len__(self) -> int:
+        return len(self.marcas)
+
+
+class HistorialValores:
+    """
+    Clase que guarda el historial de un valor numérico para muchos productos.
+    Escribir no requiere cargar las series: se cargan recién en la primera consulta.
+    Antes de la primera escritura de la sesión el archivo se recorre una vez para
+    descartar un registro final incompleto.
+    """
+
+    def __init__(self, archivo: str, escala: int = 1):
+        """
+        Constructor de la clase HistorialValores.
+
+        Args:
+            archivo (str): Ruta del archivo binario del historial
+            escala (int, optional): Factor para guardar valores decimales como enteros. Default: 1
+        """
+        self._archivo = archivo
+        self._escala = escala
+        self._series = None  # {id: SerieTemporal}, se carga en la primera consulta
+        self._pendiente = []  # Puntos (id, marca, valor) aún no escritos al archivo
+        self._revisado = False  # True cuando ya se descartó un posible registro incompleto
+        self._marca_archivo = None  # Marca más reciente leída del archivo
+        self._ultima_marca = None  # Última marca escrita en esta sesión
+        self._ultimos_valores = {}  # Último valor escrito en esta sesión por producto
+        self._candado = threading.Lock()
+
+    def registrar(self, id: int, valor, instante=None):
+        """
+        Registra el valor de un producto en el instante indicado.
+
+        Args:
+            id (int): ID del producto
+            valor (int | float): Nuevo valor
+            instante (optional): datetime o segundos desde epoch. Default: ahora
+        """
+        marca = _a_segundos(instante if instante is not None else time.time())
+        cantidad = round(valor * self._escala)
+        with self._candado:
+            self._pendiente.append((id, marca, cantidad))
+            if self._series is not None:
+                self._series.setdefault(id, SerieTemporal()).anexar(marca, cantidad)
+
+    def ultima_marca(self):
+        """
+        Devuelve la marca más reciente registrada, en el archivo o pendiente de escribir.
+        Si el archivo aún no se recorrió en esta sesión, lo recorre (igual que la primera escritura).
+
+        Returns:
+            int: Segundos desde epoch, o None si el historial está vacío
+        """
+        with self._candado:
+            if not self._revisado:
+                try:
+                    self._leer_archivo()
+                except OSError:
+                    pass  # Sin archivo legible solo cuentan los puntos de esta sesión
+            marcas = [marca for _, marca, _ in self._pendiente]
+            marcas += [marca for marca in (self._marca_archivo, self._ultima_marca) if marca is not None]
+            return max(marcas) if marcas else None
+
+    def vacio(self) -> bool:
+        """True si el historial aún no tiene ningún registro (ni en el archivo ni pendiente)"""
+        with self._candado:
+            if self._pendiente or (self._series is not None and self._series):
+                return False
+        try:
+            return os.path.getsize(self._archivo) == 0
+        except OSError:
+            return True  # El archivo todavía no existe
+
+    def descartar(self, id: int, valor) -> bool:
+        """
+        Quita el último punto registrado de un producto si aún no se escribió al archivo
+        y tiene el valor indicado. Sirve para deshacer un cambio que no llegó a guardarse
+        sin dejar en el historial un punto de ida y otro de vuelta.
+
+        Args:
+            id (int): ID del producto
+            valor (int | float): Valor del punto a quitar
+
+        Returns:
+            bool: True si se quitó; False si ya se escribió o hubo otro cambio después
+        """
+        cantidad = round(valor * self._escala)
+        with self._candado:
+            for indice in range(len(self._pendiente) - 1, -1, -1):
+                if self._pendiente[indice][0] == id:
+                    break
+            else:
+                return False
+            if self._pendiente[indice][2] != cantidad:
+                return False
+            del self._pendiente[indice]
+            if self._series is not None:
+                self._series[id].quitar_ultimo()
+            return True
+
+    def _codificar_pendiente(self) -> tuple:
+        """
+        Codifica los puntos pendientes a continuación de lo ya escrito en la sesión.
+
+        Returns:
+            tuple: (bytes, última marca, {id: último valor}) para confirmar si la escritura funciona
+        """
+        datos = bytearray()
+        ultima_marca = self._ultima_marca
+        valores = {}
+        for id, marca, valor in self._pendiente:
+            if ultima_marca is None:
+                datos.append(INICIO_SESION)
+                _escribir_varint(datos, marca)
+                ultima_marca = marca
+            datos.append(CAMBIO)
+            _escribir_varint(datos, id)
+            _escribir_varint(datos, marca - ultima_marca)
+            _escribir_varint(datos, valor - valores.get(id, self._ultimos_valores.get(id, 0)))
+            ultima_marca = marca
+            valores[id] = valor
+        return datos, ultima_marca, valores
+
+    def vaciar(self) -> bool:
+        """
+        Anexa al archivo los registros pendientes.
+
+        Returns:
+            bool: True si se escribió correctamente (o no había nada pendiente)
+        """
+        with self._candado:
+            if not self._pendiente:
+                return True
+            try:
+                if not self._revisado:
+                    self._leer_archivo()
+                datos, ultima_marca, valores = self._codificar_pendiente()
+                with open(self._archivo, 'ab') as f:
+                    tamano = f.tell()
+                    try:
+                        f.write(datos)
+                        f.flush()
+                    except OSError:
+                        f.truncate(tamano)  # No dejar un registro a medias para la próxima escritura
+                        raise
+            except OSError as e:
+                print(f"❌ Error al guardar el historial: {e}")
+                return False
+            self._pendiente = []
+            self._ultima_marca = ultima_marca
+            self._ultimos_valores.update(valores)
+            return True
+
+    def _leer_archivo(self, series: dict = None):
+        """
+        Recorre el archivo y recorta un registro final incompleto.
+        Debe llamarse con el candado tomado.
+
+        Args:
+            series (dict, optional): {id: SerieTemporal} donde anexar los cambios leídos
+        """
+        try:
+            with open(self._archivo, 'rb') as f:
+                datos = f.read()
+        except FileNotFoundError:
+            datos = b''
+        fin, self._marca_archivo = _recorrer(datos, series)
+        if fin < len(datos):
+            print(f"⚠️ Historial {self._archivo}: se descartaron {len(datos) - fin} bytes incompletos al final")
+            with open(self._archivo, 'r+b') as f:
+                f.truncate(fin)
+        self._revisado = True
+
+    def _cargar(self):
+        """Reconstruye las series desde el archivo. Debe llamarse con el candado tomado."""
+        series = {}
+        try:
+            self._leer_archivo(series)
+        except OSError as e:
+            print(f"❌ Error al leer el historial: {e}")
+        for id, marca, valor in self._pendiente:
+            series.setdefault(id, SerieTemporal()).anexar(marca, valor)
+        self._series = series
+
+    def _serie(self, id: int) -> SerieTemporal:
+        """Devuelve la serie de un producto (cargando el archivo si hace falta)"""
+        with self._candado:
+            if self._series is None:
+                self._cargar()
+            return self._series.get(id)
+
+    def _desescalar(self, valor):
+        """Convierte un entero guardado al valor original"""
+        if valor is None or self._escala == 1:
+            return valor
+        return valor / self._escala
+
+    def valor_en(self, id: int, instante):
+        """
+        Devuelve el valor vigente de un producto en un instante (búsqueda binaria).
+
+        Args:
+            id (int): ID del producto
+            instante: datetime o segundos desde epoch
+
+        Returns:
+            int | float: Último valor registrado en o antes del instante, o None
+        """
+        serie = self._serie(id)
+        if serie is None:
+            return None
+        with self._candado:
+            return self._desescalar(serie.valor_en(_a_segundos(instante)))
+
+    def punto_en(self, id: int, instante):
+        """
+        Devuelve el último punto registrado de un producto en o antes de un instante.
+
+        Args:
+            id (int): ID del producto
+            instante: datetime o segundos desde epoch
+
+        Returns:
+            tuple: (segundos desde epoch, valor) o None si no hay puntos anteriores
+        """
+        serie = self._serie(id)
+        if serie is None:
+            return None
+        with self._candado:
+            punto = serie.punto_en(_a_segundos(instante))
+        return (punto[0], self._desescalar(punto[1])) if punto else None
+
+    def suma(self, id: int, desde, hasta):
+        """
+        Suma los valores registrados de un producto dentro del rango (ambos extremos incluidos).
+        La suma se hace con los enteros guardados, sin acumular error de redondeo.
+
+        Args:
+            id (int): ID del producto
+            desde: datetime o segundos desde epoch
+            hasta: datetime o segundos desde epoch
+
+        Returns:
+            int | float: Suma de los valores (0 si no hay puntos en el rango)
+        """
+        serie = self._serie(id)
+        if serie is None:
+            return 0
+        with self._candado:
+            return self._desescalar(serie.suma(_a_segundos(desde), _a_segundos(hasta)))
+
+    def rango(self, id: int, desde=None, hasta=None) -> list:
+        """
+        Devuelve los cambios de valor de un producto dentro del rango.
+
+        Args:
+            id (int): ID del producto
+            desde (optional): datetime o segundos desde epoch. Default: desde el inicio
+            hasta (optional): datetime o segundos desde epoch. Default: hasta ahora
+
+        Returns:
+            list: Tuplas (segundos desde epoch, valor) en orden cronológico
+        """
+        serie = self._serie(id)
+        if serie is None:
+            return []
+        with self._candado:
+            puntos = serie.rango(_a_segundos(desde) if desde is not None else -2 ** 63,
+                                 _a_segundos(hasta) if hasta is not None else 2 ** 63 - 1)
+        return [(marca, self._desescalar(valor)) for marca, valor in puntos]
+
+    def muestrear(self, id: int, desde, hasta, puntos: int = 100) -> list:
+        """
+        Reduce el historial a un número fijo de puntos equiespaciados para graficar.
+        Cada punto es el valor vigente en ese instante (el último registrado antes).
+
+        Args:
+            id (int): ID del producto
+            desde: datetime o segundos desde epoch
+            hasta: datetime o segundos desde epoch
+            puntos (int, optional): Cantidad de puntos devueltos. Default: 100
+
+        Returns:
+            list: Tuplas (segundos desde epoch, valor o None si aún no existía)
+        """
+        serie = self._serie(id)
+        desde, hasta = _a_segundos(desde), _a_segundos(hasta)
+        if serie is None or puntos < 1:
+            return []
+        paso = (hasta - desde) / max(puntos - 1, 1)
+        with self._candado:
+            instantes = [int(desde + i * paso) for i in range(puntos)]
+            return [(instante, self._desescalar(serie.valor_en(instante))) for instante in instantes]
@@ -0,0 +1,297 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - INSTANTÁNEAS DE SOLO LECTURA
+Este archivo contiene las funciones para publicar una instantánea binaria e inmutable del
+inventario y la clase LectorInstantanea, que la consulta mediante mmap sin cargarla completa.
+Varios procesos lectores comparten así las mismas páginas del archivo en memoria.
+
+Formato (little-endian):
+    Cabecera:  magia 'INVS', formato, reservado, generación, cantidad de registros,
+               valor total, inicio del bloque de nombres, inicio del bloque de claves
+    Registros: uno por producto, de tamaño fijo y ordenados por ID
+               (id, cantidad, precio, desplazamiento/largo del nombre y de la clave)
+    Nombres:   nombres originales en UTF-8 separados por '\\n'
+    Claves:    nombres normalizados separados por '\\n' (para búsquedas con mmap.find)
+
+Cada publicación escribe el contenido en un temporal y lo enlaza como '<base>.<generación>.snap'.
+El enlace falla si el nombre ya existe, así que dos publicadores (aunque sean procesos distintos)
+nunca obtienen el mismo número, y la generación vigente es siempre la más alta que hay en disco.
+"""
+
+import mmap  # Para mapear el archivo en memoria
+import os  # Para enlazar cada generación y borrar las viejas
+import struct  # Para el formato binario de tamaño fijo
+import tempfile  # Para escribir cada generación antes de publicarla
+
+from producto import Producto, normalizar_texto
+
+MAGIA = b'INVS'
+FORMATO = 1
+CABECERA = struct.Struct('<4sHHQQdQQ')
+REGISTRO = struct.Struct('<qqdQQII')
+GENERACIONES_CONSERVADAS = 2  # Generaciones anteriores que se dejan para lectores rezagados
+
+
+def ruta_generacion(ruta_base: str, generacion: int) -> str:
+    """Devuelve la ruta del archivo de una generación"""
+    return f"{ruta_base}.{generacion}.snap"
+
+
+def generaciones_publicadas(ruta_base: str) -> list:
+    """
+    Lista las generaciones que hay en disco.
+
+    Returns:
+        list: Números de generación, de menor a mayor
+    """
+    carpeta = os.path.dirname(ruta_base) or '.'
+    prefijo = os.path.basename(ruta_base) + '.'
+    generaciones = []
+    try:
+        nombres = os.listdir(carpeta)
+    except FileNotFoundError:
+        return generaciones
+    for nombre in nombres:
+        if nombre.startswith(prefijo) and nombre.endswith('.snap'):
+            numero = nombre[len(prefijo):-len('.snap')]
+            if numero.isdigit():
+                generaciones.append(int(numero))
+    return sorted(generaciones)
+
+
+def generacion_actual(ruta_base: str) -> int:
+    """
+    Devuelve el número de la generación publicada más reciente.
+
+    Returns:
+        int: Generación vigente o 0 si nunca se publicó ninguna
+    """
+    generaciones = generaciones_publicadas(ruta_base)
+    return generaciones[-1] if generaciones else 0
+
+
+def escribir_instantanea(ruta_base: str, filas: list) -> int:
+    """
+    Escribe una nueva generación de la instantánea y la publica.
+
+    Args:
+        ruta_base (str): Ruta base de los archivos de instantánea
+        filas (list): Tuplas (id, nombre, cantidad, precio); los IDs deben ser enteros
+
+    Returns:
+        int: Número de la generación publicada
+    """
+    filas = sorted(filas)
+
+    nombres = bytearray()
+    claves = bytearray()
+    registros = bytearray()
+    valor_total = 0.0
+    for id, nombre, cantidad, precio in filas:
+        nombre_bytes = nombre.replace('\n', ' ').encode('utf-8')
+        clave_bytes = normalizar_texto(nombre).encode('utf-8')
+        registros += REGISTRO.pack(id, cantidad, precio, len(nombres), len(claves),
+                                   len(nombre_bytes), len(clave_bytes))
+        nombres += nombre_bytes + b'\n'
+        claves += clave_bytes + b'\n'
+        valor_total += cantidad * precio
+
+    inicio_nombres = CABECERA.size + len(registros)
+    inicio_claves = inicio_nombres + len(nombres)
+    resto_cabecera = (len(filas), valor_total, inicio_nombres, inicio_claves)
+
+    # Escribir a un temporal y enlazarlo: un lector nunca ve un archivo a medio escribir
+    descriptor, temporal = tempfile.mkstemp(prefix=os.path.basename(ruta_base) + '.', suffix='.tmp',
+                                            dir=os.path.dirname(ruta_base) or '.')
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(bytes(CABECERA.size))  # La cabecera se escribe al elegir la generación
+            f.write(registros)
+            f.write(nombres)
+            f.write(claves)
+            generacion = generacion_actual(ruta_base) + 1
+            while True:
+                f.seek(0)
+                f.write(CABECERA.pack(MAGIA, FORMATO, 0, generacion, *resto_cabecera))
+                f.flush()
+                try:
+                    os.link(temporal, ruta_generacion(ruta_base, generacion))
+                except FileExistsError:
+                    # Otro publicador tomó el número: se prueba con el siguiente
+                    generacion = max(generacion, generacion_actual(ruta_base)) + 1
+                    continue
+                if generacion >= generacion_actual(ruta_base) - GENERACIONES_CONSERVADAS:
+                    break
+                # Mientras tanto se publicaron varias y el número era de una ya borrada
+                os.remove(ruta_generacion(ruta_base, generacion))
+                generacion = generacion_actual(ruta_base) + 1
+    finally:
+        os.remove(temporal)
+
+    # Borrar todas las generaciones anteriores a las conservadas; si un lector aún tiene
+    # abierta alguna el sistema puede impedirlo, y se vuelve a intentar en la próxima publicación
+    for vieja in generaciones_publicadas(ruta_base):
+        if vieja >= generacion - GENERACIONES_CONSERVADAS:
+            break
+        try:
+            os.remove(ruta_generacion(ruta_base, vieja))
+        except OSError:
+            pass
+
+    return generacion
+
+
+class LectorInstantanea:
+    """
+    Clase que consulta una instantánea publicada directamente sobre el archivo mapeado.
+    No deserializa el inventario: cada consulta lee solo los registros que necesita.
+    """
+
+    def __init__(self, ruta_base: str):
+        """
+        Constructor de la clase LectorInstantanea. Abre la generación vigente.
+
+        Args:
+            ruta_base (str): Ruta base usada al publicar
+
+        Raises:
+            FileNotFoundError: Si no hay ninguna instantánea publicada
+        """
+        self._ruta_base = ruta_base
+        self._archivo = None
+        self._mapa = None
+        self.generacion = 0
+        if not self.actualizar():
+            raise FileNotFoundError(f"No hay instantáneas publicadas en {ruta_base}")
+
+    def actualizar(self) -> bool:
+        """
+        Cambia a la generación más reciente si hay una nueva.
+        El cambio es atómico para este lector: las consultas usan un mapa o el otro, nunca una mezcla.
+
+        Returns:
+            bool: True si se abrió una generación nueva
+        """
+        while True:
+            generacion = generacion_actual(self._ruta_base)
+            if generacion <= self.generacion:
+                return False
+            try:
+                archivo = open(ruta_generacion(self._ruta_base, generacion), 'rb')
+                break
+            except FileNotFoundError:
+                continue  # Una publicación posterior la borró: hay otra más reciente
+
+        mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        magia, formato, _, gen, total, valor, inicio_nombres, inicio_claves = CABECERA.unpack_from(mapa, 0)
+        if magia != MAGIA or formato != FORMATO:
+            mapa.close()
+            archivo.close()
+            raise ValueError(f"Instantánea con formato inválido (formato {formato}, se espera {FORMATO})")
+
+        anterior = (self._mapa, self._archivo)
+        self._archivo, self._mapa = archivo, mapa
+        self.generacion = gen
+        self._total = total
+        self._valor_total = valor
+        self._inicio_nombres = inicio_nombres
+        self._inicio_claves = inicio_claves
+        self._fin_claves = len(mapa)
+
+        if anterior[0] is not None:
+            anterior[0].close()
+            anterior[1].close()
+        return True
+
+    def _registro(self, indice: int) -> tuple:
+        """Lee el registro en la posición indicada"""
+        return REGISTRO.unpack_from(self._mapa, CABECERA.size + indice * REGISTRO.size)
+
+    def _producto(self, registro: tuple) -> Producto:
+        """Construye un Producto a partir de un registro"""
+        id, cantidad, precio, desp_nombre, _, largo_nombre, _ = registro
+        inicio = self._inicio_nombres + desp_nombre
+        nombre = self._mapa[inicio:inicio + largo_nombre].decode('utf-8')
+        return Producto(id, nombre, cantidad, precio)
+
+    def obtener_por_id(self, id: int) -> Producto:
+        """
+        Busca un producto por ID mediante búsqueda binaria sobre los registros.
+
+        Args:
+            id (int): ID del producto
+
+        Returns:
+            Producto: El producto encontrado o None si no existe
+        """
+        bajo, alto = 0, self._total
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            registro = self._registro(medio)
+            if registro[0] < id:
+                bajo = medio + 1
+            elif registro[0] > id:
+                alto = medio
+            else:
+                return self._producto(registro)
+        return None
+
+    def _indice_por_clave(self, desplazamiento: int) -> int:
+        """Devuelve el registro cuya clave contiene el desplazamiento dado (búsqueda binaria)"""
+        bajo, alto = 0, self._total - 1
+        while bajo < alto:
+            medio = (bajo + alto + 1) // 2
+            if self._registro(medio)[4] <= desplazamiento:
+                bajo = medio
+            else:
+                alto = medio - 1
+        return bajo
+
+    def buscar_por_nombre(self, nombre: str, limite: int = None) -> list:
+        """
+        Busca productos por nombre (coincidencia parcial, insensible a mayúsculas y tildes).
+        La búsqueda recorre el bloque de claves con mmap.find, sin decodificar cada nombre.
+
+        Args:
+            nombre (str): Nombre o parte del nombre a buscar
+            limite (int, optional): Número máximo de resultados. Default: sin límite
+
+        Returns:
+            list: Productos que coinciden, en orden de ID
+        """
+        aguja = normalizar_texto(nombre).encode('utf-8')
+        if not aguja or self._total == 0:
+            return []
+
+        resultados = []
+        posicion = self._inicio_claves
+        while limite is None or len(resultados) < limite:
+            encontrado = self._mapa.find(aguja, posicion, self._fin_claves)
+            if encontrado < 0:
+                break
+            indice = self._indice_por_clave(encontrado - self._inicio_claves)
+            registro = self._registro(indice)
+            resultados.append(self._producto(registro))
+            # Continuar después de la clave de este producto (incluye el separador)
+            posicion = self._inicio_claves + registro[4] + registro[6] + 1
+        return resultados
+
+    def valor_total(self) -> float:
+        """Devuelve la valoración total precalculada al publicar"""
+        return self._valor_total
+
+    def __len__(self) -> int:
+        """Devuelve la cantidad de productos de la instantánea"""
+        return self._total
+
+    def cerrar(self):
+        """Libera el mapa de memoria y el archivo"""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._archivo.close()
+            self._mapa = self._archivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.cerrar()
@@ -4,33 +4,192 @@ Este archivo contiene la clase Inventario que gestiona los productos con persist
 Utiliza un diccionario para acceso rápido a los productos por ID.
 """
 
-from producto import Producto
-import json  # Para trabajar con archivos JSON
+from producto import Producto, normalizar_texto
+from candados import CandadoLecturaEscritura, CandadoNulo
+from historial import HistorialValores
+import itertools  # Para numerar las instantáneas guardadas
 import os  # Para operaciones del sistema de archivos
+import struct  # Formato binario de la caché
+import time  # Para medir la duración de la carga
+import threading  # Para serializar las escrituras al archivo
+from contextlib import contextmanager  # Para el modo de operaciones agrupadas
+
+
+class ConflictoVersion(ValueError):
+    """
+    Se lanza cuando se intenta actualizar un producto con una versión desactualizada,
+    es decir, otro usuario lo modificó después de que se leyó.
+    """
+
+    def __init__(self, id: int, version_esperada: int, version_actual: int):
+        super().__init__(f"El producto con ID {id} fue modificado por otro usuario "
+                         f"(versión esperada {version_esperada}, actual {version_actual})")
+        self.id = id
+        self.version_esperada = version_esperada
+        self.version_actual = version_actual
+
+
+# Caché binaria del JSON: cabecera y, por producto, un registro fijo seguido de los textos en UTF-8
+MAGICO_CACHE = b'INVC'
+FORMATO_CACHE = 1  # Incrementar al cambiar los campos guardados
+_CABECERA_CACHE = struct.Struct('<4sIqqI')  # Mágico, formato, mtime_ns y tamaño del JSON, productos
+_PRODUCTO_CACHE = struct.Struct('<qqqdHH')  # ID, versión, cantidad, precio, largo del nombre y de la clave
+
+
+def _centavos(cantidad: int, precio: float) -> int:
+    """Valor de un producto en centavos enteros (la valoración total se suma sin error de redondeo)"""
+    return round(cantidad * precio * 100)
 
 
 class Inventario:
     """
     Clase que gestiona el inventario de productos.
     Utiliza un diccionario para acceso rápido por ID y maneja persistencia en archivo JSON.
+
+    En modo concurrente las consultas comparten un candado de lectura y las modificaciones
+    toman el candado de escritura. Las ventas (descontar_stock) toman el de lectura más los
+    candados de sus productos, así ventas de productos distintos avanzan en paralelo y
+    ninguna se cruza con una modificación. Al guardar, el estado se copia bajo el candado
+    (y los de todos los productos) y se serializa fuera de él.
     """
 
-    def __init__(self, archivo: str = "inventario.json"):
+    # Claves de las series del historial de valoración
+    ID_VALORACION_TOTAL = 0  # Puntos de control: valoración total al inicio de un segundo
+    ID_CAMBIO_VALORACION = 1  # Diferencia de valoración de cada cambio
+    # Un punto de control cada tantos cambios o segundos acota lo que suma valoracion_en
+    CAMBIOS_POR_CONTROL = 256
+    SEGUNDOS_POR_CONTROL = 3600
+    # Candados de producto repartidos por ID: la memoria no crece con el catálogo
+    CANDADOS_PRODUCTO = 64
+
+    def __init__(self, archivo: str = "inventario.json", concurrente: bool = False):
         """
         Constructor de la clase Inventario.
 
         Args:
             archivo (str, optional): Ruta del archivo de almacenamiento. Default: "inventario.json"
+            concurrente (bool, optional): Protege el inventario para uso desde varios hilos. Default: False
         """
-        self._productos = {}  # Diccionario para acceso rápido por ID: {id: Producto}
+        self._datos = None  # {id: Producto}, se carga del archivo en el primer acceso
+        self._candado_carga = threading.Lock()  # Un solo hilo realiza la carga diferida
+        self.perfil_carga = None  # (origen, segundos) de la última carga, para --perfil-arranque
         self._archivo = archivo  # Ruta del archivo de almacenamiento
-        self._cargar_desde_archivo()  # Carga automática al inicializar
+        self._archivo_cache = os.path.splitext(archivo)[0] + ".cache"  # Copia binaria del JSON, a su lado
+        self._candado = CandadoLecturaEscritura() if concurrente else CandadoNulo()
+        self._candados_producto = [threading.Lock() for _ in range(self.CANDADOS_PRODUCTO)] if concurrente else []
+        self._candado_archivo = threading.Lock()  # Una sola escritura al archivo a la vez
+        self._versiones = itertools.count(1)  # Número de cada instantánea tomada
+        self._version_escrita = 0  # Última instantánea escrita en el archivo
+        self._arbol_bk = None  # Índice de búsqueda aproximada, se construye al primer uso
+        # Historiales junto al archivo de datos (inventario.json -> inventario.historial, ...)
+        base = os.path.splitext(archivo)[0]
+        self._historial = HistorialValores(base + ".historial")  # Cantidades
+        self._historial_precios = HistorialValores(base + ".precios", escala=10000)
+        self._historial_valoracion = HistorialValores(base + ".valoracion", escala=100)
+        self._valor_centavos = 0  # Valoración total en centavos, mantenida en cada cambio
+        self._marca_valoracion = 0  # Marca del último registro de valoración
+        self._marca_control = 0  # Marca del último punto de control
+        self._cambios_desde_control = 0  # Cambios registrados desde el último punto de control
+        self._candado_valoracion = threading.Lock()
+        self._en_lote = False  # True mientras se agrupan operaciones (guardado diferido)
+        self._cambios_pendientes = False  # Hay cambios sin guardar dentro del lote
+        self._silencioso = False  # Si es True no se imprimen los mensajes de las operaciones
+        self.guardado_lote_ok = True  # Resultado del guardado al cerrar el último lote
+        self.ultimo_mensaje = ""  # Último mensaje generado por una operación CRUD
+        # El archivo no se lee aquí: la carga ocurre en el primer acceso a self._productos
+
+    @property
+    def _productos(self) -> dict:
+        """Diccionario {id: Producto}; lo carga desde el archivo la primera vez que se usa"""
+        datos = self._datos
+        if datos is None:
+            with self._candado_carga:
+                if self._datos is None:
+                    self._cargar_desde_archivo()
+                datos = self._datos
+        return datos
 
     def _cargar_desde_archivo(self):
         """
         Método privado para cargar productos desde el archivo de almacenamiento.
         Maneja múltiples excepciones para robustez del sistema.
         """
+        inicio = time.perf_counter()
+        origen = self._leer_productos()
+        if self._datos is None:
+            self._datos = {}  # Archivo nuevo o ilegible: inventario vacío
+        self.perfil_carga = (origen, time.perf_counter() - inicio)
+
+        # Productos anteriores a los historiales: su valor al cargar es el primer punto
+        for historial, atributo in ((self._historial, 'cantidad'), (self._historial_precios, 'precio')):
+            if historial.vacio():
+                for producto in self._datos.values():
+                    historial.registrar(producto.id, getattr(producto, atributo))
+
+        # Punto de control de inicio: la valoración vigente al cargar. Se marca después de la
+        # última marca del historial, así no incluye ni vuelve a sumar cambios de una sesión
+        # anterior que cayeron en este mismo segundo
+        self._valor_centavos = sum(_centavos(p.cantidad, p.precio) for p in self._datos.values())
+        ultima = self._historial_valoracion.ultima_marca()
+        marca = max(int(time.time()), ultima if ultima is not None else 0) + 1
+        with self._candado_valoracion:
+            self._anexar_punto_control(marca)
+
+    def _leer_cache(self, clave):
+        """
+        Devuelve los productos guardados en la caché binaria si corresponde al JSON actual.
+        La caché es un formato de datos propio: leerla nunca ejecuta código.
+
+        Args:
+            clave (tuple): (mtime_ns, tamaño) del archivo JSON
+
+        Returns:
+            dict: {id: Producto} o None si la caché no existe, es de otro formato o quedó desactualizada
+        """
+        try:
+            with open(self._archivo_cache, 'rb') as f:
+                datos = f.read()
+            magico, formato, mtime, tamano, total = _CABECERA_CACHE.unpack_from(datos)
+            if (magico, formato, (mtime, tamano)) != (MAGICO_CACHE, FORMATO_CACHE, clave):
+                return None
+            productos = {}
+            posicion = _CABECERA_CACHE.size
+            for _ in range(total):
+                id, version, cantidad, precio, largo_nombre, largo_clave = _PRODUCTO_CACHE.unpack_from(datos, posicion)
+                posicion += _PRODUCTO_CACHE.size
+                nombre = datos[posicion:posicion + largo_nombre].decode('utf-8')
+                posicion += largo_nombre
+                clave_nombre = datos[posicion:posicion + largo_clave].decode('utf-8')
+                posicion += largo_clave
+                productos[id] = Producto.restaurar(id, nombre, clave_nombre, cantidad, precio, version)
+        except (OSError, struct.error, UnicodeDecodeError):
+            return None  # Caché ausente o ilegible: se vuelve a leer el JSON
+        return productos if posicion == len(datos) else None
+
+    def _escribir_cache(self, clave):
+        """Guarda los productos recién leídos del JSON en la caché binaria (si se puede)"""
+        try:
+            partes = [_CABECERA_CACHE.pack(MAGICO_CACHE, FORMATO_CACHE, *clave, len(self._datos))]
+            for producto in self._datos.values():
+                nombre = producto.nombre.encode('utf-8')
+                clave_nombre = producto.clave_nombre.encode('utf-8')
+                partes.append(_PRODUCTO_CACHE.pack(producto.id, producto.version, producto.cantidad,
+                                                   producto.precio, len(nombre), len(clave_nombre)))
+                partes.append(nombre)
+                partes.append(clave_nombre)
+            with open(self._archivo_cache, 'wb') as f:
+                f.write(b''.join(partes))
+        except (OSError, struct.error):
+            pass  # La caché es opcional (o un producto no cabe en el formato): solo se pierde velocidad
+
+    def _leer_productos(self) -> str:
+        """
+        Lee los productos desde la caché binaria o, si está desactualizada, desde el JSON.
+
+        Returns:
+            str: Origen de los datos ('caché', 'json' o 'nuevo')
+        """
+        import json  # Solo se necesita al leer o escribir el archivo
         try:
             # Verificar si el archivo existe
             if not os.path.exists(self._archivo):
@@ -38,7 +197,16 @@ class Inventario:
                 with open(self._archivo, 'w') as f:
                     json.dump([], f)  # Escribe lista vacía en JSON
                 print(f"📁 Archivo {self._archivo} creado exitosamente.")
-                return
+                return 'nuevo'
+
+            # La caché se identifica por la fecha de modificación y el tamaño del JSON
+            estado = os.stat(self._archivo)
+            clave = (estado.st_mtime_ns, estado.st_size)
+            productos = self._leer_cache(clave)
+            if productos is not None:
+                self._datos = productos
+                print(f"✅ Inventario cargado: {len(self._datos)} productos")
+                return 'caché'
 
             # Leer y cargar datos del archivo existente
             with open(self._archivo, 'r') as f:
@@ -46,12 +214,14 @@ class Inventario:
 
             # Reconstruir el diccionario de productos desde los datos
             # Usa dictionary comprehension para eficiencia
-            self._productos = {
+            self._datos = {
                 producto_data['id']: Producto.from_dict(producto_data)
                 for producto_data in datos
             }
+            self._escribir_cache(clave)
 
-            print(f"✅ Inventario cargado: {len(self._productos)} productos")
+            print(f"✅ Inventario cargado: {len(self._datos)} productos")
+            return 'json'
 
         except FileNotFoundError:
             print(f"❌ Error: Archivo {self._archivo} no encontrado")
@@ -61,30 +231,332 @@ class Inventario:
             print(f"❌ Error: Archivo {self._archivo} corrupto o con formato inválido")
         except Exception as e:
             print(f"❌ Error inesperado al cargar: {e}")
+        return 'json'
+
+    def _tomar_instantanea(self):
+        """
+        Copia el estado actual para guardarlo. Debe llamarse con el candado tomado.
+        Dentro de un lote no copia nada: solo marca que hay cambios pendientes.
+
+        Returns:
+            tuple: (versión, lista de diccionarios) o None si se está dentro de un lote
+        """
+        if self._en_lote:
+            self._cambios_pendientes = True
+            return None
+        # Convertir todos los productos a diccionarios para serialización
+        datos = [producto.to_dict() for producto in self._productos.values()]
+        return next(self._versiones), datos
+
+    def _escribir_instantanea(self, instantanea) -> bool:
+        """
+        Escribe en archivo una instantánea tomada con _tomar_instantanea, fuera del candado.
+        Si otro hilo ya escribió un estado más reciente, no se sobrescribe con uno viejo.
+
+        Args:
+            instantanea (tuple): (versión, datos) o None si no hay nada que escribir
+
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        if instantanea is None:
+            return True
+
+        version, datos = instantanea
+        with self._candado_archivo:
+            if version < self._version_escrita:
+                return True
+            import json
+            try:
+                # Guardar en archivo con formato JSON legible
+                with open(self._archivo, 'w') as f:
+                    json.dump(datos, f, indent=2)  # indent=2 para formato legible
+                self._version_escrita = version
+                self._historial.vaciar()
+                self._historial_precios.vaciar()
+                self._historial_valoracion.vaciar()
+                return True  # Indica éxito en la operación
+
+            except PermissionError:
+                print(f"❌ Error: Sin permisos para escribir en {self._archivo}")
+                return False
+            except Exception as e:
+                print(f"❌ Error inesperado al guardar: {e}")
+                return False
+
+    @contextmanager
+    def _bloquear_productos(self, ids=None):
+        """
+        Toma los candados de los productos indicados (todos si ids es None), en orden de
+        índice para que dos hilos nunca se esperen en ciclo. Sin modo concurrente no hace nada.
+
+        Args:
+            ids (iterable, optional): IDs de los productos. Default: todos los candados
+        """
+        candados = self._candados_producto
+        if ids is not None:
+            candados = [candados[i] for i in sorted({hash(id) % len(candados) for id in ids})] if candados else []
+        for candado in candados:
+            candado.acquire()
+        try:
+            yield
+        finally:
+            for candado in reversed(candados):
+                candado.release()
 
     def _guardar_en_archivo(self) -> bool:
         """
         Método privado para guardar productos en el archivo de almacenamiento.
+        Dentro de un lote solo marca los cambios; el guardado real ocurre al cerrar el lote.
 
         Returns:
             bool: True si se guardó correctamente, False si hubo error
         """
+        # Con los candados de producto la copia nunca incluye media venta
+        with self._candado.lectura(), self._bloquear_productos():
+            instantanea = self._tomar_instantanea()
+        return self._escribir_instantanea(instantanea)
+
+    def _informar(self, mensaje: str):
+        """
+        Registra el mensaje de una operación y lo muestra si no se está en modo silencioso.
+
+        Args:
+            mensaje (str): Mensaje a mostrar al usuario
+        """
+        self.ultimo_mensaje = mensaje
+        if not self._silencioso:
+            print(mensaje)
+
+    @contextmanager
+    def lote(self, silencioso: bool = True):
+        """
+        Agrupa varias operaciones para guardar el archivo una sola vez al final.
+        En modo concurrente el lote afecta también a las operaciones de otros hilos.
+
+        Uso:
+            with inventario.lote():
+                inventario.agregar_producto(...)
+                inventario.eliminar_producto(...)
+
+        Args:
+            silencioso (bool, optional): Oculta los mensajes de cada operación. Default: True
+
+        Yields:
+            Inventario: El mismo inventario
+        """
+        anterior_silencioso = self._silencioso
+        self._en_lote = True
+        self._silencioso = silencioso
+        self._cambios_pendientes = False
         try:
-            # Convertir todos los productos a diccionarios para serialización
-            datos = [producto.to_dict() for producto in self._productos.values()]
+            yield self
+        finally:
+            self._en_lote = False
+            self._silencioso = anterior_silencioso
+            self.guardado_lote_ok = True
+            if self._cambios_pendientes:
+                self._cambios_pendientes = False
+                self.guardado_lote_ok = self._guardar_en_archivo()
+
+    def guardar(self) -> bool:
+        """
+        Guarda explícitamente el inventario en archivo.
+        Útil para componentes que modifican productos en memoria (por ejemplo, las ventas).
+
+        Returns:
+            bool: True si se guardó correctamente, False si hubo error
+        """
+        return self._guardar_en_archivo()
 
-            # Guardar en archivo con formato JSON legible
-            with open(self._archivo, 'w') as f:
-                json.dump(datos, f, indent=2)  # indent=2 para formato legible
+    def publicar_snapshot(self, ruta_base: str = None) -> int:
+        """
+        Publica una instantánea binaria de solo lectura del inventario.
+        Los procesos de reportes la abren con instantaneas.LectorInstantanea y la consultan
+        vía mmap, compartiendo la memoria en lugar de cargar cada uno su propia copia.
 
-            return True  # Indica éxito en la operación
+        Args:
+            ruta_base (str, optional): Ruta base de los archivos. Default: nombre del archivo JSON sin extensión
 
-        except PermissionError:
-            print(f"❌ Error: Sin permisos para escribir en {self._archivo}")
-            return False
-        except Exception as e:
-            print(f"❌ Error inesperado al guardar: {e}")
-            return False
+        Returns:
+            int: Número de la generación publicada
+        """
+        from instantaneas import escribir_instantanea  # Solo la usan los reportes
+
+        if ruta_base is None:
+            ruta_base = os.path.splitext(self._archivo)[0]
+        # Copiar bajo el candado y escribir fuera de él, igual que al guardar
+        with self._candado.lectura(), self._bloquear_productos():
+            filas = [(p.id, p.nombre, p.cantidad, p.precio) for p in self._productos.values()]
+        return escribir_instantanea(ruta_base, filas)
+
+    # ========== ÍNDICE DE BÚSQUEDA APROXIMADA ==========
+
+    def _indexar_nombre(self, producto: Producto):
+        """Agrega el producto al índice aproximado (si ya fue construido)"""
+        if self._arbol_bk is not None:
+            self._arbol_bk.insertar(producto.clave_nombre, producto.id)
+
+    def _desindexar_nombre(self, id: int, nombre: str):
+        """Quita el producto del índice aproximado (si ya fue construido)"""
+        if self._arbol_bk is not None:
+            self._arbol_bk.eliminar(normalizar_texto(nombre), id)
+
+    # ========== HISTORIALES DE STOCK, PRECIO Y VALORACIÓN ==========
+
+    def registrar_cambio(self, producto: Producto, cantidad_anterior: int = None,
+                         precio_anterior: float = None, eliminado: bool = False):
+        """
+        Registra en los historiales el cambio de cantidad y/o precio de un producto y
+        actualiza la valoración total. Lo usan las operaciones CRUD y los componentes
+        que cambian el stock (ventas).
+
+        Args:
+            producto (Producto): Producto que cambió
+            cantidad_anterior (int, optional): Cantidad antes del cambio; None si el producto es nuevo
+            precio_anterior (float, optional): Precio antes del cambio; None si el producto es nuevo
+            eliminado (bool, optional): True si el producto salió del inventario. Default: False
+        """
+        nuevo = cantidad_anterior is None
+        if not eliminado:
+            if nuevo or producto.cantidad != cantidad_anterior:
+                self._historial.registrar(producto.id, producto.cantidad)
+            if nuevo or producto.precio != precio_anterior:
+                self._historial_precios.registrar(producto.id, producto.precio)
+
+        valor_anterior = 0 if nuevo else _centavos(cantidad_anterior, precio_anterior)
+        valor_nuevo = 0 if eliminado else _centavos(producto.cantidad, producto.precio)
+        if valor_nuevo != valor_anterior:
+            with self._candado_valoracion:
+                self._anexar_cambio_valoracion(valor_nuevo - valor_anterior)
+
+    def _anexar_punto_control(self, marca: int):
+        """Registra la valoración total vigente. Debe llamarse con el candado de valoración tomado."""
+        self._historial_valoracion.registrar(self.ID_VALORACION_TOTAL, self._valor_centavos / 100, marca)
+        self._marca_control = self._marca_valoracion = marca
+        self._cambios_desde_control = 0
+
+    def _anexar_cambio_valoracion(self, diferencia: int):
+        """
+        Aplica una diferencia de valoración (en centavos) y la registra en el historial.
+        Cada CAMBIOS_POR_CONTROL cambios o SEGUNDOS_POR_CONTROL segundos antepone un punto de
+        control, siempre al empezar un segundo nuevo: así el punto de control incluye todos los
+        cambios con marca anterior y ninguno con su misma marca.
+        Debe llamarse con el candado de valoración tomado.
+        """
+        marca = max(int(time.time()), self._marca_valoracion)  # Las marcas nunca retroceden
+        if marca > self._marca_valoracion and (
+                self._cambios_desde_control >= self.CAMBIOS_POR_CONTROL
+                or marca - self._marca_control >= self.SEGUNDOS_POR_CONTROL):
+            self._anexar_punto_control(marca)
+        self._valor_centavos += diferencia
+        self._historial_valoracion.registrar(self.ID_CAMBIO_VALORACION, diferencia / 100, marca)
+        self._marca_valoracion = marca
+        self._cambios_desde_control += 1
+
+    def _deshacer_cambio(self, producto: Producto, cantidad_anterior: int = None,
+                         precio_anterior: float = None, eliminado: bool = False):
+        """
+        Deshace en los historiales un registrar_cambio cuyo guardado falló. Recibe los mismos
+        argumentos y debe llamarse antes de restaurar el producto. Los puntos que aún no se
+        escribieron se quitan, así el historial no muestra un cambio que nunca se guardó;
+        si ya se escribieron, se registra la vuelta al valor anterior.
+        """
+        nuevo = cantidad_anterior is None
+        if not eliminado:
+            if nuevo or producto.cantidad != cantidad_anterior:
+                if not self._historial.descartar(producto.id, producto.cantidad) and not nuevo:
+                    self._historial.registrar(producto.id, cantidad_anterior)
+            if nuevo or producto.precio != precio_anterior:
+                if not self._historial_precios.descartar(producto.id, producto.precio) and not nuevo:
+                    self._historial_precios.registrar(producto.id, precio_anterior)
+
+        valor_anterior = 0 if nuevo else _centavos(cantidad_anterior, precio_anterior)
+        valor_nuevo = 0 if eliminado else _centavos(producto.cantidad, producto.precio)
+        if valor_nuevo != valor_anterior:
+            diferencia = valor_nuevo - valor_anterior
+            with self._candado_valoracion:
+                # Quitar la última diferencia pendiente no invalida ningún punto de control:
+                # los puntos de control siempre preceden a la diferencia que los disparó
+                if self._historial_valoracion.descartar(self.ID_CAMBIO_VALORACION, diferencia / 100):
+                    self._valor_centavos -= diferencia
+                else:
+                    self._anexar_cambio_valoracion(-diferencia)
+
+    def historial_stock(self, id: int, desde=None, hasta=None) -> list:
+        """
+        Devuelve los cambios de cantidad de un producto en un rango de fechas, en O(log n + k).
+
+        Args:
+            id (int): ID del producto
+            desde (optional): datetime o segundos desde epoch. Default: desde el inicio
+            hasta (optional): datetime o segundos desde epoch. Default: hasta ahora
+
+        Returns:
+            list: Tuplas (segundos desde epoch, cantidad) en orden cronológico
+        """
+        return self._historial.rango(id, desde, hasta)
+
+    def historial_stock_muestreado(self, id: int, desde, hasta, puntos: int = 100) -> list:
+        """
+        Devuelve el stock de un producto en puntos equiespaciados, listo para graficar.
+
+        Args:
+            id (int): ID del producto
+            desde: datetime o segundos desde epoch
+            hasta: datetime o segundos desde epoch
+            puntos (int, optional): Cantidad de puntos. Default: 100
+
+        Returns:
+            list: Tuplas (segundos desde epoch, cantidad vigente o None)
+        """
+        return self._historial.muestrear(id, desde, hasta, puntos)
+
+    def historial_precios(self, id: int, desde=None, hasta=None) -> list:
+        """
+        Devuelve los cambios de precio de un producto en un rango de fechas.
+
+        Args:
+            id (int): ID del producto
+            desde (optional): datetime o segundos desde epoch. Default: desde el inicio
+            hasta (optional): datetime o segundos desde epoch. Default: hasta ahora
+
+        Returns:
+            list: Tuplas (segundos desde epoch, precio) en orden cronológico
+        """
+        return self._historial_precios.rango(id, desde, hasta)
+
+    def precio_en(self, id: int, fecha) -> float:
+        """
+        Devuelve el precio que tenía un producto en una fecha (búsqueda binaria).
+
+        Args:
+            id (int): ID del producto
+            fecha: datetime o segundos desde epoch
+
+        Returns:
+            float: Precio vigente en esa fecha o None si el producto aún no existía
+        """
+        return self._historial_precios.valor_en(id, fecha)
+
+    def valoracion_en(self, fecha) -> float:
+        """
+        Reconstruye la valoración total del inventario en una fecha pasada.
+        Busca (por búsqueda binaria) el último punto de control anterior a la fecha y le suma
+        las diferencias registradas desde entonces, que son a lo sumo las de
+        CAMBIOS_POR_CONTROL cambios o SEGUNDOS_POR_CONTROL segundos.
+
+        Args:
+            fecha: datetime o segundos desde epoch
+
+        Returns:
+            float: Valoración total vigente en esa fecha (0.0 si no hay registros previos)
+        """
+        punto = self._historial_valoracion.punto_en(self.ID_VALORACION_TOTAL, fecha)
+        if punto is None:
+            return 0.0
+        marca, total = punto
+        return round(total + self._historial_valoracion.suma(self.ID_CAMBIO_VALORACION, marca, fecha), 2)
 
     # ========== OPERACIONES CRUD ==========
 
@@ -98,23 +570,31 @@ class Inventario:
         Returns:
             bool: True si se agregó correctamente, False si hubo error
         """
-        # Verificar que no exista producto con el mismo ID
-        if producto.id in self._productos:
-            print(f"❌ Error: Ya existe producto con ID {producto.id}")
-            return False
+        with self._candado.escritura():
+            # Verificar que no exista producto con el mismo ID
+            if producto.id in self._productos:
+                self._informar(f"❌ Error: Ya existe producto con ID {producto.id}")
+                return False
 
-        # Agregar producto al diccionario
-        self._productos[producto.id] = producto
+            # Agregar producto al diccionario
+            self._productos[producto.id] = producto
+            self._indexar_nombre(producto)
+            self.registrar_cambio(producto)
+            instantanea = self._tomar_instantanea()
 
         # Intentar guardar en archivo
-        if self._guardar_en_archivo():
-            print(f"✅ Producto '{producto.nombre}' agregado exitosamente!")
+        if self._escribir_instantanea(instantanea):
+            self._informar(f"✅ Producto '{producto.nombre}' agregado exitosamente!")
             return True
-        else:
-            # REVERSIÓN: Si falla el guardado, eliminar del diccionario
-            del self._productos[producto.id]
-            print("❌ Error: No se pudo guardar en archivo")
-            return False
+
+        # REVERSIÓN: Si falla el guardado, eliminar del diccionario
+        with self._candado.escritura():
+            if self._productos.get(producto.id) is producto:
+                del self._productos[producto.id]
+                self._desindexar_nombre(producto.id, producto.nombre)
+                self._deshacer_cambio(producto)
+        self._informar("❌ Error: No se pudo guardar en archivo")
+        return False
 
     def eliminar_producto(self, id: int) -> bool:
         """
@@ -126,80 +606,183 @@ class Inventario:
         Returns:
             bool: True si se eliminó correctamente, False si hubo error
         """
-        # Verificar que el producto exista
-        if id not in self._productos:
-            print(f"❌ Error: No existe producto con ID {id}")
-            return False
-
-        # Guardar referencia al producto para mensaje de confirmación
-        producto = self._productos[id]
+        with self._candado.escritura():
+            # Verificar que el producto exista
+            if id not in self._productos:
+                self._informar(f"❌ Error: No existe producto con ID {id}")
+                return False
 
-        # Eliminar producto del diccionario
-        del self._productos[id]
+            # Eliminar producto del diccionario (guardando la referencia para el mensaje)
+            producto = self._productos.pop(id)
+            self._desindexar_nombre(id, producto.nombre)
+            self.registrar_cambio(producto, producto.cantidad, producto.precio, eliminado=True)
+            instantanea = self._tomar_instantanea()
 
         # Intentar guardar en archivo
-        if self._guardar_en_archivo():
-            print(f"✅ Producto '{producto.nombre}' eliminado exitosamente!")
+        if self._escribir_instantanea(instantanea):
+            self._informar(f"✅ Producto '{producto.nombre}' eliminado exitosamente!")
             return True
-        else:
-            # REVERSIÓN: Si falla el guardado, restaurar el producto
-            self._productos[id] = producto
-            print("❌ Error: No se pudo guardar en archivo")
-            return False
 
-    def actualizar_producto(self, id: int, **kwargs) -> bool:
+        # REVERSIÓN: Si falla el guardado, restaurar el producto
+        with self._candado.escritura():
+            if self._productos.setdefault(id, producto) is producto:
+                self._indexar_nombre(producto)
+                self._deshacer_cambio(producto, producto.cantidad, producto.precio, eliminado=True)
+        self._informar("❌ Error: No se pudo guardar en archivo")
+        return False
+
+    def actualizar_producto(self, id: int, version_esperada: int = None, **kwargs) -> bool:
         """
         Actualiza los atributos de un producto existente.
+        Con version_esperada se aplica control optimista: si el producto cambió desde que
+        se leyó esa versión, la actualización se rechaza y el llamador puede reintentar.
 
         Args:
             id (int): ID del producto a actualizar
+            version_esperada (int, optional): Versión leída por el llamador. Default: sin control
             **kwargs: Atributos a actualizar (nombre, cantidad, precio)
 
         Returns:
             bool: True si se actualizó correctamente, False si hubo error
+
+        Raises:
+            ConflictoVersion: Si version_esperada no coincide con la versión actual
         """
-        # Verificar que el producto exista
-        if id not in self._productos:
-            print(f"❌ Error: No existe producto con ID {id}")
-            return False
+        with self._candado.escritura():
+            # Verificar que el producto exista
+            if id not in self._productos:
+                self._informar(f"❌ Error: No existe producto con ID {id}")
+                return False
 
-        producto = self._productos[id]
+            producto = self._productos[id]
 
-        # Guardar valores originales para posible reversión
-        originales = {
-            'nombre': producto.nombre,
-            'cantidad': producto.cantidad,
-            'precio': producto.precio
-        }
+            if version_esperada is not None and version_esperada != producto.version:
+                self._informar(f"❌ Error: Conflicto de versión en producto con ID {id}")
+                raise ConflictoVersion(id, version_esperada, producto.version)
 
-        try:
-            # Aplicar cambios solo a los campos proporcionados
-            for attr, valor in kwargs.items():
-                if valor is not None:
-                    setattr(producto, attr, valor)
+            # Guardar valores originales para posible reversión
+            originales = {
+                'nombre': producto.nombre,
+                'cantidad': producto.cantidad,
+                'precio': producto.precio
+            }
 
-            # Intentar guardar en archivo
-            if self._guardar_en_archivo():
-                print(f"✅ Producto '{producto.nombre}' actualizado exitosamente!")
-                return True
-            else:
-                # REVERSIÓN: Si falla el guardado, restaurar valores originales
+            try:
+                # Aplicar cambios solo a los campos proporcionados
+                for attr, valor in kwargs.items():
+                    if valor is not None:
+                        setattr(producto, attr, valor)
+            except ValueError as e:
+                # Manejar errores de validación
+                self._informar(f"❌ Error de validación: {e}")
+                # Revertir cambios
                 for attr, valor in originales.items():
                     setattr(producto, attr, valor)
-                print("❌ Error: No se pudo guardar en archivo")
                 return False
 
-        except ValueError as e:
-            # Manejar errores de validación
-            print(f"❌ Error de validación: {e}")
-            # Revertir cambios
+            producto.incrementar_version()
+            if producto.nombre != originales['nombre']:
+                self._desindexar_nombre(id, originales['nombre'])
+                self._indexar_nombre(producto)
+            self.registrar_cambio(producto, originales['cantidad'], originales['precio'])
+            instantanea = self._tomar_instantanea()
+
+        # Intentar guardar en archivo
+        if self._escribir_instantanea(instantanea):
+            self._informar(f"✅ Producto '{producto.nombre}' actualizado exitosamente!")
+            return True
+
+        # REVERSIÓN: Si falla el guardado, restaurar valores originales
+        with self._candado.escritura():
+            # La versión no retrocede: los lectores de la versión fallida reintentarán
+            nombre_fallido = producto.nombre
+            self._deshacer_cambio(producto, originales['cantidad'], originales['precio'])
             for attr, valor in originales.items():
                 setattr(producto, attr, valor)
-            return False
+            if nombre_fallido != producto.nombre:
+                self._desindexar_nombre(id, nombre_fallido)
+                self._indexar_nombre(producto)
+        self._informar("❌ Error: No se pudo guardar en archivo")
+        return False
+
+    def revertir_producto(self, id: int, anterior: dict = None):
+        """
+        Devuelve un producto al estado que tenía antes de un cambio hecho dentro de un lote
+        cuyo guardado falló, sin guardar. Los puntos de ese cambio que aún no se escribieron
+        se quitan de los historiales, como en la reversión de las operaciones CRUD.
+        Los cambios de un lote se revierten del último al primero.
+
+        Args:
+            id (int): ID del producto
+            anterior (dict, optional): Estado previo (to_dict) o None si el producto no existía
+        """
+        with self._candado.escritura():
+            actual = self._productos.get(id)
+            if anterior is None:
+                # Deshacer un alta
+                if actual is not None:
+                    del self._productos[id]
+                    self._desindexar_nombre(id, actual.nombre)
+                    self._deshacer_cambio(actual)
+            elif actual is None:
+                # Deshacer una baja
+                producto = Producto.from_dict(anterior)
+                self._productos[id] = producto
+                self._indexar_nombre(producto)
+                self._deshacer_cambio(producto, producto.cantidad, producto.precio, eliminado=True)
+            else:
+                # Deshacer una actualización; la versión no retrocede, igual que en actualizar_producto
+                nombre_fallido = actual.nombre
+                self._deshacer_cambio(actual, anterior['cantidad'], anterior['precio'])
+                for attr in ('nombre', 'cantidad', 'precio'):
+                    setattr(actual, attr, anterior[attr])
+                if nombre_fallido != actual.nombre:
+                    self._desindexar_nombre(id, nombre_fallido)
+                    self._indexar_nombre(actual)
+
+    def descontar_stock(self, cantidades: dict) -> dict:
+        """
+        Descuenta stock de varios productos de forma atómica: valida todas las cantidades y
+        las descuenta todas o ninguna. Toma el candado de lectura (que excluye a las
+        modificaciones) y los candados de esos productos, así dos ventas del mismo producto
+        se ordenan y las de productos distintos no se esperan.
+        No guarda el archivo (lo hace quien registra las ventas al sincronizar).
+
+        Args:
+            cantidades (dict): {id_producto: unidades a descontar}
+
+        Returns:
+            dict: {id_producto: precio unitario} leído junto con el descuento
+
+        Raises:
+            ValueError: Si un producto no existe o su stock es insuficiente
+        """
+        with self._candado.lectura(), self._bloquear_productos(cantidades):
+            productos = {}
+            for id, cantidad in cantidades.items():
+                producto = self._productos.get(id)
+                if producto is None:
+                    raise ValueError(f"No existe producto con ID {id}")
+                if producto.cantidad < cantidad:
+                    raise ValueError(f"Stock insuficiente de '{producto.nombre}' "
+                                     f"(disponible: {producto.cantidad}, solicitado: {cantidad})")
+                productos[id] = producto
+
+            # Todas las validaciones pasaron: descontar
+            precios = {}
+            for id, cantidad in cantidades.items():
+                producto = productos[id]
+                cantidad_anterior = producto.cantidad
+                producto.cantidad -= cantidad
+                producto.incrementar_version()
+                precios[id] = producto.precio
+                self.registrar_cambio(producto, cantidad_anterior, producto.precio)
+            return precios
 
     def buscar_por_nombre(self, nombre: str) -> list:
         """
-        Busca productos por nombre (coincidencias parciales, insensible a mayúsculas).
+        Busca productos por nombre (coincidencias parciales, insensible a mayúsculas y tildes).
+        Compara contra la clave normalizada que cada Producto calcula al asignar su nombre.
 
         Args:
             nombre (str): Nombre o parte del nombre a buscar
@@ -207,13 +790,46 @@ class Inventario:
         Returns:
             list: Lista de productos que coinciden con el criterio de búsqueda
         """
-        nombre_lower = nombre.lower()  # Convertir a minúsculas para búsqueda insensible
+        clave = normalizar_texto(nombre)  # Se normaliza solo la consulta
 
         # Usar list comprehension para búsqueda eficiente
-        return [
-            producto for producto in self._productos.values()
-            if nombre_lower in producto.nombre.lower()
-        ]
+        with self._candado.lectura():
+            return [
+                producto for producto in self._productos.values()
+                if clave in producto.clave_nombre
+            ]
+
+    def buscar_aproximado(self, texto: str, max_distancia: int = 2, limite: int = 10) -> list:
+        """
+        Busca productos cuyo nombre se parece al texto, tolerando errores de tipeo.
+        Usa un árbol BK sobre los nombres normalizados, que se construye en la primera
+        consulta y luego se mantiene al agregar, renombrar y eliminar productos.
+
+        Args:
+            texto (str): Nombre (posiblemente mal escrito) a buscar
+            max_distancia (int, optional): Máximo de ediciones admitidas. Default: 2
+            limite (int, optional): Número máximo de resultados. Default: 10
+
+        Returns:
+            list: Productos ordenados de menor a mayor distancia de edición
+        """
+        if self._arbol_bk is None:
+            with self._candado.escritura():
+                if self._arbol_bk is None:
+                    from busqueda_aproximada import ArbolBK
+                    arbol = ArbolBK()
+                    for producto in self._productos.values():
+                        arbol.insertar(producto.clave_nombre, producto.id)
+                    self._arbol_bk = arbol
+
+        with self._candado.lectura():
+            coincidencias = self._arbol_bk.buscar(normalizar_texto(texto), max_distancia)
+            resultados = []
+            for _, _, id in coincidencias[:limite]:
+                producto = self._productos.get(id)
+                if producto is not None:
+                    resultados.append(producto)
+            return resultados
 
     def obtener_por_id(self, id: int) -> Producto:
         """
@@ -225,7 +841,8 @@ class Inventario:
         Returns:
             Producto: El producto encontrado o None si no existe
         """
-        return self._productos.get(id)  # Retorna None si no existe
+        with self._candado.lectura():
+            return self._productos.get(id)  # Retorna None si no existe
 
     def obtener_todos(self) -> list:
         """
@@ -235,7 +852,45 @@ class Inventario:
             list: Lista de todos los productos ordenados por ID
         """
         # Ordenar productos por ID para consistencia en la visualización
-        return sorted(self._productos.values(), key=lambda p: p.id)
+        with self._candado.lectura():
+            productos = list(self._productos.values())
+        return sorted(productos, key=lambda p: p.id)
+
+    def ids_ordenados(self) -> list:
+        """
+        Obtiene los IDs de todos los productos ordenados.
+        Es más liviano que ordenar los objetos Producto completos.
+
+        Returns:
+            list: Lista de IDs ordenados de menor a mayor
+        """
+        with self._candado.lectura():
+            ids = list(self._productos)
+        return sorted(ids)
+
+    def iterar_productos(self):
+        """
+        Recorre los productos ordenados por ID sin construir una lista de productos.
+        Para ordenar se copia la lista de IDs (O(n) enteros, mucho menos que los productos).
+        Los productos eliminados mientras se recorre se omiten.
+
+        Yields:
+            Producto: Cada producto del inventario en orden de ID
+        """
+        for id in self.ids_ordenados():
+            producto = self.obtener_por_id(id)
+            if producto is not None:
+                yield producto
+
+    def valor_total(self) -> float:
+        """
+        Calcula el valor total del inventario (cantidad * precio).
+
+        Returns:
+            float: Suma del valor de todos los productos
+        """
+        with self._candado.lectura():
+            return sum(p.cantidad * p.precio for p in self._productos.values())
 
     def existe_id(self, id: int) -> bool:
         """
@@ -247,7 +902,8 @@ class Inventario:
         Returns:
             bool: True si existe, False si no existe
         """
-        return id in self._productos
+        with self._candado.lectura():
+            return id in self._productos
 
     def __len__(self) -> int:
         """
@@ -256,4 +912,5 @@ class Inventario:
         Returns:
             int: Número de productos en el inventario
         """
-        return len(self._productos)
\ No newline at end of file
+        with self._candado.lectura():
+            return len(self._productos)
\ No newline at end of file
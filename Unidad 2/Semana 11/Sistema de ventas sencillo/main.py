@@ -3,8 +3,14 @@ SISTEMA DE GESTIÓN DE INVENTARIOS - INTERFAZ PRINCIPAL
 Este archivo contiene la interfaz de usuario en consola para el sistema de inventarios.
 """
 
+import sys  # Para escritura directa (con búfer) en la salida estándar
+import time  # Para medir el arranque con --perfil-arranque
+
+_inicio_importacion = time.perf_counter()
 from producto import Producto
-from inventario import Inventario
+from inventario import Inventario, ConflictoVersion
+# procesador_lotes, ventas, reportes y argparse se importan solo cuando se usan
+TIEMPO_IMPORTACION = time.perf_counter() - _inicio_importacion
 
 
 class SistemaInventario:
@@ -13,9 +19,12 @@ class SistemaInventario:
     Separa la lógica de presentación de la lógica de negocio.
     """
 
+    TAMANO_PAGINA = 20  # Productos por página en el listado
+
     def __init__(self):
         """Inicializa el sistema con una instancia de Inventario"""
-        self.inventario = Inventario()  # Carga automáticamente desde archivo
+        self.inventario = Inventario()  # Lee el archivo en el primer acceso
+        self.ventas = None  # RegistroVentas, se abre con la primera venta
 
     def mostrar_menu(self):
         """Muestra el menú principal del sistema"""
@@ -27,7 +36,8 @@ class SistemaInventario:
         print("3. ✏️  Actualizar producto")
         print("4. 🔍 Buscar producto por nombre")
         print("5. 📋 Mostrar todos los productos")
-        print("6. ❌ Salir")
+        print("6. 🛒 Registrar venta")
+        print("7. ❌ Salir")
         print("=" * 50)
 
     def limpiar_pantalla(self):
@@ -148,6 +158,7 @@ class SistemaInventario:
             return
 
         producto = self.inventario.obtener_por_id(id)
+        version_leida = producto.version  # Para detectar cambios hechos por otro usuario
         print(f"Producto actual: {producto}")
         print("\nDeje en blanco los campos que no desea modificar:")
 
@@ -169,11 +180,15 @@ class SistemaInventario:
 
             # Aplicar cambios si hay alguno
             if cambios:
-                if self.inventario.actualizar_producto(id, **cambios):
+                if self.inventario.actualizar_producto(id, version_esperada=version_leida, **cambios):
                     print("✅ Producto actualizado exitosamente!")
             else:
                 print("ℹ️  No se realizaron cambios")
 
+        except ConflictoVersion as e:
+            print(f"❌ {e}")
+            print(f"Producto actual: {self.inventario.obtener_por_id(id)}")
+            print("ℹ️  Revise los datos y vuelva a intentar la actualización")
         except ValueError as e:
             print(f"❌ Error: {e}")
         except Exception as e:
@@ -199,22 +214,134 @@ class SistemaInventario:
         else:
             print("❌ No se encontraron productos")
 
+            # Sugerir nombres parecidos por si hubo un error de tipeo
+            sugerencias = self.inventario.buscar_aproximado(termino, max_distancia=2, limite=5)
+            if sugerencias:
+                print("💡 ¿Quiso decir?")
+                for i, producto in enumerate(sugerencias, 1):
+                    print(f"{i}. {producto}")
+
+    def registrar_venta(self):
+        """Maneja la interfaz para registrar una venta de uno o varios productos"""
+        print("\n--- 🛒 REGISTRAR VENTA ---")
+        print("Ingrese los productos vendidos (ID en blanco para terminar):")
+
+        lineas = []
+        while True:
+            id_str = input("ID del producto: ").strip()
+            if not id_str:
+                break
+            if not id_str.isdigit() or not self.inventario.existe_id(int(id_str)):
+                print(f"❌ No existe producto con ID {id_str}")
+                continue
+            cantidad = self.validar_entero("Cantidad: ")
+            from ventas import LineaVenta
+            try:
+                lineas.append(LineaVenta(int(id_str), cantidad))
+            except ValueError as e:
+                print(f"❌ Error: {e}")
+
+        if not lineas:
+            print("ℹ️  Venta cancelada")
+            return
+
+        if self.ventas is None:
+            from ventas import RegistroVentas
+            self.ventas = RegistroVentas(self.inventario)
+
+        try:
+            venta = self.ventas.vender(lineas)
+            self.ventas.sincronizar()
+            print(f"✅ {venta}")
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+
+    def _resumen(self) -> str:
+        """Devuelve la línea de estadísticas básicas del inventario"""
+        return (f"📊 Total: {len(self.inventario)} productos | "
+                f"Valor total: ${self.inventario.valor_total():,.2f}")
+
     def mostrar_todos(self):
-        """Muestra todos los productos del inventario"""
+        """
+        Muestra todos los productos del inventario por páginas.
+        Cada página se escribe en la consola de una sola vez.
+        Navegación: [s] siguiente, [a] anterior, número de página para saltar, [q] salir.
+        """
         print("\n--- 📋 INVENTARIO COMPLETO ---")
 
-        productos = self.inventario.obtener_todos()
+        if len(self.inventario) == 0:
+            print("ℹ️  El inventario está vacío")
+            return
 
-        if productos:
-            for i, producto in enumerate(productos, 1):
-                print(f"{i}. {producto}")
+        # Solo se ordenan los IDs; los productos se obtienen página por página
+        ids = self.inventario.ids_ordenados()
+        total_paginas = (len(ids) + self.TAMANO_PAGINA - 1) // self.TAMANO_PAGINA
+        resumen = self._resumen()  # Se calcula una vez, no en cada cambio de página
+        pagina = 0
 
-            # Mostrar estadísticas básicas
-            total_productos = len(productos)
-            total_valor = sum(p.cantidad * p.precio for p in productos)
-            print(f"\n📊 Total: {total_productos} productos | Valor total: ${total_valor:,.2f}")
-        else:
-            print("ℹ️  El inventario está vacío")
+        while True:
+            inicio = pagina * self.TAMANO_PAGINA
+            lineas = [f"\n📄 Página {pagina + 1} de {total_paginas}"]
+            for i, id in enumerate(ids[inicio:inicio + self.TAMANO_PAGINA], inicio + 1):
+                lineas.append(f"{i}. {self.inventario.obtener_por_id(id)}")
+            lineas.append(resumen)
+            sys.stdout.write("\n".join(lineas) + "\n")
+            sys.stdout.flush()
+
+            if total_paginas == 1:
+                break
+
+            opcion = input("[s] Siguiente | [a] Anterior | [número] Ir a página | [q] Salir: ").strip().lower()
+            if opcion == "s":
+                pagina = min(pagina + 1, total_paginas - 1)
+            elif opcion == "a":
+                pagina = max(pagina - 1, 0)
+            elif opcion.isdigit() and 1 <= int(opcion) <= total_paginas:
+                pagina = int(opcion) - 1
+            elif opcion == "q" or opcion == "":
+                break
+            else:
+                print("❌ Opción no válida")
+
+    def exportar_listado(self, ruta: str) -> bool:
+        """
+        Escribe el listado completo en un archivo usando un único escritor con búfer.
+        Los productos se recorren con un generador, sin construir la lista de productos.
+
+        Args:
+            ruta (str): Ruta del archivo de salida
+
+        Returns:
+            bool: True si se escribió correctamente, False si hubo error
+        """
+        try:
+            with open(ruta, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+                f.write("--- INVENTARIO COMPLETO ---\n")
+                f.writelines(f"{i}. {producto}\n"
+                             for i, producto in enumerate(self.inventario.iterar_productos(), 1))
+                f.write(self._resumen() + "\n")
+            print(f"✅ Listado exportado a {ruta}")
+            return True
+        except OSError as e:
+            print(f"❌ Error al escribir {ruta}: {e}")
+            return False
+
+    def ejecutar_lote(self, ruta: str) -> dict:
+        """
+        Ejecuta comandos en modo no interactivo desde un archivo o desde stdin.
+
+        Args:
+            ruta (str): Ruta del archivo de comandos, o "-" para leer de stdin
+
+        Returns:
+            dict: Resumen de la ejecución (ver ProcesadorLotes.ejecutar)
+        """
+        from procesador_lotes import ProcesadorLotes
+        procesador = ProcesadorLotes(self.inventario)
+        if ruta == "-":
+            return procesador.ejecutar(sys.stdin)
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return procesador.ejecutar(f)
 
     def ejecutar(self):
         """Método principal que ejecuta el sistema"""
@@ -224,7 +351,7 @@ class SistemaInventario:
             self.limpiar_pantalla()
             self.mostrar_menu()
 
-            opcion = input("Seleccione una opción (1-6): ").strip()
+            opcion = input("Seleccione una opción (1-7): ").strip()
 
             if opcion == "1":
                 self.agregar_producto()
@@ -237,6 +364,10 @@ class SistemaInventario:
             elif opcion == "5":
                 self.mostrar_todos()
             elif opcion == "6":
+                self.registrar_venta()
+            elif opcion == "7":
+                if self.ventas is not None:
+                    self.ventas.cerrar()
                 print("\n👋 ¡Gracias por usar el sistema!")
                 print("Saliendo del programa...")
                 break
@@ -246,8 +377,65 @@ class SistemaInventario:
             self.esperar_enter()
 
 
+def mostrar_perfil_arranque(tiempos: list, inventario: Inventario):
+    """
+    Muestra cuánto tardó cada etapa del arranque.
+
+    Args:
+        tiempos (list): Pares (etapa, segundos) medidos en el arranque
+        inventario (Inventario): Inventario ya creado; se fuerza aquí su carga
+    """
+    len(inventario)  # La carga es diferida: medirla ahora
+    origen, segundos = inventario.perfil_carga
+    tiempos = tiempos + [(f"Carga del inventario ({origen})", segundos)]
+
+    print("\nPERFIL DE ARRANQUE")
+    for etapa, segundos in tiempos:
+        print(f"   {etapa:<35} {segundos * 1000:8.2f} ms")
+    print(f"   {'Total':<35} {sum(s for _, s in tiempos) * 1000:8.2f} ms")
+
+
+def leer_argumentos():
+    """Lee las opciones de la línea de comandos (argparse solo se importa si hay alguna)"""
+    if len(sys.argv) == 1:
+        # Modo interactivo sin opciones: no hace falta cargar argparse
+        return None
+
+    import argparse
+    parser = argparse.ArgumentParser(description="Sistema de Gestión de Inventarios")
+    parser.add_argument("--salida", metavar="archivo",
+                        help="Escribe el listado completo en el archivo indicado y termina")
+    parser.add_argument("--reporte", metavar="archivo.html|archivo.csv",
+                        help="Genera el reporte del inventario (HTML o CSV) y termina")
+    parser.add_argument("--batch", metavar="comandos.txt", nargs="?", const="-",
+                        help="Ejecuta comandos desde un archivo (o stdin si se omite) sin menú")
+    parser.add_argument("--perfil-arranque", action="store_true",
+                        help="Muestra el tiempo de importación e inicialización al arrancar")
+    return parser.parse_args()
+
+
 # Punto de entrada del programa
 if __name__ == "__main__":
+    inicio = time.perf_counter()
+    args = leer_argumentos()
+    tiempos = [("Importación de módulos", TIEMPO_IMPORTACION),
+               ("Lectura de argumentos", time.perf_counter() - inicio)]
+
     # Crear instancia del sistema y ejecutarlo
+    inicio = time.perf_counter()
     sistema = SistemaInventario()
-    sistema.ejecutar()
\ No newline at end of file
+    tiempos.append(("Creación del sistema", time.perf_counter() - inicio))
+    if args is not None and args.perfil_arranque:
+        mostrar_perfil_arranque(tiempos, sistema.inventario)
+
+    if args is None:
+        sistema.ejecutar()
+    elif args.batch:
+        sistema.ejecutar_lote(args.batch)
+    elif args.salida:
+        sistema.exportar_listado(args.salida)
+    elif args.reporte:
+        from reportes import exportar_reporte
+        exportar_reporte(sistema.inventario, args.reporte)
+    else:
+        sistema.ejecutar()
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - PROCESADOR DE LOTES
+Este archivo contiene la clase ProcesadorLotes que ejecuta comandos desde un archivo o stdin
+sin interacción del usuario, guardando el inventario una sola vez por grupo de comandos.
+
+Lenguaje de comandos (una instrucción por línea, '#' para comentarios):
+    add <id> <nombre> <cantidad> <precio>
+    update <id> [nombre=<valor>] [cantidad=<valor>] [precio=<valor>] [version=<esperada>]
+    delete <id>
+    search <texto>
+    list
+Los valores con espacios se escriben entre comillas: add 7 "Arroz grano largo" 10 1.25
+"""
+
+import shlex  # Para separar argumentos respetando comillas
+import sys  # Para escritura con búfer en la salida estándar
+import time  # Para medir el rendimiento
+
+from producto import Producto
+from inventario import Inventario, ConflictoVersion
+
+
+class ProcesadorLotes:
+    """
+    Clase que interpreta y ejecuta comandos de inventario en modo no interactivo.
+    Los comandos se ejecutan en grupos y cada grupo se persiste con un único guardado.
+    """
+
+    CAMPOS_ACTUALIZABLES = {'nombre': str, 'cantidad': int, 'precio': float, 'version_esperada': int}
+
+    def __init__(self, inventario: Inventario, tamano_grupo: int = 1000, salida=None):
+        """
+        Constructor de la clase ProcesadorLotes.
+
+        Args:
+            inventario (Inventario): Inventario sobre el que se ejecutan los comandos
+            tamano_grupo (int, optional): Comandos por guardado en archivo. Default: 1000
+            salida (optional): Flujo donde se escribe el reporte. Default: sys.stdout
+        """
+        self.inventario = inventario
+        self.tamano_grupo = tamano_grupo
+        self.salida = salida if salida is not None else sys.stdout
+        self._comandos = {
+            'add': self._cmd_add,
+            'update': self._cmd_update,
+            'delete': self._cmd_delete,
+            'search': self._cmd_search,
+            'list': self._cmd_list,
+        }
+        self._deshacer = []  # (id, estado anterior o None) de cada cambio del grupo en curso
+
+    # ========== COMANDOS ==========
+
+    def _anotar_cambio(self, id: int, exito: bool, anterior):
+        """Guarda el estado previo de un producto modificado con éxito, para poder revertirlo"""
+        if exito:
+            self._deshacer.append((id, anterior))
+
+    def _estado(self, id: int):
+        """Copia del producto como diccionario, o None si no existe"""
+        producto = self.inventario.obtener_por_id(id)
+        return producto.to_dict() if producto is not None else None
+
+    def _cmd_add(self, args: list) -> tuple:
+        """Ejecuta: add <id> <nombre> <cantidad> <precio>"""
+        if len(args) != 4:
+            return False, "uso: add <id> <nombre> <cantidad> <precio>"
+        producto = Producto(int(args[0]), args[1], int(args[2]), float(args[3]))
+        anterior = self._estado(producto.id)
+        exito = self.inventario.agregar_producto(producto)
+        self._anotar_cambio(producto.id, exito, anterior)
+        return exito, self.inventario.ultimo_mensaje
+
+    def _cmd_update(self, args: list) -> tuple:
+        """Ejecuta: update <id> campo=valor ..."""
+        if len(args) < 2:
+            return False, "uso: update <id> campo=valor ..."
+        cambios = {}
+        for par in args[1:]:
+            campo, separador, valor = par.partition('=')
+            if campo == 'version':
+                campo = 'version_esperada'
+            if not separador or campo not in self.CAMPOS_ACTUALIZABLES:
+                return False, f"campo no válido: {par}"
+            cambios[campo] = self.CAMPOS_ACTUALIZABLES[campo](valor)
+        id = int(args[0])
+        anterior = self._estado(id)
+        exito = self.inventario.actualizar_producto(id, **cambios)
+        self._anotar_cambio(id, exito, anterior)
+        return exito, self.inventario.ultimo_mensaje
+
+    def _cmd_delete(self, args: list) -> tuple:
+        """Ejecuta: delete <id>"""
+        if len(args) != 1:
+            return False, "uso: delete <id>"
+        id = int(args[0])
+        anterior = self._estado(id)
+        exito = self.inventario.eliminar_producto(id)
+        self._anotar_cambio(id, exito, anterior)
+        return exito, self.inventario.ultimo_mensaje
+
+    def _cmd_search(self, args: list) -> tuple:
+        """Ejecuta: search <texto>"""
+        if not args:
+            return False, "uso: search <texto>"
+        resultados = self.inventario.buscar_por_nombre(" ".join(args))
+        lineas = [f"{len(resultados)} resultado(s)"] + [f"    {p}" for p in resultados]
+        return True, "\n".join(lineas)
+
+    def _cmd_list(self, args: list) -> tuple:
+        """Ejecuta: list"""
+        lineas = [f"{len(self.inventario)} producto(s)"]
+        lineas.extend(f"    {p}" for p in self.inventario.iterar_productos())
+        return True, "\n".join(lineas)
+
+    # ========== EJECUCIÓN ==========
+
+    def ejecutar_linea(self, linea: str) -> tuple:
+        """
+        Interpreta y ejecuta una línea de comando.
+
+        Args:
+            linea (str): Línea con el comando y sus argumentos
+
+        Returns:
+            tuple: (bool éxito, str mensaje), o None si la línea está vacía o es comentario
+        """
+        partes = shlex.split(linea, comments=True)
+        if not partes:
+            return None
+
+        comando = self._comandos.get(partes[0].lower())
+        if comando is None:
+            return False, f"comando desconocido: {partes[0]}"
+
+        try:
+            return comando(partes[1:])
+        except ConflictoVersion as e:
+            return False, f"conflicto: {e}"
+        except ValueError as e:
+            return False, f"valor inválido: {e}"
+
+    def _revertir(self):
+        """
+        Deshace en memoria, del último al primero, los cambios del grupo que no se guardó.
+        Sus puntos pendientes se descartan de los historiales: el grupo nunca ocurrió.
+        """
+        for id, anterior in reversed(self._deshacer):
+            self.inventario.revertir_producto(id, anterior)
+        self._deshacer = []
+
+    def _ejecutar_grupo(self, grupo: list) -> tuple:
+        """
+        Ejecuta un grupo de líneas dentro de un lote del inventario (un solo guardado).
+        Si el guardado falla, los cambios del grupo se revierten en memoria y sus comandos
+        cuentan como errores.
+
+        Args:
+            grupo (list): Lista de tuplas (número de línea, texto)
+
+        Returns:
+            tuple: (cantidad de comandos correctos, cantidad de comandos con error)
+        """
+        resultados = []  # (número de línea, éxito, mensaje, modificó el inventario)
+        self._deshacer = []
+        with self.inventario.lote():
+            for numero, linea in grupo:
+                cambios_previos = len(self._deshacer)
+                try:
+                    resultado = self.ejecutar_linea(linea)
+                except ValueError as e:  # Comillas sin cerrar, etc.
+                    resultado = (False, f"línea mal formada: {e}")
+                if resultado is not None:
+                    resultados.append((numero, *resultado, len(self._deshacer) > cambios_previos))
+
+        guardado = self.inventario.guardado_lote_ok
+        if not guardado:
+            self._revertir()
+            # Las consultas (search, list) sí se hicieron; los cambios no quedaron
+            resultados = [(numero, False, "cambio revertido: no se pudo guardar el grupo", cambio)
+                          if cambio else (numero, exito, mensaje, cambio)
+                          for numero, exito, mensaje, cambio in resultados]
+        self._deshacer = []
+
+        correctos = sum(1 for _, exito, _, _ in resultados if exito)
+        errores = len(resultados) - correctos
+        reporte = [f"[{numero}] {'OK' if exito else 'ERROR'}: {mensaje}" for numero, exito, mensaje, _ in resultados]
+        if not guardado:
+            reporte.append("❌ Error: No se pudo guardar el grupo en archivo; sus cambios se revirtieron")
+
+        if reporte:
+            self.salida.write("\n".join(reporte) + "\n")
+        return correctos, errores
+
+    def ejecutar(self, fuente) -> dict:
+        """
+        Ejecuta todos los comandos de la fuente agrupándolos según tamano_grupo.
+
+        Args:
+            fuente: Iterable de líneas (archivo abierto, sys.stdin o lista)
+
+        Returns:
+            dict: Resumen con comandos correctos, errores, segundos y comandos por segundo
+        """
+        inicio = time.perf_counter()
+        correctos = errores = 0
+        grupo = []
+
+        for numero, linea in enumerate(fuente, 1):
+            grupo.append((numero, linea))
+            if len(grupo) >= self.tamano_grupo:
+                ok, fallidos = self._ejecutar_grupo(grupo)
+                correctos, errores = correctos + ok, errores + fallidos
+                grupo = []
+        if grupo:
+            ok, fallidos = self._ejecutar_grupo(grupo)
+            correctos, errores = correctos + ok, errores + fallidos
+
+        segundos = time.perf_counter() - inicio
+        total = correctos + errores
+        resumen = {
+            'correctos': correctos,
+            'errores': errores,
+            'segundos': segundos,
+            'comandos_por_segundo': total / segundos if segundos > 0 else 0.0,
+        }
+        self.salida.write(
+            f"\n📊 {total} comandos | {correctos} correctos | {errores} con error | "
+            f"{segundos:.3f} s | {resumen['comandos_por_segundo']:,.0f} comandos/s\n")
+        self.salida.flush()
+        return resumen
@@ -3,6 +3,24 @@ SISTEMA DE GESTIÓN DE INVENTARIOS - CLASE PRODUCTO
 Este archivo contiene la definición de la clase Producto con todas sus propiedades y métodos.
 """
 
+import unicodedata  # Para quitar tildes al normalizar nombres
+
+
+def normalizar_texto(texto: str) -> str:
+    """
+    Normaliza un texto para comparaciones: sin distinguir mayúsculas ni tildes
+    y con los espacios internos reducidos a uno ("  Azúcar   Morena " -> "azucar morena").
+
+    Args:
+        texto (str): Texto a normalizar
+
+    Returns:
+        str: Texto normalizado
+    """
+    descompuesto = unicodedata.normalize('NFKD', texto.casefold())
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.split())
+
 
 class Producto:
     """
@@ -10,7 +28,7 @@ class Producto:
     Utiliza propiedades (getters/setters) para garantizar la integridad de los datos.
     """
 
-    def __init__(self, id: int, nombre: str, cantidad: int, precio: float):
+    def __init__(self, id: int, nombre: str, cantidad: int, precio: float, version: int = 0):
         """
         Constructor de la clase Producto.
 
@@ -19,9 +37,11 @@ class Producto:
             nombre (str): Nombre descriptivo del producto (no puede estar vacío)
             cantidad (int): Cantidad disponible en inventario (no puede ser negativa)
             precio (float): Precio unitario del producto (no puede ser negativo)
+            version (int, optional): Número de versión para control de concurrencia. Default: 0
         """
         # Atributos privados para encapsulación
         self._id = id  # ID único, no cambia después de creado
+        self._version = version  # Aumenta con cada modificación confirmada
         self.nombre = nombre  # Usa el setter para validación
         self.cantidad = cantidad  # Usa el setter para validación
         self.precio = precio  # Usa el setter para validación
@@ -38,6 +58,11 @@ class Producto:
         """Devuelve el nombre del producto"""
         return self._nombre
 
+    @property
+    def clave_nombre(self) -> str:
+        """Devuelve el nombre normalizado (calculado una sola vez al asignar el nombre)"""
+        return self._clave_nombre
+
     @property
     def cantidad(self) -> int:
         """Devuelve la cantidad disponible en inventario"""
@@ -48,6 +73,21 @@ class Producto:
         """Devuelve el precio unitario del producto"""
         return self._precio
 
+    @property
+    def version(self) -> int:
+        """Devuelve la versión actual del producto (solo lectura)"""
+        return self._version
+
+    def incrementar_version(self) -> int:
+        """
+        Marca una nueva versión del producto tras una modificación confirmada.
+
+        Returns:
+            int: La nueva versión
+        """
+        self._version += 1
+        return self._version
+
     # ========== SETTERS CON VALIDACIÓN ==========
 
     @nombre.setter
@@ -64,6 +104,7 @@ class Producto:
         if not valor or not valor.strip():
             raise ValueError("El nombre no puede estar vacío")
         self._nombre = valor.strip()  # Elimina espacios extras
+        self._clave_nombre = normalizar_texto(self._nombre)  # Clave para búsquedas
 
     @cantidad.setter
     def cantidad(self, valor: int):
@@ -113,7 +154,8 @@ class Producto:
         Returns:
             str: Representación que puede ser usada para recrear el objeto
         """
-        return f"Producto(id={self._id}, nombre='{self._nombre}', cantidad={self._cantidad}, precio={self._precio})"
+        return (f"Producto(id={self._id}, nombre='{self._nombre}', cantidad={self._cantidad}, "
+                f"precio={self._precio}, version={self._version})")
 
     # ========== MÉTODOS PARA PERSISTENCIA ==========
 
@@ -129,7 +171,8 @@ class Producto:
             'id': self._id,
             'nombre': self._nombre,
             'cantidad': self._cantidad,
-            'precio': self._precio
+            'precio': self._precio,
+            'version': self._version
         }
 
     @classmethod
@@ -137,6 +180,7 @@ class Producto:
         """
         Crea un nuevo producto a partir de un diccionario.
         Esto permite reconstruir productos desde archivo JSON.
+        Los archivos anteriores sin 'version' se cargan con versión 0.
 
         Args:
             data (dict): Diccionario con los datos del producto
@@ -144,4 +188,30 @@ class Producto:
         Returns:
             Producto: Nueva instancia de Producto con los datos proporcionados
         """
-        return cls(data['id'], data['nombre'], data['cantidad'], data['precio'])
\ No newline at end of file
+        return cls(data['id'], data['nombre'], data['cantidad'], data['precio'], data.get('version', 0))
+
+    @classmethod
+    def restaurar(cls, id: int, nombre: str, clave_nombre: str, cantidad: int, precio: float, version: int):
+        """
+        Reconstruye un producto que el propio sistema ya validó y guardó (caché binaria del
+        inventario), sin volver a validar ni normalizar el nombre.
+
+        Args:
+            id (int): ID del producto
+            nombre (str): Nombre ya limpio
+            clave_nombre (str): Nombre normalizado
+            cantidad (int): Cantidad disponible
+            precio (float): Precio unitario
+            version (int): Versión del producto
+
+        Returns:
+            Producto: Producto con esos valores
+        """
+        producto = cls.__new__(cls)
+        producto._id = id
+        producto._version = version
+        producto._nombre = nombre
+        producto._clave_nombre = clave_nombre
+        producto._cantidad = cantidad
+        producto._precio = precio
+        return producto
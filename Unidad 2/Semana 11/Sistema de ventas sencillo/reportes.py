@@ -0,0 +1,135 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - REPORTES
+Este archivo contiene las funciones para exportar el inventario a HTML o CSV.
+Los reportes se generan con generadores y se escriben al archivo por bloques: en memoria
+no queda el reporte ni la lista de productos, solo la lista ordenada de IDs que se recorre.
+"""
+
+import csv  # Para el formato CSV
+import html  # Para escapar texto dentro del HTML
+import os  # Para detectar el formato por la extensión
+import time  # Para la fecha de generación
+
+TAMANO_BLOQUE = 64 * 1024  # Caracteres acumulados antes de cada escritura
+
+
+def escribir_por_bloques(ruta: str, fragmentos, tamano_bloque: int = TAMANO_BLOQUE) -> int:
+    """
+    Escribe en un archivo los fragmentos de texto producidos por un generador,
+    agrupándolos en bloques para hacer pocas escrituras.
+
+    Args:
+        ruta (str): Ruta del archivo de salida
+        fragmentos: Iterable de cadenas
+        tamano_bloque (int, optional): Caracteres por bloque. Default: 64 KiB
+
+    Returns:
+        int: Cantidad total de caracteres escritos
+    """
+    total = 0
+    with open(ruta, 'w', encoding='utf-8', newline='') as f:
+        bloque, tamano = [], 0
+        for fragmento in fragmentos:
+            bloque.append(fragmento)
+            tamano += len(fragmento)
+            if tamano >= tamano_bloque:
+                f.write("".join(bloque))
+                total += tamano
+                bloque, tamano = [], 0
+        if bloque:
+            f.write("".join(bloque))
+            total += tamano
+    return total
+
+
+def fragmentos_html_inventario(inventario):
+    """
+    Genera el reporte HTML del inventario: tabla de productos y resumen de valoración.
+    El resumen se calcula mientras se recorren las filas, en una sola pasada.
+
+    Args:
+        inventario (Inventario): Inventario a reportar
+
+    Yields:
+        str: Fragmentos consecutivos del documento HTML
+    """
+    fecha = time.strftime("%Y-%m-%d %H:%M")
+    yield ("<!DOCTYPE html>\n<html lang=\"es\">\n<head>\n<meta charset=\"utf-8\">\n"
+           "<title>Reporte de Inventario</title>\n"
+           "<style>table{border-collapse:collapse}td,th{border:1px solid #999;padding:4px 8px}"
+           "td.num{text-align:right}</style>\n</head>\n<body>\n"
+           f"<h1>Reporte de Inventario</h1>\n<p>Generado: {fecha}</p>\n"
+           "<table>\n<thead><tr><th>ID</th><th>Nombre</th><th>Cantidad</th>"
+           "<th>Precio</th><th>Valor</th></tr></thead>\n<tbody>\n")
+
+    total_productos = total_unidades = 0
+    total_valor = 0.0
+    for producto in inventario.iterar_productos():
+        valor = producto.cantidad * producto.precio
+        total_productos += 1
+        total_unidades += producto.cantidad
+        total_valor += valor
+        yield (f"<tr><td class=\"num\">{producto.id}</td><td>{html.escape(producto.nombre)}</td>"
+               f"<td class=\"num\">{producto.cantidad}</td><td class=\"num\">{producto.precio:.2f}</td>"
+               f"<td class=\"num\">{valor:.2f}</td></tr>\n")
+
+    yield ("</tbody>\n</table>\n<h2>Resumen de valoración</h2>\n<ul>\n"
+           f"<li>Productos: {total_productos}</li>\n"
+           f"<li>Unidades en stock: {total_unidades}</li>\n"
+           f"<li>Valor total: ${total_valor:,.2f}</li>\n"
+           "</ul>\n</body>\n</html>\n")
+
+
+def escribir_csv_inventario(inventario, ruta: str) -> int:
+    """
+    Escribe el inventario en CSV fila por fila, con una fila final de totales que deja
+    las unidades y el valor total en las columnas cantidad y valor.
+
+    Args:
+        inventario (Inventario): Inventario a reportar
+        ruta (str): Ruta del archivo de salida
+
+    Returns:
+        int: Cantidad de productos escritos
+    """
+    total_productos = total_unidades = 0
+    total_valor = 0.0
+    with open(ruta, 'w', encoding='utf-8', newline='', buffering=TAMANO_BLOQUE) as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["id", "nombre", "cantidad", "precio", "valor"])
+        for producto in inventario.iterar_productos():
+            valor = producto.cantidad * producto.precio
+            total_productos += 1
+            total_unidades += producto.cantidad
+            total_valor += valor
+            escritor.writerow([producto.id, producto.nombre, producto.cantidad,
+                               f"{producto.precio:.2f}", f"{valor:.2f}"])
+        escritor.writerow(["TOTAL", "", total_unidades, "", f"{total_valor:.2f}"])
+    return total_productos
+
+
+def exportar_reporte(inventario, ruta: str) -> bool:
+    """
+    Exporta el reporte del inventario; el formato se elige por la extensión (.html o .csv).
+
+    Args:
+        inventario (Inventario): Inventario a reportar
+        ruta (str): Ruta del archivo de salida
+
+    Returns:
+        bool: True si se generó correctamente, False si hubo error
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    try:
+        if extension == ".csv":
+            escribir_csv_inventario(inventario, ruta)
+        elif extension in (".html", ".htm"):
+            escribir_por_bloques(ruta, fragmentos_html_inventario(inventario))
+        else:
+            print(f"❌ Error: Formato no soportado '{extension}' (use .html o .csv)")
+            return False
+        print(f"✅ Reporte generado en {ruta}")
+        return True
+    except OSError as e:
+        print(f"❌ Error al escribir {ruta}: {e}")
+        return False
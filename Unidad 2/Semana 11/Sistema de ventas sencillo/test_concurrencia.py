@@ -0,0 +1,151 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - PRUEBA DE CONCURRENCIA
+Este archivo contiene una prueba de estrés del Inventario en modo concurrente: varios hilos
+venden, renombran, cambian precios, agregan y eliminan productos, consultan y guardan a la
+vez, y al final se comprueban los invariantes.
+
+Uso:
+    python -m unittest test_concurrencia
+"""
+
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from inventario import Inventario, ConflictoVersion
+from producto import Producto
+from ventas import RegistroVentas
+
+PRODUCTOS = 20  # Productos cuyo stock se conserva (IDs 1..PRODUCTOS)
+STOCK_INICIAL = 500
+ID_TEMPORALES = 1000  # Los hilos de altas y bajas usan IDs desde aquí
+
+
+def _claves_indexadas(arbol) -> set:
+    """Pares (clave, id) guardados en el árbol BK"""
+    pares = set()
+    pendientes = [arbol._raiz] if arbol._raiz is not None else []
+    while pendientes:
+        clave, ids, hijos = pendientes.pop()
+        pares.update((clave, id) for id in ids)
+        pendientes.extend(hijos.values())
+    return pares
+
+
+class TestInventarioConcurrente(unittest.TestCase):
+
+    def setUp(self):
+        self._carpeta = tempfile.TemporaryDirectory()
+        self.archivo = os.path.join(self._carpeta.name, "inventario.json")
+        self._salida = redirect_stdout(io.StringIO())  # Los mensajes de cada operación
+        self._salida.__enter__()
+        self.inventario = Inventario(self.archivo, concurrente=True)
+        with self.inventario.lote():
+            for id in range(1, PRODUCTOS + 1):
+                self.inventario.agregar_producto(Producto(id, f"Producto {id}", STOCK_INICIAL, 1.5))
+        self.inventario.buscar_aproximado("producto")  # Construye el índice antes de los hilos
+        self.ventas = RegistroVentas(self.inventario, os.path.join(self._carpeta.name, "ventas.log"))
+        self.errores = []
+        self._candado_errores = threading.Lock()
+
+    def tearDown(self):
+        self.ventas.cerrar()
+        self._salida.__exit__(None, None, None)
+        self._carpeta.cleanup()
+
+    def _fallo(self, mensaje):
+        with self._candado_errores:
+            self.errores.append(mensaje)
+
+    def test_invariantes_con_muchos_hilos(self):
+        vendidos = [0] * 6  # Unidades vendidas por cada hilo vendedor
+
+        def vendedor(numero):
+            azar = random.Random(numero)
+            for _ in range(300):
+                lineas = [(azar.randint(1, PRODUCTOS), azar.randint(1, 3)) for _ in range(azar.randint(1, 3))]
+                try:
+                    venta = self.ventas.vender(lineas)
+                except ValueError:
+                    continue  # Stock insuficiente: no se descontó nada
+                vendidos[numero] += sum(linea.cantidad for linea in venta.lineas)
+
+        def editor(numero):
+            azar = random.Random(100 + numero)
+            for i in range(200):
+                producto = self.inventario.obtener_por_id(azar.randint(1, PRODUCTOS))
+                version = producto.version
+                try:
+                    self.inventario.actualizar_producto(
+                        producto.id, version_esperada=version,
+                        nombre=f"Producto {producto.id} v{numero}-{i}", precio=round(azar.uniform(1, 9), 2))
+                except ConflictoVersion:
+                    pass  # Otro hilo lo modificó antes: se descarta este intento
+
+        def altas_y_bajas(numero):
+            for i in range(100):
+                id = ID_TEMPORALES + numero * 1000 + i
+                self.inventario.agregar_producto(Producto(id, f"Temporal {id}", 5, 2.0))
+                if i % 2:
+                    self.inventario.eliminar_producto(id)
+
+        def lector(numero):
+            vistas = {}  # {id: última versión vista}
+            azar = random.Random(200 + numero)
+            for _ in range(400):
+                for producto in self.inventario.obtener_todos():
+                    if producto.cantidad < 0:
+                        self._fallo(f"Stock negativo en {producto.id}: {producto.cantidad}")
+                    if producto.version < vistas.get(producto.id, 0):
+                        self._fallo(f"La versión de {producto.id} retrocedió")
+                    vistas[producto.id] = producto.version
+                self.inventario.buscar_por_nombre("producto")
+                self.inventario.buscar_aproximado(f"producto {azar.randint(1, PRODUCTOS)}", 1)
+
+        def guardador():
+            for _ in range(20):
+                if not self.inventario.guardar():
+                    self._fallo("No se pudo guardar el inventario")
+
+        hilos = ([threading.Thread(target=vendedor, args=(n,)) for n in range(len(vendidos))]
+                 + [threading.Thread(target=editor, args=(n,)) for n in range(3)]
+                 + [threading.Thread(target=altas_y_bajas, args=(n,)) for n in range(3)]
+                 + [threading.Thread(target=lector, args=(n,)) for n in range(4)]
+                 + [threading.Thread(target=guardador)])
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(self.errores, [])
+
+        # Ningún stock negativo y stock + unidades vendidas constante
+        conservados = [self.inventario.obtener_por_id(id) for id in range(1, PRODUCTOS + 1)]
+        self.assertTrue(all(p.cantidad >= 0 for p in conservados))
+        self.assertEqual(sum(p.cantidad for p in conservados) + sum(vendidos), PRODUCTOS * STOCK_INICIAL)
+
+        # Las altas sin baja quedaron; las bajas no
+        temporales = {p.id for p in self.inventario.obtener_todos() if p.id >= ID_TEMPORALES}
+        esperados = {ID_TEMPORALES + n * 1000 + i for n in range(3) for i in range(100) if not i % 2}
+        self.assertEqual(temporales, esperados)
+
+        # El índice aproximado coincide con el diccionario de productos
+        productos = self.inventario.obtener_todos()
+        self.assertEqual(_claves_indexadas(self.inventario._arbol_bk),
+                         {(p.clave_nombre, p.id) for p in productos})
+        self.assertEqual(len(self.inventario._arbol_bk), len(productos))
+
+        # Lo guardado al final es exactamente el estado en memoria
+        self.assertTrue(self.inventario.guardar())
+        with open(self.archivo, encoding='utf-8') as f:
+            guardados = {d['id']: d for d in json.load(f)}
+        self.assertEqual(guardados, {p.id: p.to_dict() for p in productos})
+
+
+if __name__ == "__main__":
+    unittest.main()
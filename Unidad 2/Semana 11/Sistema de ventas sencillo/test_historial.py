@@ -0,0 +1,96 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - PRUEBA DE HISTORIALES
+Este archivo contiene pruebas de los historiales de stock, precio y valoración: reconstruir
+la valoración tras recargar el inventario en el mismo segundo, no registrar los cambios de un
+grupo del modo por lotes que no se pudo guardar y recuperar un historial cuyo último registro
+quedó cortado.
+
+Uso:
+    python -m unittest test_historial
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from historial import HistorialValores
+from inventario import Inventario
+from procesador_lotes import ProcesadorLotes
+from producto import Producto
+
+AHORA = 1_700_000_000  # Reloj fijo: todo ocurre en el mismo segundo
+
+
+class TestHistoriales(unittest.TestCase):
+
+    def setUp(self):
+        self._carpeta = tempfile.TemporaryDirectory()
+        self.archivo = os.path.join(self._carpeta.name, "inventario.json")
+        self._salida = redirect_stdout(io.StringIO())  # Los mensajes de cada operación
+        self._salida.__enter__()
+
+    def tearDown(self):
+        self._salida.__exit__(None, None, None)
+        self._carpeta.cleanup()
+
+    def test_recarga_en_el_mismo_segundo(self):
+        with mock.patch('time.time', return_value=AHORA):
+            inventario = Inventario(self.archivo)
+            inventario.agregar_producto(Producto(1, "Arroz", 10, 1.5))
+            inventario.agregar_producto(Producto(2, "Azúcar", 5, 2.0))
+            inventario.actualizar_producto(1, cantidad=20)
+            self.assertEqual(inventario.valoracion_en(AHORA + 5), 40.0)
+
+            recargado = Inventario(self.archivo)
+            self.assertEqual(recargado.valor_total(), 40.0)
+            self.assertEqual(recargado.valoracion_en(AHORA + 5), 40.0)
+
+            recargado.actualizar_producto(2, cantidad=1)
+            otra_vez = Inventario(self.archivo)
+            self.assertEqual(otra_vez.valor_total(), 32.0)
+            self.assertEqual(otra_vez.valoracion_en(AHORA + 5), 32.0)
+
+    def test_grupo_de_lote_que_no_se_guardo(self):
+        with mock.patch('time.time', return_value=AHORA):
+            inventario = Inventario(self.archivo)
+            inventario.agregar_producto(Producto(1, "Arroz", 10, 1.5))
+            procesador = ProcesadorLotes(inventario, salida=io.StringIO())
+            with mock.patch('json.dump', side_effect=OSError("disco lleno")):
+                resumen = procesador.ejecutar(["update 1 cantidad=20", "update 1 precio=2",
+                                               "add 2 Azúcar 5 2.0", "delete 1"])
+            self.assertEqual(resumen['errores'], 4)
+            self.assertEqual(inventario.obtener_por_id(1).cantidad, 10)
+            self.assertIsNone(inventario.obtener_por_id(2))
+
+            # Lo que se guarde después no arrastra ni los cambios del grupo ni su vuelta atrás
+            inventario.actualizar_producto(1, cantidad=12)
+            recargado = Inventario(self.archivo)
+            self.assertEqual(recargado.historial_stock(1), [(AHORA, 10), (AHORA, 12)])
+            self.assertEqual(recargado.historial_precios(1), [(AHORA, 1.5)])
+            self.assertEqual(recargado.historial_stock(2), [])
+            self.assertEqual(recargado.valoracion_en(AHORA + 5), 18.0)
+
+    def test_registro_final_cortado(self):
+        ruta = os.path.join(self._carpeta.name, "stock.historial")
+        historial = HistorialValores(ruta)
+        for i in range(5):
+            historial.registrar(7, 100 + i, AHORA + i)
+        self.assertTrue(historial.vaciar())
+        tamano = os.path.getsize(ruta)
+        with open(ruta, 'ab') as f:
+            f.write(bytes([1, 7, 0x82]))  # Un cambio cortado a mitad de escritura
+
+        # Antes de escribir se descarta lo incompleto, así lo nuevo queda legible
+        historial = HistorialValores(ruta)
+        historial.registrar(7, 50, AHORA + 10)
+        self.assertTrue(historial.vaciar())
+        self.assertGreater(os.path.getsize(ruta), tamano)
+        self.assertEqual(HistorialValores(ruta).rango(7),
+                         [(AHORA + i, 100 + i) for i in range(5)] + [(AHORA + 10, 50)])
+
+
+if __name__ == "__main__":
+    unittest.main()
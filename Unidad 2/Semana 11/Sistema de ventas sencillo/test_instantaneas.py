@@ -0,0 +1,81 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - PRUEBA DE INSTANTÁNEAS
+Este archivo contiene pruebas de las instantáneas de solo lectura: publicar desde el inventario
+y consultar con LectorInstantanea, y publicar desde varios procesos a la vez sin repetir
+generaciones ni dejar generaciones viejas en disco.
+
+Uso:
+    python -m unittest test_instantaneas
+"""
+
+import io
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from instantaneas import (GENERACIONES_CONSERVADAS, LectorInstantanea, escribir_instantanea,
+                          generacion_actual, generaciones_publicadas)
+from inventario import Inventario
+from producto import Producto
+
+PROCESOS = 4
+PUBLICACIONES = 10  # Por proceso
+
+
+def _publicar_varias(ruta_base: str) -> list:
+    """Publica varias generaciones desde un proceso aparte y devuelve sus números"""
+    filas = [(id, f"Producto {id}", id, 1.0) for id in range(1, 50)]
+    return [escribir_instantanea(ruta_base, filas) for _ in range(PUBLICACIONES)]
+
+
+class TestInstantaneas(unittest.TestCase):
+
+    def setUp(self):
+        self._carpeta = tempfile.TemporaryDirectory()
+        self.ruta_base = os.path.join(self._carpeta.name, "inventario")
+        self._salida = redirect_stdout(io.StringIO())  # Los mensajes de cada operación
+        self._salida.__enter__()
+
+    def tearDown(self):
+        self._salida.__exit__(None, None, None)
+        self._carpeta.cleanup()
+
+    def test_publicar_y_consultar(self):
+        inventario = Inventario(self.ruta_base + ".json")
+        inventario.agregar_producto(Producto(1, "Café molido", 10, 2.5))
+        inventario.agregar_producto(Producto(2, "Azúcar", 4, 1.0))
+        self.assertEqual(inventario.publicar_snapshot(), 1)
+
+        with LectorInstantanea(self.ruta_base) as lector:
+            self.assertEqual(len(lector), 2)
+            self.assertEqual(lector.valor_total(), 29.0)
+            self.assertEqual(lector.obtener_por_id(2).nombre, "Azúcar")
+            self.assertEqual([p.id for p in lector.buscar_por_nombre("CAFE")], [1])
+
+            inventario.actualizar_producto(2, cantidad=0)
+            self.assertEqual(inventario.publicar_snapshot(), 2)
+            self.assertTrue(lector.actualizar())
+            self.assertEqual(lector.obtener_por_id(2).cantidad, 0)
+            self.assertFalse(lector.actualizar())
+
+    def test_publicadores_en_varios_procesos(self):
+        with ProcessPoolExecutor(PROCESOS) as ejecutor:
+            resultados = list(ejecutor.map(_publicar_varias, [self.ruta_base] * PROCESOS))
+
+        generaciones = sorted(g for resultado in resultados for g in resultado)
+        total = PROCESOS * PUBLICACIONES
+        self.assertEqual(generaciones, list(range(1, total + 1)))  # Ningún número repetido
+        self.assertEqual(generacion_actual(self.ruta_base), total)
+        self.assertEqual(generaciones_publicadas(self.ruta_base),
+                         list(range(total - GENERACIONES_CONSERVADAS, total + 1)))
+        self.assertEqual([n for n in os.listdir(self._carpeta.name) if n.endswith('.tmp')], [])
+
+        with LectorInstantanea(self.ruta_base) as lector:
+            self.assertEqual(lector.generacion, total)
+            self.assertEqual(len(lector), 49)
+
+
+if __name__ == "__main__":
+    unittest.main()
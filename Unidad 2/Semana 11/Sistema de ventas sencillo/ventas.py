@@ -0,0 +1,178 @@
+"""
+SISTEMA DE GESTIÓN DE INVENTARIOS - VENTAS
+Este archivo contiene las clases LineaVenta, Venta y RegistroVentas.
+RegistroVentas descuenta stock de forma atómica a través del Inventario (bajo los candados
+de los productos vendidos) y anota cada venta en un registro compacto de solo-anexado.
+"""
+
+import itertools  # Para generar IDs de venta consecutivos
+import threading  # Para los candados del registro
+import time  # Para la marca de tiempo de cada venta
+
+from inventario import Inventario
+
+
+class LineaVenta:
+    """
+    Clase que representa una línea de una venta: un producto, la cantidad y el precio aplicado.
+    """
+
+    __slots__ = ('id_producto', 'cantidad', 'precio_unitario')
+
+    def __init__(self, id_producto: int, cantidad: int, precio_unitario: float = 0.0):
+        """
+        Constructor de la clase LineaVenta.
+
+        Args:
+            id_producto (int): ID del producto vendido
+            cantidad (int): Unidades vendidas (debe ser mayor que cero)
+            precio_unitario (float, optional): Precio aplicado; se toma del producto al vender
+        """
+        if cantidad <= 0:
+            raise ValueError("La cantidad vendida debe ser mayor que cero")
+        self.id_producto = id_producto
+        self.cantidad = cantidad
+        self.precio_unitario = precio_unitario
+
+    @property
+    def subtotal(self) -> float:
+        """Devuelve cantidad * precio unitario"""
+        return self.cantidad * self.precio_unitario
+
+
+class Venta:
+    """
+    Clase que representa una venta confirmada con sus líneas.
+    """
+
+    def __init__(self, id: int, lineas: list, fecha: float = None):
+        """
+        Constructor de la clase Venta.
+
+        Args:
+            id (int): Identificador de la venta
+            lineas (list): Lista de LineaVenta
+            fecha (float, optional): Marca de tiempo (segundos desde epoch). Default: ahora
+        """
+        self.id = id
+        self.lineas = lineas
+        self.fecha = fecha if fecha is not None else time.time()
+
+    @property
+    def total(self) -> float:
+        """Devuelve el total de la venta"""
+        return sum(linea.subtotal for linea in self.lineas)
+
+    def __str__(self) -> str:
+        return f"Venta #{self.id} | {len(self.lineas)} línea(s) | Total: ${self.total:.2f}"
+
+
+class RegistroVentas:
+    """
+    Clase que registra ventas contra un Inventario.
+    El descuento lo hace Inventario.descontar_stock, todo o nada y bajo los candados de los
+    productos vendidos (en modo concurrente), que también fija el precio de cada línea.
+    """
+
+    def __init__(self, inventario: Inventario, archivo: str = "ventas.log"):
+        """
+        Constructor de la clase RegistroVentas.
+
+        Args:
+            inventario (Inventario): Inventario del que se descuenta el stock
+            archivo (str, optional): Archivo de registro de ventas. Default: "ventas.log"
+        """
+        self.inventario = inventario
+        self._archivo = archivo
+        self._candado_registro = threading.Lock()  # Serializa las escrituras al archivo
+        self._ids = itertools.count(self._ultimo_id_registrado() + 1)
+        self._candado_ids = threading.Lock()
+        # Archivo abierto una sola vez en modo anexado y con búfer
+        self._registro = open(self._archivo, 'a', encoding='utf-8', buffering=64 * 1024)
+        self._hay_cambios = False
+
+    def _ultimo_id_registrado(self) -> int:
+        """
+        Lee el último ID de venta del registro para continuar la numeración.
+
+        Returns:
+            int: Último ID encontrado o 0 si el registro no existe o está vacío
+        """
+        ultimo = 0
+        try:
+            with open(self._archivo, 'r', encoding='utf-8') as f:
+                for linea in f:
+                    campos = linea.split('|', 1)
+                    if campos[0].isdigit():
+                        ultimo = max(ultimo, int(campos[0]))
+        except FileNotFoundError:
+            pass
+        return ultimo
+
+    def vender(self, lineas: list) -> Venta:
+        """
+        Registra una venta descontando el stock de forma atómica.
+
+        Args:
+            lineas (list): Lista de LineaVenta o de tuplas (id_producto, cantidad)
+
+        Returns:
+            Venta: La venta registrada
+
+        Raises:
+            ValueError: Si no hay líneas, un producto no existe o el stock es insuficiente
+        """
+        lineas = [linea if isinstance(linea, LineaVenta) else LineaVenta(*linea) for linea in lineas]
+        if not lineas:
+            raise ValueError("La venta no tiene líneas")
+
+        # Agrupar por producto: cada uno se valida y descuenta una sola vez
+        por_producto = {}
+        for linea in lineas:
+            por_producto[linea.id_producto] = por_producto.get(linea.id_producto, 0) + linea.cantidad
+
+        # El precio se lee en la misma sección crítica que el descuento
+        precios = self.inventario.descontar_stock(por_producto)
+        for linea in lineas:
+            linea.precio_unitario = precios[linea.id_producto]
+
+        with self._candado_ids:
+            venta = Venta(next(self._ids), lineas)
+        self._anotar(venta)
+        return venta
+
+    def _anotar(self, venta: Venta):
+        """
+        Anexa la venta al registro: una línea compacta por cada línea de venta.
+        Formato: id_venta|marca_de_tiempo_ms|id_producto|cantidad|precio_unitario
+        """
+        marca = int(venta.fecha * 1000)
+        texto = "".join(f"{venta.id}|{marca}|{linea.id_producto}|{linea.cantidad}|{linea.precio_unitario}\n"
+                        for linea in venta.lineas)
+        with self._candado_registro:
+            self._registro.write(texto)
+            self._hay_cambios = True
+
+    def sincronizar(self) -> bool:
+        """
+        Vacía el búfer del registro y guarda el stock actualizado del inventario.
+
+        Returns:
+            bool: True si el inventario se guardó correctamente
+        """
+        with self._candado_registro:
+            self._registro.flush()
+            hay_cambios, self._hay_cambios = self._hay_cambios, False
+        return self.inventario.guardar() if hay_cambios else True
+
+    def cerrar(self) -> bool:
+        """
+        Sincroniza y cierra el archivo de registro.
+
+        Returns:
+            bool: True si el inventario se guardó correctamente
+        """
+        resultado = self.sincronizar()
+        with self._candado_registro:
+            self._registro.close()
+        return resultado
@@ -3,6 +3,21 @@ Sistema de Gestión de Biblioteca Digital - Biblioteca
 Descripción: Sistema completo para gestionar una biblioteca digital especializada en literatura ecuatoriana.
 """
 
+import csv
+import html
+import os
+import sqlite3
+import time
+from datetime import date, datetime
+
+from almacen_biblioteca import AlmacenBiblioteca, CatalogoLibros
+from bitacora_prestamos import BitacoraPrestamos, PRESTAMO, DEVOLUCION, cabe_en_bitacora
+from autocompletado import ArbolRadix
+from busqueda_texto import IndiceBM25
+from indice_invertido import IndiceInvertido, plegar
+from vencimientos import AgendaVencimientos, RevisionPeriodica, SEGUNDOS_POR_DIA, dias_de_retraso
+
+
 class Libro:
     """
     Clase que representa un libro en la biblioteca digital.
@@ -58,7 +73,7 @@ class Usuario:
         self.email = email
         self.telefono = telefono
         self.contraseña = contraseña  # Contraseña para iniciar sesión
-        self.libros_prestados = []  # Lista de libros actualmente prestados
+        self.libros_prestados = set()  # Libros actualmente prestados
         self.fecha_registro = "2024-05-20"  # Fecha actual simulada
         self.es_admin = (id_usuario == "admin")  # Usuario admin especial
 
@@ -67,7 +82,7 @@ class Usuario:
 
     def info_completa(self):
         """Devuelve información completa del usuario"""
-        libros = ", ".join([libro.titulo for libro in self.libros_prestados]) if self.libros_prestados else "Ninguno"
+        libros = ", ".join(sorted(libro.titulo for libro in self.libros_prestados)) if self.libros_prestados else "Ninguno"
         return f"""
 Nombre: {self.nombre}
 ID: {self.id_usuario}
@@ -83,15 +98,63 @@ Tipo: {'Administrador' if self.es_admin else 'Usuario regular'}
         return self.contraseña == contraseña
 
 
+class Prestamo:
+    """
+    Clase que representa un préstamo activo: qué libro tiene qué usuario, desde cuándo y
+    hasta cuándo.
+    """
+
+    def __init__(self, libro, usuario, fecha_prestamo, fecha_vencimiento):
+        self.libro = libro
+        self.usuario = usuario
+        self.fecha_prestamo = fecha_prestamo  # Segundos desde la época Unix
+        self.fecha_vencimiento = fecha_vencimiento  # Segundos desde la época Unix
+
+    def __str__(self):
+        desde = datetime.fromtimestamp(self.fecha_prestamo).strftime("%Y-%m-%d %H:%M")
+        vence = datetime.fromtimestamp(self.fecha_vencimiento).strftime("%Y-%m-%d")
+        return f"'{self.libro.titulo}' prestado a {self.usuario.nombre} desde {desde} (vence {vence})"
+
+    def dias_de_retraso(self, ahora=None):
+        """Días de retraso (cada día empezado cuenta); 0 si aún no vence"""
+        return dias_de_retraso(self.fecha_vencimiento, int(time.time()) if ahora is None else ahora)
+
+
 class BibliotecaEcuatoriana:
     """
     Clase principal que gestiona la biblioteca digital de literatura ecuatoriana.
     """
 
-    def __init__(self, nombre="Biblioteca Digital Ecuatoriana"):
+    # Campos de Libro con índice de palabras para las búsquedas
+    CAMPOS_BUSQUEDA = ("titulo", "autor", "categoria")
+    # Campos de Libro que se pueden autocompletar
+    CAMPOS_AUTOCOMPLETADO = ("titulo", "autor")
+    # Días de préstamo según el tipo de usuario y multa por cada día de retraso (USD)
+    DIAS_PRESTAMO = {"admin": 30, "regular": 14}
+    MULTA_POR_DIA = 0.25
+
+    def __init__(self, nombre="Biblioteca Digital Ecuatoriana", archivo="biblioteca.db", carpeta_historial=None):
         self.nombre = nombre
-        # Diccionario para libros (clave: ISBN, valor: objeto Libro)
-        self.libros = {}
+        # Base de datos SQLite con libros, usuarios y préstamos activos
+        self.almacen = AlmacenBiblioteca(archivo)
+
+        # Historial de préstamos: bitácora binaria junto a la base (biblioteca.db -> biblioteca_historial/)
+        if carpeta_historial is None:
+            carpeta_historial = os.path.splitext(archivo)[0] + "_historial"
+        self.bitacora = BitacoraPrestamos(carpeta_historial)
+
+        # Diccionario para libros (clave: ISBN, valor: objeto Libro), leídos de la base al consultarlos
+        self.libros = CatalogoLibros(self.almacen, Libro)
+
+        # Índices en memoria: se construyen en la primera búsqueda y luego se mantienen
+        self._indice = None  # Índice invertido por campo (palabra -> ISBNs)
+        self._autocompletado = None  # Árboles radix para autocompletar, por veces prestado
+
+        # Índice BM25 de título, autor y descripción; se carga del disco en la primera búsqueda
+        # (archivo junto a la base: biblioteca.db -> biblioteca_texto.idx)
+        self.archivo_indice_texto = os.path.splitext(archivo)[0] + "_texto.idx"
+        self._indice_texto = None
+        self._indice_texto_pendiente = False  # Hay cambios sin guardar en el archivo del índice
 
         # Conjunto para IDs de usuarios únicos
         self.ids_usuarios = set()
@@ -102,12 +165,20 @@ class BibliotecaEcuatoriana:
         # Usuario actualmente logueado
         self.usuario_actual = None
 
-        # Lista para historial de préstamos
-        self.historial_prestamos = []
+        # Préstamos activos (clave: ISBN, valor: objeto Prestamo)
+        self.prestamos_activos = {}
+
+        # Vencimientos de los préstamos activos y revisión periódica en segundo plano
+        self.vencimientos = AgendaVencimientos()
+        self._revision = None
+        self.al_vencer = self._avisar_vencimiento  # Se llama con (prestamo, dias, multa)
 
-        # Inicializar con libros ecuatorianos
-        self._inicializar_biblioteca()
-        self._inicializar_usuario_admin()
+        # Inicializar con libros ecuatorianos solo la primera vez
+        if self.almacen.contadores["total_libros"] == 0:
+            self._inicializar_biblioteca()
+        self._cargar_usuarios()
+        if "admin" not in self.usuarios:
+            self._inicializar_usuario_admin()
 
     def _inicializar_biblioteca(self):
         """Inicializa la biblioteca con libros ecuatorianos"""
@@ -149,15 +220,119 @@ class BibliotecaEcuatoriana:
              "Antología poética del autor ambateño"),
         ]
 
-        for libro_info in libros_ecuatorianos:
-            libro = Libro(*libro_info)
-            self.libros[libro.isbn] = libro
+        self.libros.agregar_varios([Libro(*libro_info) for libro_info in libros_ecuatorianos])
 
         print(f"Biblioteca '{self.nombre}' inicializada con {len(self.libros)} libros ecuatorianos.")
 
+    def _cargar_usuarios(self):
+        """Carga los usuarios y sus préstamos activos (solo se leen los libros prestados)"""
+        for fila in self.almacen.iterar_usuarios():
+            usuario = Usuario(*fila[:5])
+            usuario.fecha_registro = fila[5]
+            self.ids_usuarios.add(usuario.id_usuario)
+            self.usuarios[usuario.id_usuario] = usuario
+        for isbn, id_usuario, fecha_prestamo, fecha_vencimiento in self.almacen.prestamos_activos():
+            usuario = self.usuarios[id_usuario]
+            libro = self.libros[isbn]
+            usuario.libros_prestados.add(libro)
+            self.prestamos_activos[isbn] = Prestamo(libro, usuario, fecha_prestamo, fecha_vencimiento)
+            self.vencimientos.programar(isbn, fecha_vencimiento)
+
+    @property
+    def indice(self):
+        """Índice invertido de búsqueda; se construye recorriendo el catálogo una sola vez"""
+        if self._indice is None:
+            indice = IndiceInvertido(self.CAMPOS_BUSQUEDA)
+            for libro in self.libros.values():
+                for campo in self.CAMPOS_BUSQUEDA:
+                    indice.agregar(libro.isbn, campo, getattr(libro, campo))
+            self._indice = indice
+        return self._indice
+
+    @property
+    def autocompletado(self):
+        """Árboles de autocompletado por campo; se construyen en la primera consulta"""
+        if self._autocompletado is None:
+            arboles = {campo: ArbolRadix() for campo in self.CAMPOS_AUTOCOMPLETADO}
+            for libro in self.libros.values():
+                for campo, arbol in arboles.items():
+                    arbol.insertar(getattr(libro, campo), libro.veces_prestado)
+            self._autocompletado = arboles
+        return self._autocompletado
+
+    def _indexar_libro(self, libro):
+        """Agrega el libro a los índices que ya estén construidos"""
+        if self._indice is not None:
+            for campo in self.CAMPOS_BUSQUEDA:
+                self._indice.agregar(libro.isbn, campo, getattr(libro, campo))
+        if self._autocompletado is not None:
+            for campo, arbol in self._autocompletado.items():
+                arbol.insertar(getattr(libro, campo), libro.veces_prestado)
+        if self._indice_texto is not None:
+            self._indice_texto.agregar(libro.isbn, self._texto_libro(libro))
+            self._indice_texto_pendiente = True
+
+    def _desindexar_libro(self, libro):
+        """Quita el libro de los índices que ya estén construidos"""
+        if self._indice is not None:
+            for campo in self.CAMPOS_BUSQUEDA:
+                self._indice.quitar(libro.isbn, campo, getattr(libro, campo))
+        if self._autocompletado is not None:
+            for campo, arbol in self._autocompletado.items():
+                arbol.quitar(getattr(libro, campo), libro.veces_prestado)
+        if self._indice_texto is not None:
+            self._indice_texto.quitar(libro.isbn)
+            self._indice_texto_pendiente = True
+
+    @staticmethod
+    def _texto_libro(libro):
+        """Texto del libro que se indexa para la búsqueda por tema"""
+        return f"{libro.titulo} {libro.autor} {libro.descripcion}"
+
+    def _firma_catalogo(self):
+        """Identifica el catálogo indexado; si cambia, el índice guardado ya no sirve"""
+        return self.almacen.firma_catalogo()
+
+    @property
+    def indice_texto(self):
+        """Índice BM25: se lee del archivo si está al día o se reconstruye y se guarda"""
+        if self._indice_texto is None:
+            firma = self._firma_catalogo()
+            indice = IndiceBM25.cargar(self.archivo_indice_texto, firma)
+            if indice is None:
+                indice = IndiceBM25()
+                for libro in self.libros.values():
+                    indice.agregar(libro.isbn, self._texto_libro(libro))
+                indice.firma = firma
+                self._guardar_indice(indice)
+            self._indice_texto = indice
+        return self._indice_texto
+
+    def _guardar_indice(self, indice):
+        """Escribe el índice de texto en disco; si no se puede, solo se pierde el arranque rápido"""
+        try:
+            indice.guardar(self.archivo_indice_texto)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el índice de búsqueda: {e}")
+
+    def guardar_indice_texto(self):
+        """Guarda en disco los cambios del índice de texto hechos al añadir o quitar libros"""
+        if self._indice_texto is not None and self._indice_texto_pendiente:
+            self._indice_texto.firma = self._firma_catalogo()
+            self._guardar_indice(self._indice_texto)
+            self._indice_texto_pendiente = False
+
+    def cerrar(self):
+        """Guarda lo pendiente y cierra la base de datos y la bitácora"""
+        self.detener_revision_vencimientos()
+        self.guardar_indice_texto()
+        self.bitacora.cerrar()
+        self.almacen.cerrar()
+
     def _inicializar_usuario_admin(self):
         """Crea un usuario administrador por defecto"""
         admin = Usuario("Administrador", "admin", "admin@biblioteca.edu.ec", "0000000000", "admin123")
+        self.almacen.insertar_usuario(admin)
         self.ids_usuarios.add("admin")
         self.usuarios["admin"] = admin
 
@@ -184,6 +359,9 @@ class BibliotecaEcuatoriana:
             if id_usuario in self.ids_usuarios:
                 print("❌ Este ID ya existe. Por favor, elija otro.")
                 continue
+            if not cabe_en_bitacora(id_usuario):
+                print("❌ El ID de usuario es demasiado largo (máximo 20 caracteres).")
+                continue
 
             nombre = input("Nombre completo: ")
             email = input("Email: ")
@@ -196,6 +374,11 @@ class BibliotecaEcuatoriana:
                 continue
 
             nuevo_usuario = Usuario(nombre, id_usuario, email, telefono, contraseña)
+            try:
+                self.almacen.insertar_usuario(nuevo_usuario)
+            except sqlite3.Error as e:
+                print(f"❌ No se pudo registrar el usuario: {e}")
+                return
             self.ids_usuarios.add(id_usuario)
             self.usuarios[id_usuario] = nuevo_usuario
 
@@ -241,8 +424,17 @@ class BibliotecaEcuatoriana:
             print(f"❌ El libro con ISBN {isbn} ya existe en la biblioteca.")
             return False
 
+        if not cabe_en_bitacora(isbn):
+            print("❌ El ISBN es demasiado largo (máximo 20 caracteres).")
+            return False
+
         libro = Libro(titulo, autor, categoria, isbn, año_publicacion, editorial, descripcion)
-        self.libros[isbn] = libro
+        try:
+            self.libros[isbn] = libro
+        except sqlite3.Error as e:
+            print(f"❌ No se pudo guardar el libro: {e}")
+            return False
+        self._indexar_libro(libro)
         print(f"✅ Libro '{titulo}' añadido correctamente.")
         return True
 
@@ -257,7 +449,12 @@ class BibliotecaEcuatoriana:
             print(f"❌ No se puede eliminar '{libro.titulo}' porque está prestado.")
             return False
 
-        del self.libros[isbn]
+        try:
+            del self.libros[isbn]
+        except (KeyError, sqlite3.Error):
+            print(f"❌ No se pudo eliminar '{libro.titulo}'.")
+            return False
+        self._desindexar_libro(libro)
         print(f"✅ Libro '{libro.titulo}' eliminado correctamente.")
         return True
 
@@ -282,17 +479,32 @@ class BibliotecaEcuatoriana:
             print(f"❌ {usuario.nombre} ya tiene el máximo de 5 libros prestados.")
             return False
 
+        # Guardar el préstamo en la base de datos (una sola transacción)
+        instante = int(time.time())
+        vence = self._calcular_vencimiento(usuario, instante)
+        try:
+            registrado = self.almacen.registrar_prestamo(isbn, id_usuario, instante, vence,
+                                                         plegar(libro.categoria))
+        except sqlite3.Error as e:
+            print(f"❌ No se pudo registrar el préstamo: {e}")
+            return False
+        if not registrado:
+            print(f"❌ '{libro.titulo}' no está disponible.")
+            return False
+
         # Realizar el préstamo
         libro.disponible = False
         libro.veces_prestado += 1
-        usuario.libros_prestados.append(libro)
-
-        # Registrar en el historial
-        from datetime import datetime
-        fecha_prestamo = datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.historial_prestamos.append((libro, usuario, "préstamo", fecha_prestamo))
-
-        print(f"✅ '{libro.titulo}' prestado a {usuario.nombre}.")
+        usuario.libros_prestados.add(libro)
+        self.prestamos_activos[isbn] = Prestamo(libro, usuario, instante, vence)
+        self.vencimientos.programar(isbn, vence)
+        if self._autocompletado is not None:
+            for campo, arbol in self._autocompletado.items():
+                arbol.sumar(getattr(libro, campo))
+        self._registrar_evento(isbn, id_usuario, PRESTAMO, instante)
+
+        print(f"✅ '{libro.titulo}' prestado a {usuario.nombre} hasta el "
+              f"{datetime.fromtimestamp(vence).strftime('%Y-%m-%d')}.")
         return True
 
     def devolver_libro(self, isbn, id_usuario):
@@ -308,33 +520,92 @@ class BibliotecaEcuatoriana:
         libro = self.libros[isbn]
         usuario = self.usuarios[id_usuario]
 
-        if libro not in usuario.libros_prestados:
+        prestamo = self.prestamos_activos.get(isbn)
+        if prestamo is None or prestamo.usuario is not usuario:
+            print(f"❌ {usuario.nombre} no tiene prestado '{libro.titulo}'.")
+            return False
+
+        # Guardar la devolución en la base de datos (una sola transacción)
+        try:
+            registrado = self.almacen.registrar_devolucion(isbn, id_usuario)
+        except sqlite3.Error as e:
+            print(f"❌ No se pudo registrar la devolución: {e}")
+            return False
+        if not registrado:
             print(f"❌ {usuario.nombre} no tiene prestado '{libro.titulo}'.")
             return False
 
         # Realizar la devolución
         libro.disponible = True
-        usuario.libros_prestados.remove(libro)
-
-        # Registrar en el historial
-        from datetime import datetime
-        fecha_devolucion = datetime.now().strftime("%Y-%m-%d %H:%M")
-        self.historial_prestamos.append((libro, usuario, "devolución", fecha_devolucion))
+        usuario.libros_prestados.discard(libro)
+        del self.prestamos_activos[isbn]
+        self.vencimientos.cancelar(isbn)
+        self._registrar_evento(isbn, id_usuario, DEVOLUCION)
 
         print(f"✅ '{libro.titulo}' devuelto por {usuario.nombre}.")
+        dias = prestamo.dias_de_retraso()
+        if dias:
+            print(f"⚠️  Devuelto con {dias} día(s) de retraso. Multa: ${self.calcular_multa(dias):.2f}")
         return True
 
+    def _buscar_lineal(self, campo, texto):
+        """Búsqueda por subcadena recorriendo todo el catálogo (respaldo del índice)"""
+        consulta = plegar(texto)
+        return [libro for libro in self.libros.values() if consulta in plegar(getattr(libro, campo))]
+
+    def _buscar(self, campo, texto):
+        """
+        Busca libros cuyo campo contiene el texto (sin distinguir mayúsculas ni tildes).
+        El índice da los candidatos y luego se verifica la subcadena completa, en el orden
+        del catálogo: el resultado es el mismo que con _buscar_lineal ("la" también encuentra
+        "Las cruces" y "Salas"). Si la consulta no tiene palabras, o casi todo el catálogo es
+        candidato, se recorre el catálogo directamente.
+        """
+        candidatos = self.indice.candidatos(campo, texto)
+        if candidatos is None or 2 * len(candidatos) > len(self.libros):
+            return self._buscar_lineal(campo, texto)
+
+        consulta = plegar(texto)
+        libros = (self.libros[isbn] for isbn in self.indice.ordenar(candidatos))
+        return [libro for libro in libros if consulta in plegar(getattr(libro, campo))]
+
     def buscar_por_titulo(self, titulo):
         """Busca libros por título."""
-        return [libro for libro in self.libros.values() if titulo.lower() in libro.titulo.lower()]
+        return self._buscar("titulo", titulo)
 
     def buscar_por_autor(self, autor):
         """Busca libros por autor."""
-        return [libro for libro in self.libros.values() if autor.lower() in libro.autor.lower()]
+        return self._buscar("autor", autor)
 
     def buscar_por_categoria(self, categoria):
         """Busca libros por categoría."""
-        return [libro for libro in self.libros.values() if categoria.lower() in libro.categoria.lower()]
+        return self._buscar("categoria", categoria)
+
+    def buscar_texto(self, consulta, limite=10):
+        """
+        Búsqueda por tema en título, autor y descripción, ordenada por relevancia (BM25).
+        Devuelve una lista de pares (Libro, puntaje).
+        """
+        return [(self.libros[isbn], puntaje) for isbn, puntaje in self.indice_texto.buscar(consulta, limite)]
+
+    def autocompletar(self, prefijo, campo='titulo', limite=10):
+        """
+        Sugiere títulos o autores que empiezan con el prefijo, los más prestados primero.
+        Cada nodo del árbol ya guarda sus mejores textos, así que el costo depende del
+        largo del prefijo y no del tamaño del catálogo.
+        """
+        if campo not in self.autocompletado:
+            raise ValueError(f"Campo '{campo}' no válido. Use: {', '.join(self.CAMPOS_AUTOCOMPLETADO)}")
+        return self.autocompletado[campo].sugerir(prefijo, limite)
+
+    def ranking(self, categoria=None, periodo="mes", n=10, fecha=None):
+        """
+        Los n libros más prestados de una categoría (o de todas) en el día, la semana o el mes
+        que contiene la fecha (por defecto, hoy). Devuelve una lista de pares (Libro, préstamos).
+        """
+        clave = plegar(categoria) if categoria else "*"
+        filas = self.almacen.ranking(periodo, fecha or date.today(), clave, n)
+        return [(self.libros[isbn], veces) for isbn, veces in filas]
 
     def buscar_por_isbn(self, isbn):
         """Busca un libro por ISBN."""
@@ -345,25 +616,99 @@ class BibliotecaEcuatoriana:
         if id_usuario not in self.ids_usuarios:
             print(f"❌ No existe ningún usuario con ID {id_usuario}.")
             return []
-        return self.usuarios[id_usuario].libros_prestados
+        return sorted(self.usuarios[id_usuario].libros_prestados, key=lambda libro: libro.titulo)
 
     def listar_todos_libros_prestados(self):
         """Lista todos los libros actualmente prestados."""
-        return [libro for usuario in self.usuarios.values() for libro in usuario.libros_prestados]
+        return [prestamo.libro for prestamo in self.prestamos_activos.values()]
+
+    def quien_tiene(self, isbn):
+        """Devuelve el préstamo activo del libro (usuario y fecha) o None si no está prestado."""
+        return self.prestamos_activos.get(isbn)
+
+    # ========== VENCIMIENTOS ==========
+
+    def _calcular_vencimiento(self, usuario, instante):
+        """Vencimiento de un préstamo hecho en el instante, según el tipo de usuario"""
+        tipo = "admin" if usuario.es_admin else "regular"
+        return instante + self.DIAS_PRESTAMO[tipo] * SEGUNDOS_POR_DIA
+
+    def calcular_multa(self, dias_retraso):
+        """Multa en dólares por los días de retraso"""
+        return round(dias_retraso * self.MULTA_POR_DIA, 2)
+
+    def listar_prestamos_vencidos(self, ahora=None):
+        """
+        Préstamos vencidos, del más atrasado al más reciente. Solo se revisan las entradas
+        ya vencidas de la agenda, no todos los préstamos.
+
+        Returns:
+            list: Tuplas (prestamo, dias de retraso, multa)
+        """
+        if ahora is None:
+            ahora = int(time.time())
+        vencidos = []
+        for _, isbn in self.vencimientos.vencidos(ahora):
+            prestamo = self.prestamos_activos.get(isbn)
+            if prestamo is not None:
+                dias = prestamo.dias_de_retraso(ahora)
+                vencidos.append((prestamo, dias, self.calcular_multa(dias)))
+        return vencidos
+
+    def revisar_vencimientos(self, ahora=None):
+        """
+        Avisa (con al_vencer) de cada préstamo que venció desde la revisión anterior.
+
+        Returns:
+            int: Número de préstamos que vencieron
+        """
+        if ahora is None:
+            ahora = int(time.time())
+        avisados = 0
+        for _, isbn in self.vencimientos.revisar(ahora):
+            prestamo = self.prestamos_activos.get(isbn)
+            if prestamo is None:
+                continue  # Devuelto mientras se revisaba
+            dias = prestamo.dias_de_retraso(ahora)
+            self.al_vencer(prestamo, dias, self.calcular_multa(dias))
+            avisados += 1
+        return avisados
+
+    def _avisar_vencimiento(self, prestamo, dias, multa):
+        print(f"\n⚠️  Préstamo vencido: {prestamo} - {dias} día(s) de retraso, multa ${multa:.2f}")
+
+    def iniciar_revision_vencimientos(self, intervalo=60):
+        """Revisa los vencimientos en segundo plano cada intervalo (segundos)"""
+        if self._revision is None:
+            self._revision = RevisionPeriodica(self.revisar_vencimientos, intervalo)
+            self._revision.iniciar()
+
+    def detener_revision_vencimientos(self):
+        if self._revision is not None:
+            self._revision.detener()
+            self._revision = None
 
     def listar_libros_disponibles(self):
         """Lista todos los libros disponibles."""
         return [libro for libro in self.libros.values() if libro.disponible]
 
-    def estadisticas(self):
-        """Muestra estadísticas de la biblioteca."""
-        total_libros = len(self.libros)
-        libros_prestados = len(self.listar_todos_libros_prestados())
+    def estadisticas(self, top=5):
+        """
+        Muestra estadísticas de la biblioteca.
+        Los totales son contadores que se actualizan en cada préstamo, devolución, alta y baja,
+        así que no se recorre el catálogo ni el historial.
+        """
+        contadores = self.almacen.contadores
+        total_libros = contadores["total_libros"]
+        libros_prestados = contadores["libros_prestados"]
         libros_disponibles = total_libros - libros_prestados
         total_usuarios = len(self.usuarios)
-        total_prestamos = len([p for p in self.historial_prestamos if p[2] == "préstamo"])
+        total_prestamos = contadores["total_prestamos"]
 
-        libro_mas_popular = max(self.libros.values(), key=lambda x: x.veces_prestado, default=None)
+        mas_prestados = [self.libros[isbn] for isbn in self.almacen.mas_prestados(top)]
+        libro_mas_popular = mas_prestados[0] if mas_prestados else None
+        ranking = "\n".join(f"  {i}. {libro.titulo} ({libro.veces_prestado})"
+                            for i, libro in enumerate(mas_prestados, 1)) or "  Ninguno"
 
         return f"""
 📊 ESTADÍSTICAS DE LA BIBLIOTECA 📊
@@ -373,24 +718,140 @@ Libros prestados: {libros_prestados}
 Total de usuarios: {total_usuarios}
 Total de préstamos: {total_prestamos}
 Libro más popular: {libro_mas_popular.titulo if libro_mas_popular else 'Ninguno'} ({libro_mas_popular.veces_prestado if libro_mas_popular else 0} préstamos)
+Más prestados:
+{ranking}
         """.strip()
 
+    def _fragmentos_reporte_html(self):
+        """Genera el reporte HTML (catálogo, resumen e historial) fragmento por fragmento"""
+        yield ("<!DOCTYPE html>\n<html lang=\"es\">\n<head>\n<meta charset=\"utf-8\">\n"
+               f"<title>{html.escape(self.nombre)}</title>\n"
+               "<style>table{border-collapse:collapse}td,th{border:1px solid #999;padding:4px 8px}</style>\n"
+               f"</head>\n<body>\n<h1>{html.escape(self.nombre)}</h1>\n<h2>Catálogo</h2>\n"
+               "<table>\n<thead><tr><th>ISBN</th><th>Título</th><th>Autor</th><th>Categoría</th>"
+               "<th>Año</th><th>Estado</th><th>Veces prestado</th></tr></thead>\n<tbody>\n")
+
+        prestados = 0
+        for libro in self.libros.values():
+            if not libro.disponible:
+                prestados += 1
+            estado = "Disponible" if libro.disponible else "Prestado"
+            yield (f"<tr><td>{html.escape(libro.isbn)}</td><td>{html.escape(libro.titulo)}</td>"
+                   f"<td>{html.escape(libro.autor)}</td><td>{html.escape(libro.categoria)}</td>"
+                   f"<td>{libro.año_publicacion}</td><td>{estado}</td><td>{libro.veces_prestado}</td></tr>\n")
+
+        yield ("</tbody>\n</table>\n<h2>Resumen</h2>\n<ul>\n"
+               f"<li>Total de libros: {len(self.libros)}</li>\n"
+               f"<li>Libros disponibles: {len(self.libros) - prestados}</li>\n"
+               f"<li>Libros prestados: {prestados}</li>\n"
+               f"<li>Total de usuarios: {len(self.usuarios)}</li>\n"
+               "</ul>\n<h2>Historial de préstamos</h2>\n"
+               "<table>\n<thead><tr><th>Fecha</th><th>Usuario</th><th>Acción</th><th>Libro</th></tr></thead>\n<tbody>\n")
+
+        for evento in self.bitacora.iterar():
+            fecha, accion, titulo, nombre_usuario = self._describir_evento(evento)
+            yield (f"<tr><td>{fecha}</td><td>{html.escape(nombre_usuario)}</td><td>{accion}</td>"
+                   f"<td>{html.escape(titulo)}</td></tr>\n")
+
+        yield "</tbody>\n</table>\n</body>\n</html>\n"
+
+    def _escribir_reporte_csv(self, ruta):
+        """Escribe el reporte en CSV, fila por fila, con una sección por tabla"""
+        with open(ruta, 'w', encoding='utf-8', newline='', buffering=64 * 1024) as f:
+            escritor = csv.writer(f)
+            escritor.writerow(["# Catálogo"])
+            escritor.writerow(["isbn", "titulo", "autor", "categoria", "año", "estado", "veces_prestado"])
+            prestados = 0
+            for libro in self.libros.values():
+                if not libro.disponible:
+                    prestados += 1
+                escritor.writerow([libro.isbn, libro.titulo, libro.autor, libro.categoria, libro.año_publicacion,
+                                   "Disponible" if libro.disponible else "Prestado", libro.veces_prestado])
+
+            escritor.writerow([])
+            escritor.writerow(["# Resumen"])
+            escritor.writerow(["total_libros", "disponibles", "prestados", "usuarios"])
+            escritor.writerow([len(self.libros), len(self.libros) - prestados, prestados, len(self.usuarios)])
+
+            escritor.writerow([])
+            escritor.writerow(["# Historial de préstamos"])
+            escritor.writerow(["fecha", "id_usuario", "accion", "isbn"])
+            for evento in self.bitacora.iterar():
+                escritor.writerow([self._formatear_instante(evento.instante), evento.id_usuario,
+                                   evento.accion, evento.isbn])
+
+    def exportar_reporte(self, ruta):
+        """Exporta catálogo, resumen e historial a HTML o CSV según la extensión del archivo."""
+        extension = os.path.splitext(ruta)[1].lower()
+        try:
+            if extension == ".csv":
+                self._escribir_reporte_csv(ruta)
+            elif extension in (".html", ".htm"):
+                # El búfer del archivo agrupa los fragmentos en bloques: la memoria no depende del catálogo
+                with open(ruta, 'w', encoding='utf-8', newline='', buffering=64 * 1024) as f:
+                    f.writelines(self._fragmentos_reporte_html())
+            else:
+                print(f"❌ Formato no soportado '{extension}'. Use .html o .csv")
+                return False
+        except OSError as e:
+            print(f"❌ No se pudo escribir el reporte: {e}")
+            return False
+        print(f"✅ Reporte generado en {ruta}")
+        return True
+
+    def consultar_historial(self, usuario=None, isbn=None, desde=None, hasta=None):
+        """
+        Eventos del historial de un usuario y/o un libro, opcionalmente en un rango de fechas.
+        desde y hasta pueden ser date (el día completo) o datetime; ambos extremos se incluyen.
+        Devuelve una lista de tuplas (fecha, PRESTADO/DEVUELTO, título, nombre del usuario).
+        """
+        if isinstance(desde, date) and not isinstance(desde, datetime):
+            desde = datetime.combine(desde, datetime.min.time())
+        if isinstance(hasta, date) and not isinstance(hasta, datetime):
+            hasta = datetime.combine(hasta, datetime.max.time())
+        eventos = self.bitacora.consultar(usuario, isbn,
+                                          int(desde.timestamp()) if desde else None,
+                                          int(hasta.timestamp()) if hasta else None)
+        return [self._describir_evento(evento) for evento in eventos]
+
+    def _registrar_evento(self, isbn, id_usuario, accion, instante=None):
+        """Anexa el evento a la bitácora; si falla, el préstamo ya quedó guardado igual"""
+        try:
+            self.bitacora.registrar(isbn, id_usuario, accion, instante)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  No se pudo registrar el evento en el historial: {e}")
+
+    @staticmethod
+    def _formatear_instante(instante):
+        return datetime.fromtimestamp(instante).strftime("%Y-%m-%d %H:%M")
+
+    def _describir_evento(self, evento):
+        """(fecha, PRESTADO/DEVUELTO, título, nombre del usuario) de un evento de la bitácora"""
+        libro = self.libros.get(evento.isbn)
+        usuario = self.usuarios.get(evento.id_usuario)
+        accion = "PRESTADO" if evento.accion == "préstamo" else "DEVUELTO"
+        return (self._formatear_instante(evento.instante), accion,
+                libro.titulo if libro else evento.isbn,
+                usuario.nombre if usuario else evento.id_usuario)
+
     def mostrar_historial_prestamos(self, limite=10):
         """Muestra el historial reciente de préstamos."""
-        if not self.historial_prestamos:
+        eventos = self.bitacora.ultimos(limite)
+        if not eventos:
             print("No hay historial de préstamos.")
             return
 
         print(f"\n📋 HISTORIAL DE PRÉSTAMOS (últimos {limite}) 📋")
-        for i, (libro, usuario, tipo, fecha) in enumerate(self.historial_prestamos[-limite:], 1):
-            accion = "PRESTADO" if tipo == "préstamo" else "DEVUELTO"
-            print(f"{i}. {fecha} - {usuario.nombre} {accion} '{libro.titulo}'")
+        for i, evento in enumerate(eventos, 1):
+            fecha, accion, titulo, nombre_usuario = self._describir_evento(evento)
+            print(f"{i}. {fecha} - {nombre_usuario} {accion} '{titulo}'")
 
 
 # Función para mostrar menú interactivo
 def menu_principal():
     """Menú interactivo para la biblioteca"""
     biblioteca = BibliotecaEcuatoriana()
+    biblioteca.iniciar_revision_vencimientos()
 
     # Sistema de autenticación
     while True:
@@ -410,6 +871,7 @@ def menu_principal():
         elif opcion == "2":
             biblioteca.registrar_nuevo_usuario()
         elif opcion == "0":
+            biblioteca.cerrar()
             print("¡Hasta pronto!")
             return
         else:
@@ -435,6 +897,10 @@ def menu_principal():
             print("9. Añadir libro")
             print("10. Quitar libro")
             print("11. Ver usuarios registrados")
+            print("12. Exportar reporte (HTML/CSV)")
+            print("13. Ranking de préstamos por categoría y período")
+            print("14. Consultar historial por usuario, libro o fechas")
+            print("15. Préstamos vencidos y multas")
 
         print("0. Cerrar sesión")
         print("=" * 50)
@@ -446,6 +912,8 @@ def menu_principal():
             print("1. Por título")
             print("2. Por autor")
             print("3. Por categoría")
+            print("4. Sugerencias (título o autor)")
+            print("5. Por tema (título, autor y descripción)")
             sub_opcion = input("Seleccione tipo de búsqueda: ")
 
             if sub_opcion == "1":
@@ -457,6 +925,20 @@ def menu_principal():
             elif sub_opcion == "3":
                 termino = input("Ingrese categoría a buscar: ")
                 resultados = biblioteca.buscar_por_categoria(termino)
+            elif sub_opcion == "4":
+                campo = "autor" if input("¿Sugerir (t)ítulos o (a)utores? ").strip().lower() == "a" else "titulo"
+                prefijo = input("Escriba el inicio: ")
+                sugerencias = biblioteca.autocompletar(prefijo, campo)
+                if sugerencias:
+                    print(f"\n💡 Sugerencias para '{prefijo}':")
+                    for i, texto in enumerate(sugerencias, 1):
+                        print(f"{i}. {texto}")
+                else:
+                    print("❌ No hay sugerencias.")
+                continue
+            elif sub_opcion == "5":
+                termino = input("Ingrese el tema a buscar: ")
+                resultados = [libro for libro, _ in biblioteca.buscar_texto(termino)]
             else:
                 print("❌ Opción inválida")
                 continue
@@ -500,10 +982,10 @@ def menu_principal():
 
         elif opcion == "7":
             print("\n📚 LIBROS PRESTADOS")
-            prestados = biblioteca.listar_todos_libros_prestados()
+            prestados = list(biblioteca.prestamos_activos.values())
             if prestados:
-                for i, libro in enumerate(prestados, 1):
-                    print(f"{i}. {libro}")
+                for i, prestamo in enumerate(prestados, 1):
+                    print(f"{i}. {prestamo}")
             else:
                 print("No hay libros prestados actualmente.")
             input("\nPresione Enter para continuar...")
@@ -540,7 +1022,60 @@ def menu_principal():
             biblioteca.listar_usuarios_registrados()
             input("\nPresione Enter para continuar...")
 
+        elif opcion == "12" and biblioteca.usuario_actual.es_admin:
+            print("\n📄 EXPORTAR REPORTE")
+            ruta = input("Archivo de salida (.html o .csv): ").strip() or "reporte_biblioteca.html"
+            biblioteca.exportar_reporte(ruta)
+
+        elif opcion == "13" and biblioteca.usuario_actual.es_admin:
+            print("\n🏆 RANKING DE PRÉSTAMOS")
+            categoria = input("Categoría (Enter para todas): ").strip() or None
+            periodo = input("Período (dia/semana/mes) [mes]: ").strip().lower() or "mes"
+            try:
+                ranking = biblioteca.ranking(categoria, periodo, 20)
+            except ValueError as e:
+                print(f"❌ {e}")
+                continue
+            if ranking:
+                for i, (libro, veces) in enumerate(ranking, 1):
+                    print(f"{i:2d}. {libro.titulo} - {veces} préstamos")
+            else:
+                print("No hay préstamos en este período.")
+            input("\nPresione Enter para continuar...")
+
+        elif opcion == "14" and biblioteca.usuario_actual.es_admin:
+            print("\n🔎 CONSULTAR HISTORIAL (Enter para omitir un filtro)")
+            usuario = input("ID de usuario: ").strip() or None
+            isbn = input("ISBN: ").strip() or None
+            try:
+                desde = input("Desde (AAAA-MM-DD): ").strip()
+                hasta = input("Hasta (AAAA-MM-DD): ").strip()
+                desde = date.fromisoformat(desde) if desde else None
+                hasta = date.fromisoformat(hasta) if hasta else None
+            except ValueError:
+                print("❌ Fecha inválida. Use el formato AAAA-MM-DD.")
+                continue
+            eventos = biblioteca.consultar_historial(usuario, isbn, desde, hasta)
+            if eventos:
+                for i, (fecha, accion, titulo, nombre_usuario) in enumerate(eventos, 1):
+                    print(f"{i}. {fecha} - {nombre_usuario} {accion} '{titulo}'")
+            else:
+                print("No hay eventos con esos filtros.")
+            input("\nPresione Enter para continuar...")
+
+        elif opcion == "15" and biblioteca.usuario_actual.es_admin:
+            print("\n⏰ PRÉSTAMOS VENCIDOS")
+            vencidos = biblioteca.listar_prestamos_vencidos()
+            if vencidos:
+                for i, (prestamo, dias, multa) in enumerate(vencidos, 1):
+                    print(f"{i}. {prestamo} - {dias} día(s) de retraso, multa ${multa:.2f}")
+                print(f"Total en multas: ${sum(multa for _, _, multa in vencidos):.2f}")
+            else:
+                print("No hay préstamos vencidos.")
+            input("\nPresione Enter para continuar...")
+
         elif opcion == "0":
+            biblioteca.cerrar()
             print(f"✅ Sesión cerrada. ¡Hasta pronto, {biblioteca.usuario_actual.nombre}!")
             break
 
@@ -0,0 +1,322 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Almacenamiento
+Descripción: Persistencia de libros, usuarios y préstamos activos en SQLite. Los libros se leen de la
+base de datos recién cuando se consultan, así el inicio no depende del tamaño del catálogo.
+"""
+
+import sqlite3
+import uuid
+from datetime import date
+import weakref
+from collections.abc import MutableMapping
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS libros (
+    isbn TEXT PRIMARY KEY,
+    titulo TEXT NOT NULL,
+    autor TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    año_publicacion,
+    editorial TEXT,
+    descripcion TEXT NOT NULL DEFAULT '',
+    disponible INTEGER NOT NULL DEFAULT 1,
+    veces_prestado INTEGER NOT NULL DEFAULT 0,
+    prestado_a TEXT,
+    prestado_desde INTEGER,
+    vence_el INTEGER
+);
+CREATE INDEX IF NOT EXISTS libros_prestado_a ON libros(prestado_a) WHERE prestado_a IS NOT NULL;
+CREATE INDEX IF NOT EXISTS libros_veces_prestado ON libros(veces_prestado);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id_usuario TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    email TEXT,
+    telefono TEXT,
+    contraseña TEXT NOT NULL,
+    fecha_registro TEXT
+);
+
+-- Préstamos por libro en cada día, semana y mes, por categoría y en total (categoria = '*')
+CREATE TABLE IF NOT EXISTS popularidad (
+    periodo TEXT NOT NULL,
+    cubeta TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    isbn TEXT NOT NULL,
+    veces INTEGER NOT NULL,
+    PRIMARY KEY (periodo, cubeta, categoria, isbn)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS popularidad_ranking ON popularidad(periodo, cubeta, categoria, veces);
+
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+# Contadores de las estadísticas y la consulta que los calcula desde cero
+_CONTADORES = {
+    "total_libros": "SELECT COUNT(*) FROM libros",
+    "libros_prestados": "SELECT COUNT(*) FROM libros WHERE prestado_a IS NOT NULL",
+    # Cada libro cuenta sus préstamos desde siempre (los rankings de popularidad son más recientes)
+    "total_prestamos": "SELECT COALESCE(SUM(veces_prestado), 0) FROM libros",
+}
+
+# Períodos de los rankings de popularidad
+PERIODOS = ("dia", "semana", "mes")
+
+
+def cubeta(periodo, dia):
+    """Nombre de la cubeta del período que contiene el día ("2024-05-20", "2024-S21", "2024-05")"""
+    if periodo == "dia":
+        return dia.isoformat()
+    if periodo == "semana":
+        año, semana, _ = dia.isocalendar()
+        return f"{año}-S{semana:02d}"
+    if periodo == "mes":
+        return f"{dia.year}-{dia.month:02d}"
+    raise ValueError(f"Período '{periodo}' no válido. Use: {', '.join(PERIODOS)}")
+
+
+_COLUMNAS_LIBRO = ("titulo, autor, categoria, isbn, año_publicacion, editorial, descripcion, "
+                   "disponible, veces_prestado")
+
+
+class AlmacenBiblioteca:
+    """
+    Acceso a la base de datos SQLite de la biblioteca.
+    Cada préstamo o devolución se escribe en una sola transacción: el estado del libro,
+    los contadores y los rankings se guardan juntos o no se guarda ninguno.
+    El historial de eventos vive aparte, en la bitácora de préstamos.
+    """
+
+    def __init__(self, archivo="biblioteca.db"):
+        self.archivo = archivo
+        self._conexion = sqlite3.connect(archivo)
+        if archivo != ":memory:":
+            self._conexion.execute("PRAGMA journal_mode=WAL")
+            self._conexion.execute("PRAGMA synchronous=NORMAL")
+        with self._conexion:
+            self._conexion.executescript(_ESQUEMA)
+            # Identificador de esta base de datos y contador de cambios del catálogo
+            self._conexion.execute("INSERT OR IGNORE INTO meta VALUES ('id_catalogo', ?)", (uuid.uuid4().hex,))
+            self._conexion.execute("INSERT OR IGNORE INTO meta VALUES ('version_catalogo', '0')")
+            # Los contadores se calculan una sola vez, al crear la base
+            for clave, consulta in _CONTADORES.items():
+                if self._conexion.execute("SELECT 1 FROM meta WHERE clave = ?", (clave,)).fetchone() is None:
+                    total = self._conexion.execute(consulta).fetchone()[0]
+                    self._conexion.execute("INSERT INTO meta VALUES (?, ?)", (clave, str(total)))
+
+        # Copia en memoria de los contadores: las estadísticas no consultan la base
+        self.contadores = {clave: int(self._meta(clave)) for clave in _CONTADORES}
+
+    def cerrar(self):
+        self._conexion.close()
+
+    def _meta(self, clave):
+        return self._conexion.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()[0]
+
+    def _nueva_version_catalogo(self):
+        """Cuenta un cambio del catálogo (se llama dentro de la transacción del cambio)"""
+        self._conexion.execute("UPDATE meta SET valor = CAST(valor AS INTEGER) + 1 "
+                               "WHERE clave = 'version_catalogo'")
+
+    def _sumar_contadores(self, cambios):
+        """Aplica {contador: incremento} en la transacción en curso"""
+        for clave, incremento in cambios.items():
+            self._conexion.execute("UPDATE meta SET valor = CAST(valor AS INTEGER) + ? WHERE clave = ?",
+                                   (incremento, clave))
+
+    def _confirmar_contadores(self, cambios):
+        """Refleja en memoria los contadores después de confirmar la transacción"""
+        for clave, incremento in cambios.items():
+            self.contadores[clave] += incremento
+
+    def firma_catalogo(self):
+        """Identifica el contenido actual del catálogo sin recorrerlo"""
+        return f"{self._meta('id_catalogo')}:{self._meta('version_catalogo')}"
+
+    # ========== LIBROS ==========
+
+    def contar_libros(self):
+        return self._conexion.execute("SELECT COUNT(*) FROM libros").fetchone()[0]
+
+    def existe_libro(self, isbn):
+        return self._conexion.execute("SELECT 1 FROM libros WHERE isbn = ?", (isbn,)).fetchone() is not None
+
+    def obtener_libro(self, isbn):
+        """Fila del libro (en el orden de _COLUMNAS_LIBRO) o None"""
+        return self._conexion.execute(f"SELECT {_COLUMNAS_LIBRO} FROM libros WHERE isbn = ?",
+                                      (isbn,)).fetchone()
+
+    def iterar_libros(self):
+        """Filas de todos los libros en orden de alta"""
+        return self._conexion.execute(f"SELECT {_COLUMNAS_LIBRO} FROM libros ORDER BY rowid")
+
+    def iterar_isbns(self):
+        return (fila[0] for fila in self._conexion.execute("SELECT isbn FROM libros ORDER BY rowid"))
+
+    def insertar_libros(self, libros):
+        """Guarda libros nuevos en una sola transacción"""
+        with self._conexion:
+            cursor = self._conexion.executemany(
+                f"INSERT INTO libros ({_COLUMNAS_LIBRO}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((libro.titulo, libro.autor, libro.categoria, libro.isbn, libro.año_publicacion,
+                  libro.editorial, libro.descripcion, int(libro.disponible), libro.veces_prestado)
+                 for libro in libros))
+            cambios = {"total_libros": cursor.rowcount}
+            self._sumar_contadores(cambios)
+            self._nueva_version_catalogo()
+        self._confirmar_contadores(cambios)
+
+    def eliminar_libro(self, isbn):
+        """Borra un libro que no esté prestado. Devuelve True si se borró"""
+        with self._conexion:
+            cursor = self._conexion.execute("DELETE FROM libros WHERE isbn = ? AND disponible = 1", (isbn,))
+            if cursor.rowcount != 1:
+                return False
+            self._sumar_contadores({"total_libros": -1})
+            self._nueva_version_catalogo()
+        self._confirmar_contadores({"total_libros": -1})
+        return True
+
+    def mas_prestados(self, limite):
+        """
+        ISBN de los libros con más préstamos, de mayor a menor.
+        El índice sobre veces_prestado se actualiza en O(log n) con cada préstamo,
+        así la consulta lee solo las primeras entradas del índice.
+        """
+        return [fila[0] for fila in self._conexion.execute(
+            "SELECT isbn FROM libros WHERE veces_prestado > 0 ORDER BY veces_prestado DESC LIMIT ?", (limite,))]
+
+    # ========== USUARIOS Y PRÉSTAMOS ==========
+
+    def iterar_usuarios(self):
+        return self._conexion.execute(
+            "SELECT nombre, id_usuario, email, telefono, contraseña, fecha_registro FROM usuarios ORDER BY rowid")
+
+    def insertar_usuario(self, usuario):
+        with self._conexion:
+            self._conexion.execute(
+                "INSERT INTO usuarios VALUES (?, ?, ?, ?, ?, ?)",
+                (usuario.id_usuario, usuario.nombre, usuario.email, usuario.telefono,
+                 usuario.contraseña, usuario.fecha_registro))
+
+    def prestamos_activos(self):
+        """
+        Tuplas (isbn, id_usuario, instante del préstamo, vencimiento) de los libros prestados ahora.
+        """
+        return self._conexion.execute(
+            "SELECT isbn, prestado_a, prestado_desde, vence_el FROM libros "
+            "WHERE prestado_a IS NOT NULL ORDER BY rowid")
+
+    def registrar_prestamo(self, isbn, id_usuario, instante, vence, categoria="*"):
+        """
+        Marca el libro como prestado hasta el vencimiento y suma el préstamo a los rankings
+        del día, la semana y el mes del instante (ambos en segundos desde la época Unix),
+        en una sola transacción.
+        Devuelve False (sin cambiar nada) si el libro ya no estaba disponible.
+        """
+        with self._conexion:
+            cursor = self._conexion.execute(
+                "UPDATE libros SET disponible = 0, veces_prestado = veces_prestado + 1, prestado_a = ?, "
+                "prestado_desde = ?, vence_el = ? WHERE isbn = ? AND disponible = 1",
+                (id_usuario, instante, vence, isbn))
+            if cursor.rowcount != 1:
+                return False
+            dia = date.fromtimestamp(instante)
+            self._conexion.executemany(
+                "INSERT INTO popularidad VALUES (?, ?, ?, ?, 1) "
+                "ON CONFLICT (periodo, cubeta, categoria, isbn) DO UPDATE SET veces = veces + 1",
+                [(periodo, cubeta(periodo, dia), clave, isbn)
+                 for periodo in PERIODOS for clave in {categoria, "*"}])
+            cambios = {"libros_prestados": 1, "total_prestamos": 1}
+            self._sumar_contadores(cambios)
+        self._confirmar_contadores(cambios)
+        return True
+
+    def registrar_devolucion(self, isbn, id_usuario):
+        """Marca el libro como disponible. False si no lo tenía ese usuario"""
+        with self._conexion:
+            cursor = self._conexion.execute(
+                "UPDATE libros SET disponible = 1, prestado_a = NULL, prestado_desde = NULL, vence_el = NULL "
+                "WHERE isbn = ? AND prestado_a = ?",
+                (isbn, id_usuario))
+            if cursor.rowcount != 1:
+                return False
+            self._sumar_contadores({"libros_prestados": -1})
+        self._confirmar_contadores({"libros_prestados": -1})
+        return True
+
+    def ranking(self, periodo, dia, categoria="*", limite=10):
+        """
+        Pares (isbn, veces) más prestados en la cubeta del período que contiene el día.
+        Lee en orden el índice de la cubeta, sin contar los préstamos uno por uno.
+        """
+        return self._conexion.execute(
+            "SELECT p.isbn, p.veces FROM popularidad p JOIN libros l ON l.isbn = p.isbn "
+            "WHERE p.periodo = ? AND p.cubeta = ? AND p.categoria = ? ORDER BY p.veces DESC LIMIT ?",
+            (periodo, cubeta(periodo, dia), categoria, limite)).fetchall()
+
+
+class CatalogoLibros(MutableMapping):
+    """
+    Diccionario {isbn: Libro} respaldado por la base de datos.
+    Cada libro se construye al consultarlo; mientras alguien lo use, el mismo ISBN
+    devuelve el mismo objeto.
+    """
+
+    def __init__(self, almacen, clase_libro):
+        self._almacen = almacen
+        self._clase_libro = clase_libro
+        self._cargados = weakref.WeakValueDictionary()
+
+    def _libro(self, fila):
+        isbn = fila[3]
+        libro = self._cargados.get(isbn)
+        if libro is None:
+            libro = self._clase_libro(*fila[:7])
+            libro.disponible = bool(fila[7])
+            libro.veces_prestado = fila[8]
+            self._cargados[isbn] = libro
+        return libro
+
+    def __getitem__(self, isbn):
+        libro = self._cargados.get(isbn)
+        if libro is not None:
+            return libro
+        fila = self._almacen.obtener_libro(isbn)
+        if fila is None:
+            raise KeyError(isbn)
+        return self._libro(fila)
+
+    def __setitem__(self, isbn, libro):
+        self._almacen.insertar_libros([libro])
+        self._cargados[isbn] = libro
+
+    def __delitem__(self, isbn):
+        if not self._almacen.eliminar_libro(isbn):
+            raise KeyError(isbn)
+        self._cargados.pop(isbn, None)
+
+    def __contains__(self, isbn):
+        return isbn in self._cargados or self._almacen.existe_libro(isbn)
+
+    def __iter__(self):
+        return self._almacen.iterar_isbns()
+
+    def __len__(self):
+        return self._almacen.contadores["total_libros"]
+
+    def values(self):
+        # Una sola consulta en lugar de una por libro
+        return (self._libro(fila) for fila in self._almacen.iterar_libros())
+
+    def items(self):
+        return ((libro.isbn, libro) for libro in self.values())
+
+    def agregar_varios(self, libros):
+        """Guarda muchos libros nuevos en una sola transacción"""
+        self._almacen.insertar_libros(libros)
+        for libro in libros:
+            self._cargados[libro.isbn] = libro
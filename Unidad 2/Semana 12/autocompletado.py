@@ -0,0 +1,203 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Autocompletado
+Descripción: Árbol radix (trie comprimido) de textos plegados. Cada nodo guarda los textos
+más populares de su subárbol, así las sugerencias para un prefijo salen sin recorrer nada más.
+"""
+
+import heapq
+
+from indice_invertido import plegar
+
+
+def _clave(texto):
+    """Clave de búsqueda: texto plegado con los espacios reducidos a uno"""
+    return " ".join(plegar(texto).split())
+
+
+class _Nodo:
+    """Nodo del árbol radix"""
+
+    __slots__ = ("etiqueta", "hijos", "texto", "puntaje", "referencias", "mejores")
+
+    def __init__(self, etiqueta=""):
+        self.etiqueta = etiqueta  # Fragmento de clave de la arista que llega a este nodo
+        self.hijos = {}  # {primer carácter de la etiqueta: _Nodo}
+        self.texto = None  # Texto original si aquí termina una clave
+        self.puntaje = 0  # Popularidad del texto (veces prestado)
+        self.referencias = 0  # Libros que comparten este texto
+        self.mejores = []  # [(-puntaje, clave, texto)] del subárbol, los TOP_K primeros
+
+
+class ArbolRadix:
+    """
+    Árbol radix para autocompletar textos ordenados por popularidad.
+    Un mismo texto puede pertenecer a varios libros: su puntaje es la suma de los de todos.
+    """
+
+    TOP_K = 10  # Sugerencias guardadas en cada nodo
+
+    def __init__(self):
+        self._raiz = _Nodo()
+
+    def __len__(self):
+        return sum(1 for _ in self._recorrer(self._raiz, ""))
+
+    def _camino(self, clave, crear=False):
+        """
+        Devuelve la lista de nodos desde la raíz hasta el nodo de la clave.
+        Con crear=True divide aristas y crea nodos si hace falta; si no, devuelve None
+        cuando la clave no está.
+        """
+        nodo = self._raiz
+        camino = [nodo]
+        resto = clave
+        while resto:
+            hijo = nodo.hijos.get(resto[0])
+            if hijo is None:
+                if not crear:
+                    return None
+                hijo = _Nodo(resto)
+                nodo.hijos[resto[0]] = hijo
+                camino.append(hijo)
+                return camino
+
+            # Longitud del prefijo común entre la etiqueta y lo que queda de la clave
+            etiqueta = hijo.etiqueta
+            comun = 0
+            limite = min(len(etiqueta), len(resto))
+            while comun < limite and etiqueta[comun] == resto[comun]:
+                comun += 1
+
+            if comun < len(etiqueta):
+                if not crear:
+                    return None
+                # Dividir la arista: nodo -> intermedio -> hijo
+                intermedio = _Nodo(etiqueta[:comun])
+                intermedio.mejores = list(hijo.mejores)
+                hijo.etiqueta = etiqueta[comun:]
+                intermedio.hijos[hijo.etiqueta[0]] = hijo
+                nodo.hijos[resto[0]] = intermedio
+                hijo = intermedio
+
+            nodo = hijo
+            camino.append(nodo)
+            resto = resto[comun:]
+        return camino
+
+    def _subir(self, camino, entrada_vieja, entrada_nueva):
+        """Reemplaza la entrada de un texto en las listas de mejores de todo el camino"""
+        for nodo in camino:
+            mejores = nodo.mejores
+            if entrada_vieja in mejores:
+                mejores.remove(entrada_vieja)
+            elif len(mejores) >= self.TOP_K and entrada_nueva > mejores[-1]:
+                continue  # No entra entre los mejores de este nodo
+            mejores.append(entrada_nueva)
+            mejores.sort()
+            del mejores[self.TOP_K:]
+
+    def _recalcular(self, nodo):
+        """Recalcula los mejores de un nodo a partir de su texto y de sus hijos"""
+        candidatos = [entrada for hijo in nodo.hijos.values() for entrada in hijo.mejores]
+        if nodo.texto is not None:
+            candidatos.append((-nodo.puntaje, _clave(nodo.texto), nodo.texto))
+        nodo.mejores = heapq.nsmallest(self.TOP_K, candidatos)
+
+    def insertar(self, texto, puntaje=0):
+        """Agrega un texto (o una referencia más a un texto existente) con su popularidad"""
+        clave = _clave(texto)
+        camino = self._camino(clave, crear=True)
+        nodo = camino[-1]
+        vieja = (-nodo.puntaje, clave, nodo.texto) if nodo.texto is not None else None
+        if nodo.texto is None:
+            nodo.texto = texto
+        nodo.referencias += 1
+        nodo.puntaje += puntaje
+        self._subir(camino, vieja, (-nodo.puntaje, clave, nodo.texto))
+
+    def sumar(self, texto, incremento=1):
+        """Aumenta la popularidad de un texto ya insertado"""
+        clave = _clave(texto)
+        camino = self._camino(clave)
+        if camino is None or camino[-1].texto is None:
+            return
+        nodo = camino[-1]
+        vieja = (-nodo.puntaje, clave, nodo.texto)
+        nodo.puntaje += incremento
+        self._subir(camino, vieja, (-nodo.puntaje, clave, nodo.texto))
+
+    def quitar(self, texto, puntaje=0):
+        """Quita una referencia al texto y su popularidad; el texto desaparece con la última"""
+        clave = _clave(texto)
+        camino = self._camino(clave)
+        if camino is None or camino[-1].texto is None:
+            return
+        nodo = camino[-1]
+        nodo.referencias -= 1
+        nodo.puntaje -= puntaje
+        if nodo.referencias <= 0:
+            nodo.texto = None
+            nodo.puntaje = nodo.referencias = 0
+
+        # Recalcular de abajo hacia arriba y podar los nodos que quedaron sin uso
+        for i in range(len(camino) - 1, -1, -1):
+            actual = camino[i]
+            if i > 0 and actual.texto is None and len(actual.hijos) <= 1:
+                padre = camino[i - 1]
+                if not actual.hijos:
+                    del padre.hijos[actual.etiqueta[0]]
+                    continue
+                # Un solo hijo y sin texto: fusionar la arista con la del hijo
+                (hijo,) = actual.hijos.values()
+                hijo.etiqueta = actual.etiqueta + hijo.etiqueta
+                padre.hijos[hijo.etiqueta[0]] = hijo
+                continue
+            self._recalcular(actual)
+
+    def _recorrer(self, nodo, prefijo):
+        """Genera (clave, nodo) de todos los textos del subárbol"""
+        pila = [(nodo, prefijo)]
+        while pila:
+            actual, clave = pila.pop()
+            if actual.texto is not None:
+                yield clave, actual
+            for hijo in actual.hijos.values():
+                pila.append((hijo, clave + hijo.etiqueta))
+
+    def sugerir(self, prefijo, limite=10):
+        """
+        Devuelve los textos más populares que empiezan con el prefijo.
+
+        Args:
+            prefijo (str): Inicio del texto (sin importar mayúsculas ni tildes)
+            limite (int): Número máximo de sugerencias
+
+        Returns:
+            list: Textos ordenados de mayor a menor popularidad
+        """
+        resto = _clave(prefijo)
+        nodo = self._raiz
+        recorrido = ""
+        while resto:
+            hijo = nodo.hijos.get(resto[0])
+            if hijo is None:
+                return []
+            etiqueta = hijo.etiqueta
+            if len(resto) <= len(etiqueta):
+                # El prefijo termina dentro de esta arista
+                if not etiqueta.startswith(resto):
+                    return []
+                resto = ""
+            elif resto.startswith(etiqueta):
+                resto = resto[len(etiqueta):]
+            else:
+                return []
+            nodo = hijo
+            recorrido += etiqueta
+
+        if limite <= self.TOP_K:
+            return [texto for _, _, texto in nodo.mejores[:limite]]
+
+        # Se piden más sugerencias de las guardadas: recorrer el subárbol
+        entradas = ((-n.puntaje, clave, n.texto) for clave, n in self._recorrer(nodo, recorrido))
+        return [texto for _, _, texto in heapq.nsmallest(limite, entradas)]
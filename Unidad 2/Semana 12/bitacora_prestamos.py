@@ -0,0 +1,267 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Bitácora de préstamos
+Descripción: Historial de préstamos y devoluciones en archivos binarios de solo anexado.
+Cada evento es un registro de ancho fijo (instante, ISBN, usuario, acción); los archivos se
+rotan por tamaño y los más antiguos se archivan en una subcarpeta.
+"""
+
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque, namedtuple
+
+# Acciones del historial: el código que se guarda es la posición en la tupla
+ACCIONES = ("préstamo", "devolución")
+PRESTAMO, DEVOLUCION = range(len(ACCIONES))
+
+LARGO_CLAVE = 20  # Bytes reservados para el ISBN y para el ID de usuario
+_REGISTRO = struct.Struct(f"<q{LARGO_CLAVE}s{LARGO_CLAVE}sB3x")  # 52 bytes por evento
+
+Evento = namedtuple("Evento", "instante isbn id_usuario accion")
+
+
+def cabe_en_bitacora(clave):
+    """Indica si un ISBN o ID de usuario entra en el campo de ancho fijo del registro"""
+    return len(clave.encode('utf-8')) <= LARGO_CLAVE
+
+
+class _IndiceHistorial:
+    """
+    Índices secundarios de la bitácora. Cada evento se identifica por su posición global
+    (0, 1, 2, ... contando desde el primer segmento, archivado o no).
+    """
+
+    def __init__(self):
+        self.segmentos = []  # Números de segmento en orden
+        self.inicios = array('Q')  # Posición global del primer evento de cada segmento
+        self.instantes = array('q')  # Instante de cada evento (no decreciente: se busca con bisect)
+        self.por_usuario = {}  # {id_usuario: array de posiciones}
+        self.por_isbn = {}  # {isbn: array de posiciones}
+
+    def agregar(self, evento):
+        posicion = len(self.instantes)
+        self.instantes.append(evento.instante)
+        self.por_usuario.setdefault(evento.id_usuario, array('Q')).append(posicion)
+        self.por_isbn.setdefault(evento.isbn, array('Q')).append(posicion)
+
+
+def _contiene(ordenada, valor):
+    """Búsqueda binaria de un valor en una secuencia ordenada"""
+    i = bisect_left(ordenada, valor)
+    return i < len(ordenada) and ordenada[i] == valor
+
+
+def _decodificar(datos, posicion=0):
+    instante, isbn, id_usuario, accion = _REGISTRO.unpack_from(datos, posicion)
+    return Evento(instante, isbn.rstrip(b"\0").decode('utf-8'),
+                  id_usuario.rstrip(b"\0").decode('utf-8'), ACCIONES[accion])
+
+
+class BitacoraPrestamos:
+    """
+    Bitácora de eventos de préstamo en segmentos binarios.
+    Los últimos eventos se mantienen también en memoria (cola acotada) para mostrarlos
+    sin leer los archivos.
+    """
+
+    def __init__(self, directorio, registros_por_segmento=100_000, segmentos_activos=10, recientes=100):
+        """
+        Args:
+            directorio (str): Carpeta de los segmentos (se crea si no existe)
+            registros_por_segmento (int): Eventos por archivo antes de rotar
+            segmentos_activos (int): Segmentos que quedan en la carpeta; los anteriores se archivan
+            recientes (int): Eventos que se guardan en memoria
+        """
+        self.directorio = directorio
+        self.carpeta_archivo = os.path.join(directorio, "archivo")
+        self.registros_por_segmento = registros_por_segmento
+        self.segmentos_activos = segmentos_activos
+        self.recientes = deque(maxlen=recientes)
+        os.makedirs(self.carpeta_archivo, exist_ok=True)
+
+        self._segmentos = self._listar(self.directorio)
+        if not self._segmentos:
+            self._segmentos.append(1)
+        self._archivo = None
+        self._abrir_ultimo()
+        self.recientes.extend(self._leer_ultimos(recientes))
+        # Los eventos se guardan en orden: un instante nunca es menor que el anterior
+        self._ultimo_instante = self.recientes[-1].instante if self.recientes else 0
+        self._indice = None  # Índices de consulta, se construyen en la primera consulta
+
+    @staticmethod
+    def _listar(carpeta):
+        """Números de los segmentos de la carpeta, en orden"""
+        return sorted(int(nombre[9:15]) for nombre in os.listdir(carpeta)
+                      if nombre.startswith("segmento_") and nombre.endswith(".bin"))
+
+    def _ruta(self, numero, archivado=False):
+        return os.path.join(self.carpeta_archivo if archivado else self.directorio, f"segmento_{numero:06d}.bin")
+
+    def _abrir_ultimo(self):
+        """Abre el segmento actual para anexar; descarta un registro incompleto al final"""
+        ruta = self._ruta(self._segmentos[-1])
+        self._archivo = open(ruta, 'ab', buffering=0)
+        tamano = self._archivo.tell()
+        sobrante = tamano % _REGISTRO.size
+        if sobrante:
+            self._archivo.truncate(tamano - sobrante)
+            self._archivo.seek(0, os.SEEK_END)
+        self._en_segmento = self._archivo.tell() // _REGISTRO.size
+
+    def _rotar(self):
+        """Empieza un segmento nuevo y archiva los que exceden la política"""
+        self._archivo.close()
+        self._segmentos.append(self._segmentos[-1] + 1)
+        if self._indice is not None:
+            self._indice.segmentos.append(self._segmentos[-1])
+            self._indice.inicios.append(len(self._indice.instantes))
+        while len(self._segmentos) > self.segmentos_activos:
+            numero = self._segmentos.pop(0)
+            os.replace(self._ruta(numero), self._ruta(numero, archivado=True))
+        self._abrir_ultimo()
+
+    def registrar(self, isbn, id_usuario, accion, instante=None):
+        """
+        Anexa un evento al historial.
+
+        Args:
+            isbn (str): ISBN del libro
+            id_usuario (str): ID del usuario
+            accion (int): PRESTAMO o DEVOLUCION
+            instante (int, optional): Segundos desde la época Unix. Default: ahora.
+                Si es anterior al último evento (reloj atrasado) se usa el del último evento
+
+        Returns:
+            Evento: El evento registrado
+        """
+        if instante is None:
+            instante = int(time.time())
+        instante = max(instante, self._ultimo_instante)
+        clave_isbn, clave_usuario = isbn.encode('utf-8'), id_usuario.encode('utf-8')
+        if len(clave_isbn) > LARGO_CLAVE or len(clave_usuario) > LARGO_CLAVE:
+            raise ValueError(f"El ISBN y el ID de usuario no pueden superar {LARGO_CLAVE} bytes")
+
+        if self._en_segmento >= self.registros_por_segmento:
+            self._rotar()
+        self._archivo.write(_REGISTRO.pack(instante, clave_isbn, clave_usuario, accion))
+        self._en_segmento += 1
+
+        evento = Evento(instante, isbn, id_usuario, ACCIONES[accion])
+        self._ultimo_instante = instante
+        self.recientes.append(evento)
+        if self._indice is not None:
+            self._indice.agregar(evento)
+        return evento
+
+    def _leer_segmento(self, ruta):
+        """Eventos de un segmento, en orden"""
+        with open(ruta, 'rb') as f:
+            datos = f.read()
+        completos = len(datos) - len(datos) % _REGISTRO.size
+        for posicion in range(0, completos, _REGISTRO.size):
+            yield _decodificar(datos, posicion)
+
+    def iterar(self, incluir_archivados=False):
+        """Recorre todos los eventos de los segmentos activos (y opcionalmente los archivados)"""
+        rutas = []
+        if incluir_archivados:
+            rutas.extend(self._ruta(n, archivado=True) for n in self._listar(self.carpeta_archivo))
+        rutas.extend(self._ruta(n) for n in self._segmentos)
+        for ruta in rutas:
+            yield from self._leer_segmento(ruta)
+
+    def _leer_ultimos(self, cantidad):
+        """Lee los últimos eventos desde el final de los segmentos activos"""
+        eventos = []
+        for numero in reversed(self._segmentos):
+            if len(eventos) >= cantidad:
+                break
+            with open(self._ruta(numero), 'rb') as f:
+                tamano = os.fstat(f.fileno()).st_size
+                tamano -= tamano % _REGISTRO.size
+                faltan = min(cantidad - len(eventos), tamano // _REGISTRO.size)
+                f.seek(tamano - faltan * _REGISTRO.size)
+                datos = f.read(faltan * _REGISTRO.size)
+            bloque = [_decodificar(datos, p) for p in range(0, len(datos), _REGISTRO.size)]
+            eventos = bloque + eventos
+        return eventos[-cantidad:] if cantidad else []
+
+    def ultimos(self, cantidad=10):
+        """Los últimos eventos, del más antiguo al más reciente"""
+        if cantidad <= len(self.recientes) or len(self.recientes) < self.recientes.maxlen:
+            return list(self.recientes)[-cantidad:] if cantidad else []
+        return self._leer_ultimos(cantidad)
+
+    # ========== CONSULTAS INDEXADAS ==========
+
+    def _construir_indice(self):
+        """Recorre una vez toda la bitácora (incluidos los segmentos archivados)"""
+        indice = _IndiceHistorial()
+        numeros = self._listar(self.carpeta_archivo) + self._segmentos
+        for numero in numeros:
+            indice.segmentos.append(numero)
+            indice.inicios.append(len(indice.instantes))
+            for evento in self._leer_segmento(self._ruta(numero, archivado=numero not in self._segmentos)):
+                indice.agregar(evento)
+        self._indice = indice
+
+    def _leer_posiciones(self, posiciones):
+        """Lee los eventos de las posiciones globales indicadas (en orden creciente)"""
+        indice = self._indice
+        eventos = []
+        archivos = {}
+        try:
+            for posicion in posiciones:
+                i = bisect_right(indice.inicios, posicion) - 1
+                numero = indice.segmentos[i]
+                f = archivos.get(numero)
+                if f is None:
+                    f = archivos[numero] = open(self._ruta(numero, archivado=numero not in self._segmentos), 'rb')
+                f.seek((posicion - indice.inicios[i]) * _REGISTRO.size)
+                eventos.append(_decodificar(f.read(_REGISTRO.size)))
+        finally:
+            for f in archivos.values():
+                f.close()
+        return eventos
+
+    def consultar(self, id_usuario=None, isbn=None, desde=None, hasta=None):
+        """
+        Eventos filtrados por usuario, ISBN y/o rango de instantes (ambos extremos incluidos).
+        El rango se ubica con búsqueda binaria y las posiciones de cada usuario o ISBN ya
+        están en orden, así el costo es O(log n + k) para k eventos encontrados.
+
+        Returns:
+            list: Eventos en orden cronológico
+        """
+        if self._indice is None:
+            self._construir_indice()
+        indice = self._indice
+
+        # Rango de posiciones globales [inicio, fin) dentro del período
+        inicio = 0 if desde is None else bisect_left(indice.instantes, desde)
+        fin = len(indice.instantes) if hasta is None else bisect_right(indice.instantes, hasta)
+
+        listas = []
+        if id_usuario is not None:
+            listas.append(indice.por_usuario.get(id_usuario, array('Q')))
+        if isbn is not None:
+            listas.append(indice.por_isbn.get(isbn, array('Q')))
+        if not listas:
+            return self._leer_posiciones(range(inicio, fin))
+
+        # Recorrer la lista más corta dentro del rango y comprobar la otra con búsqueda binaria
+        listas.sort(key=len)
+        corta = listas[0]
+        posiciones = corta[bisect_left(corta, inicio):bisect_left(corta, fin)]
+        if len(listas) == 2:
+            otra = listas[1]
+            posiciones = [p for p in posiciones if _contiene(otra, p)]
+        return self._leer_posiciones(posiciones)
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
@@ -0,0 +1,267 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Búsqueda de texto
+Descripción: Índice invertido con puntaje BM25 para buscar libros por tema en título, autor y
+descripción. El índice se guarda en disco para no reconstruirlo en cada inicio.
+"""
+
+import heapq
+import math
+import struct
+import sys
+from array import array
+from functools import lru_cache
+
+from indice_invertido import tokenizar
+
+# Palabras demasiado frecuentes en español para distinguir un libro de otro (ya sin tildes)
+PALABRAS_VACIAS = frozenset("""
+a al algo algunas algunos ante antes como con contra cual cuando de del desde donde durante
+e el ella ellas ellos en entre era eran es esa esas ese eso esos esta estas este esto estos
+fue fueron ha han hasta hay la las le les lo los mas me mi mis muy nada ni no nos o os otra
+otras otro otros para pero poco por porque que se sea ser si sin sobre su sus tambien tan
+te tiene tienen todo todos tu tus un una unas uno unos y ya yo
+""".split())
+
+
+@lru_cache(maxsize=65536)
+def raiz(palabra):
+    """
+    Derivación ligera: quita plurales y la vocal final de género para que
+    "novelas", "novela" y "novelo" queden en el mismo término ("novel").
+    """
+    if len(palabra) > 4 and palabra.endswith("es") and palabra[-3] not in "aeiou":
+        palabra = palabra[:-2]
+    elif len(palabra) > 3 and palabra.endswith("s"):
+        palabra = palabra[:-1]
+    if len(palabra) > 4 and palabra[-1] in "aoe":
+        palabra = palabra[:-1]
+    return palabra
+
+
+# Archivo del índice: cabecera (firma del formato, versión, documentos, términos, total de
+# términos) y luego textos con su largo y arreglos en little-endian
+_CABECERA = struct.Struct("<4sIIIQ")
+_LARGO = struct.Struct("<I")
+_MAGICO = b"BM25"
+
+
+def _empaquetar_texto(texto):
+    datos = texto.encode('utf-8')
+    return _LARGO.pack(len(datos)) + datos
+
+
+def _empaquetar_arreglo(arreglo):
+    if sys.byteorder == 'big':
+        arreglo = array(arreglo.typecode, arreglo)
+        arreglo.byteswap()
+    return arreglo.tobytes()
+
+
+class _Lector:
+    """Lee en orden los campos de un archivo del índice ya cargado en memoria"""
+
+    def __init__(self, datos, posicion):
+        self.datos = datos
+        self.posicion = posicion
+
+    def _bytes(self, cantidad):
+        fin = self.posicion + cantidad
+        if fin > len(self.datos):
+            raise ValueError("Archivo del índice incompleto")
+        parte = self.datos[self.posicion:fin]
+        self.posicion = fin
+        return parte
+
+    def entero(self):
+        return _LARGO.unpack(self._bytes(_LARGO.size))[0]
+
+    def texto(self):
+        return self._bytes(self.entero()).decode('utf-8')
+
+    def arreglo(self, tipo, cantidad):
+        arreglo = array(tipo)
+        arreglo.frombytes(self._bytes(cantidad * arreglo.itemsize))
+        if sys.byteorder == 'big':
+            arreglo.byteswap()
+        return arreglo
+
+
+def terminos(texto):
+    """Tokeniza, quita palabras vacías y deriva cada palabra"""
+    return [raiz(palabra) for palabra in tokenizar(texto)
+            if palabra not in PALABRAS_VACIAS and not palabra.isdigit()]
+
+
+class IndiceBM25:
+    """
+    Índice de texto completo con puntaje BM25.
+    Cada término tiene su lista de documentos y frecuencias en arreglos compactos;
+    los documentos quitados se marcan y se descartan al compactar.
+    """
+
+    K1 = 1.2  # Saturación de la frecuencia del término
+    B = 0.75  # Peso de la normalización por largo del documento
+    VERSION_ARCHIVO = 1
+
+    def __init__(self):
+        self.firma = None  # Identifica el estado del catálogo indexado
+        self._claves = []  # {id interno: clave (ISBN)}, None si fue quitado
+        self._ids = {}  # {clave: id interno}
+        self._longitudes = array('I')  # Número de términos de cada documento
+        self._listas = {}  # {término: (array ids, array frecuencias)}
+        self._total_terminos = 0  # Suma de longitudes de los documentos vigentes
+        self._quitados = 0  # Documentos marcados como quitados
+
+    def __len__(self):
+        return len(self._ids)
+
+    def agregar(self, clave, texto):
+        """Indexa un documento (si la clave ya existía, lo reemplaza)"""
+        if clave in self._ids:
+            self.quitar(clave)
+        id_doc = len(self._claves)
+        self._claves.append(clave)
+        self._ids[clave] = id_doc
+
+        frecuencias = {}
+        for termino in terminos(texto):
+            frecuencias[termino] = frecuencias.get(termino, 0) + 1
+        longitud = sum(frecuencias.values())
+        self._longitudes.append(longitud)
+        self._total_terminos += longitud
+
+        # Los ids crecen, así que cada lista queda ordenada al añadir al final
+        for termino, frecuencia in frecuencias.items():
+            lista = self._listas.get(termino)
+            if lista is None:
+                lista = self._listas[termino] = (array('I'), array('H'))
+            lista[0].append(id_doc)
+            lista[1].append(min(frecuencia, 0xFFFF))
+
+    def quitar(self, clave):
+        """Marca el documento como quitado; el espacio se recupera al compactar"""
+        id_doc = self._ids.pop(clave, None)
+        if id_doc is None:
+            return
+        self._claves[id_doc] = None
+        self._total_terminos -= self._longitudes[id_doc]
+        self._quitados += 1
+        if self._quitados > 1000 and self._quitados > len(self._ids):
+            self.compactar()
+
+    def compactar(self):
+        """Renumera los documentos vigentes y elimina de las listas los quitados"""
+        nuevos = array('I', [0]) * len(self._claves)
+        claves, longitudes = [], array('I')
+        for id_doc, clave in enumerate(self._claves):
+            if clave is not None:
+                nuevos[id_doc] = len(claves)
+                claves.append(clave)
+                longitudes.append(self._longitudes[id_doc])
+
+        listas = {}
+        for termino, (ids, frecuencias) in self._listas.items():
+            nuevos_ids, nuevas_frecuencias = array('I'), array('H')
+            for id_doc, frecuencia in zip(ids, frecuencias):
+                if self._claves[id_doc] is not None:
+                    nuevos_ids.append(nuevos[id_doc])
+                    nuevas_frecuencias.append(frecuencia)
+            if nuevos_ids:
+                listas[termino] = (nuevos_ids, nuevas_frecuencias)
+
+        self._claves = claves
+        self._ids = {clave: id_doc for id_doc, clave in enumerate(claves)}
+        self._longitudes = longitudes
+        self._listas = listas
+        self._quitados = 0
+
+    def buscar(self, consulta, limite=10):
+        """
+        Devuelve los documentos más relevantes para la consulta.
+
+        Args:
+            consulta (str): Texto libre
+            limite (int): Número máximo de resultados
+
+        Returns:
+            list: Pares (clave, puntaje) de mayor a menor puntaje
+        """
+        total = len(self._ids)
+        if not total:
+            return []
+        promedio = self._total_terminos / total
+        claves = self._claves
+        longitudes = self._longitudes
+
+        puntajes = {}
+        for termino in set(terminos(consulta)):
+            lista = self._listas.get(termino)
+            if lista is None:
+                continue
+            if self._quitados:
+                vigentes = [(id_doc, f) for id_doc, f in zip(*lista) if claves[id_doc] is not None]
+            else:
+                vigentes = list(zip(*lista))
+            if not vigentes:
+                continue
+            n = len(vigentes)
+            idf = math.log(1 + (total - n + 0.5) / (n + 0.5))
+            for id_doc, frecuencia in vigentes:
+                norma = self.K1 * (1 - self.B + self.B * longitudes[id_doc] / promedio)
+                puntajes[id_doc] = (puntajes.get(id_doc, 0.0)
+                                    + idf * frecuencia * (self.K1 + 1) / (frecuencia + norma))
+
+        mejores = heapq.nlargest(limite, puntajes.items(), key=lambda item: item[1])
+        return [(claves[id_doc], puntaje) for id_doc, puntaje in mejores]
+
+    def guardar(self, ruta):
+        """Guarda el índice (ya compactado) en un archivo binario"""
+        if self._quitados:
+            self.compactar()
+        with open(ruta, 'wb') as f:
+            f.write(_CABECERA.pack(_MAGICO, self.VERSION_ARCHIVO, len(self._claves), len(self._listas),
+                                   self._total_terminos))
+            f.write(_empaquetar_texto(self.firma or ""))
+            f.writelines(_empaquetar_texto(clave) for clave in self._claves)
+            f.write(_empaquetar_arreglo(self._longitudes))
+            for termino, (ids, frecuencias) in self._listas.items():
+                f.write(_empaquetar_texto(termino))
+                f.write(_LARGO.pack(len(ids)))
+                f.write(_empaquetar_arreglo(ids))
+                f.write(_empaquetar_arreglo(frecuencias))
+
+    @classmethod
+    def cargar(cls, ruta, firma):
+        """
+        Carga un índice guardado si corresponde al catálogo actual.
+
+        Returns:
+            IndiceBM25: El índice, o None si no existe, está dañado o la firma no coincide
+        """
+        try:
+            with open(ruta, 'rb') as f:
+                datos = f.read()
+            magico, version, documentos, total_listas, total = _CABECERA.unpack_from(datos)
+            if magico != _MAGICO or version != cls.VERSION_ARCHIVO:
+                return None
+            lector = _Lector(datos, _CABECERA.size)
+            if lector.texto() != firma:
+                return None
+            claves = [lector.texto() for _ in range(documentos)]
+            longitudes = lector.arreglo('I', documentos)
+            listas = {}
+            for _ in range(total_listas):
+                termino = lector.texto()
+                cantidad = lector.entero()
+                listas[termino] = (lector.arreglo('I', cantidad), lector.arreglo('H', cantidad))
+        except (OSError, struct.error, ValueError):
+            return None
+
+        indice = cls()
+        indice.firma = firma
+        indice._claves = claves
+        indice._ids = {clave: id_doc for id_doc, clave in enumerate(claves)}
+        indice._longitudes = longitudes
+        indice._listas = listas
+        indice._total_terminos = total
+        return indice
@@ -0,0 +1,93 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Índice invertido
+Descripción: Índice de palabras (sin tildes ni mayúsculas) para buscar libros por título, autor
+o categoría sin recorrer todo el catálogo.
+"""
+
+import re
+import unicodedata
+
+_PALABRA = re.compile(r"\w+")
+
+
+def plegar(texto):
+    """Normaliza un texto para comparar: minúsculas y sin tildes ("Yánez" -> "yanez")"""
+    texto = texto.casefold()
+    if texto.isascii():
+        return texto  # Sin tildes que quitar
+    descompuesto = unicodedata.normalize('NFKD', texto)
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto):
+    """Devuelve las palabras del texto ya plegado"""
+    return _PALABRA.findall(plegar(texto))
+
+
+class IndiceInvertido:
+    """
+    Índice invertido por campo: para cada palabra guarda el conjunto de claves (ISBN)
+    de los libros que la contienen en ese campo.
+    """
+
+    def __init__(self, campos):
+        # {campo: {palabra: {clave, ...}}}
+        self._listas = {campo: {} for campo in campos}
+        self._orden = {}  # {clave: número} en el orden en que se agregaron (el del catálogo)
+        self._siguiente = 0
+
+    def agregar(self, clave, campo, texto):
+        """Registra las palabras del texto bajo la clave"""
+        if clave not in self._orden:
+            self._orden[clave] = self._siguiente
+            self._siguiente += 1
+        listas = self._listas[campo]
+        for palabra in set(tokenizar(texto)):
+            listas.setdefault(palabra, set()).add(clave)
+
+    def quitar(self, clave, campo, texto):
+        """Quita la clave de las listas de las palabras del texto"""
+        self._orden.pop(clave, None)
+        listas = self._listas[campo]
+        for palabra in set(tokenizar(texto)):
+            claves = listas.get(palabra)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del listas[palabra]
+
+    def ordenar(self, claves):
+        """Devuelve las claves en el orden en que se agregaron al índice"""
+        return sorted(claves, key=self._orden.__getitem__)
+
+    def _claves_con_fragmento(self, campo, fragmento):
+        """Claves de las palabras del vocabulario que contienen el fragmento ("la" -> "las", "salas")"""
+        claves = set()
+        # Se recorre el vocabulario (mucho menor que el catálogo), no los libros
+        for palabra, lista in self._listas[campo].items():
+            if fragmento in palabra:
+                claves |= lista
+        return claves
+
+    def candidatos(self, campo, consulta):
+        """
+        Claves de los libros cuyo campo puede contener la consulta como subcadena.
+        Cada palabra de la consulta está dentro de alguna palabra del campo, así que se
+        juntan las claves de todas las palabras del vocabulario que la contienen y se
+        intersectan esos conjuntos. Quien llama verifica la subcadena completa.
+
+        Returns:
+            set: Claves candidatas, o None si la consulta no tiene palabras
+        """
+        palabras = set(tokenizar(consulta))
+        if not palabras:
+            return None
+
+        # Empezar por la palabra más larga, que suele dejar menos candidatos
+        resultado = None
+        for palabra in sorted(palabras, key=len, reverse=True):
+            claves = self._claves_con_fragmento(campo, palabra)
+            resultado = claves if resultado is None else resultado & claves
+            if not resultado:
+                return set()
+        return resultado
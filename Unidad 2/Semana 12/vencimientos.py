@@ -0,0 +1,118 @@
+"""
+Sistema de Gestión de Biblioteca Digital - Vencimientos
+Descripción: Agenda de fechas de vencimiento de los préstamos en un montículo mínimo.
+Revisar qué venció solo visita las entradas ya vencidas del montículo, sin recorrer todos los
+préstamos, y una revisión periódica en segundo plano avisa de cada préstamo que vence.
+"""
+
+import heapq
+import threading
+import time
+
+SEGUNDOS_POR_DIA = 24 * 60 * 60
+
+
+def dias_de_retraso(vence, ahora):
+    """Días (o fracción de día) transcurridos desde el vencimiento; 0 si aún no vence"""
+    if ahora <= vence:
+        return 0
+    return -(-(ahora - vence) // SEGUNDOS_POR_DIA)
+
+
+class AgendaVencimientos:
+    """
+    Agenda de vencimientos por clave (ISBN).
+    Las entradas canceladas o reprogramadas no se buscan dentro del montículo: se descartan
+    cuando llegan a la cima (borrado perezoso).
+    """
+
+    def __init__(self):
+        self._monticulo = []  # [(vence, clave)] ordenado por vencimiento
+        self._pendientes = {}  # {clave: vence} de los préstamos aún no avisados como vencidos
+        self._avisados = {}  # {clave: vence} de los vencidos que ya devolvió revisar()
+        self._candado = threading.Lock()  # La revisión en segundo plano comparte la agenda
+
+    def __len__(self):
+        return len(self._pendientes) + len(self._avisados)
+
+    def programar(self, clave, vence):
+        """Agenda (o reprograma) el vencimiento de una clave"""
+        with self._candado:
+            self._avisados.pop(clave, None)
+            self._pendientes[clave] = vence
+            heapq.heappush(self._monticulo, (vence, clave))
+
+    def cancelar(self, clave):
+        """Quita la clave de la agenda (su entrada en el montículo se descarta después)"""
+        with self._candado:
+            self._pendientes.pop(clave, None)
+            self._avisados.pop(clave, None)
+
+    def revisar(self, ahora=None):
+        """
+        Saca del montículo las claves cuyo vencimiento ya llegó y las marca como avisadas.
+
+        Args:
+            ahora (int, optional): Segundos desde la época Unix. Default: ahora.
+
+        Returns:
+            list: Pares (vence, clave) que vencieron desde la revisión anterior
+        """
+        if ahora is None:
+            ahora = int(time.time())
+        nuevos = []
+        with self._candado:
+            monticulo = self._monticulo
+            while monticulo and monticulo[0][0] <= ahora:
+                vence, clave = heapq.heappop(monticulo)
+                if self._pendientes.get(clave) != vence:
+                    continue  # Entrada cancelada o reprogramada
+                del self._pendientes[clave]
+                self._avisados[clave] = vence
+                nuevos.append((vence, clave))
+        return nuevos
+
+    def vencidos(self, ahora=None):
+        """
+        Todos los pares (vence, clave) vencidos, del más antiguo al más reciente.
+        No cambia la agenda: los que aún no se avisaron se siguen avisando en revisar().
+        """
+        if ahora is None:
+            ahora = int(time.time())
+        with self._candado:
+            resultado = {clave: vence for clave, vence in self._avisados.items() if vence <= ahora}
+            # Recorrer el montículo como árbol: los hijos de un nodo no vencido tampoco vencieron
+            monticulo = self._monticulo
+            pila = [0] if monticulo else []
+            while pila:
+                i = pila.pop()
+                vence, clave = monticulo[i]
+                if vence > ahora:
+                    continue
+                if self._pendientes.get(clave) == vence:
+                    resultado[clave] = vence  # Una clave reprogramada al mismo vencimiento aparece dos veces
+                pila.extend(hijo for hijo in (2 * i + 1, 2 * i + 2) if hijo < len(monticulo))
+        return sorted((vence, clave) for clave, vence in resultado.items())
+
+
+class RevisionPeriodica:
+    """Hilo en segundo plano que llama a una función cada cierto intervalo hasta detenerlo"""
+
+    def __init__(self, funcion, intervalo=60):
+        self._funcion = funcion
+        self._intervalo = intervalo
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, name="revision-vencimientos", daemon=True)
+
+    def iniciar(self):
+        self._hilo.start()
+
+    def _ejecutar(self):
+        while not self._detener.is_set():
+            self._funcion()
+            self._detener.wait(self._intervalo)
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
@@ -1,30 +1,65 @@
+import bisect
 import tkinter as tk
 from tkinter import ttk, messagebox
-from inventario import Inventario
 from producto import Producto
 
 
 class VentanaProductos:
-    def __init__(self, parent):
+    # Milisegundos de espera tras la última tecla antes de filtrar
+    RETARDO_FILTRO = 250
+
+    # Al reordenar, las filas que se ven se reubican de inmediato y el resto por tandas
+    REUBICACIONES_POR_TANDA = 500
+
+    # Clave de ordenamiento por columna (IDs numéricos antes que alfanuméricos)
+    CLAVES_ORDEN = {
+        'ID': lambda p: (0, int(p.id), '') if str(p.id).isdigit() else (1, 0, str(p.id)),
+        'Nombre': lambda p: p.nombre.lower(),
+        'Cantidad': lambda p: p.cantidad,
+        'Precio': lambda p: p.precio,
+    }
+    TITULOS_COLUMNAS = {'ID': 'ID', 'Nombre': 'Nombre', 'Cantidad': 'Cantidad', 'Precio': 'Precio ($)'}
+
+    def __init__(self, parent, inventario=None):
         self.parent = parent
-        self.inventario = Inventario()
+        # Si la aplicación comparte un inventario se usa ese; si no, se carga uno propio
+        if inventario is None:
+            from inventario import Inventario
+            inventario = Inventario()
+        self.inventario = inventario
+
+        # Estado del filtro incremental
+        self._filtro_pendiente = None  # id del after() programado
+        self._ultima_consulta = None
+        self._ultimos_resultados = None
+        self._filas = []  # iids de todas las filas en orden de inserción
+        self._visibles = set()  # iids de las filas que pasan el filtro actual
+
+        # Ordenamiento: permutación ascendente cacheada por columna [(clave, iid), ...]
+        self._permutaciones = {}
+        self._claves = {}  # columna -> {iid: clave} para ubicar la entrada vieja al modificar
+        self._orden = None  # (columna, descendente)
+        self._reubicacion = None  # (id del after(), filas, siguiente índice) de la tanda pendiente
 
         self.ventana = tk.Toplevel(parent)
         self.ventana.title("Gestión de Productos - Sistema de Inventario")
         self.ventana.geometry("800x600")
         self.ventana.configure(bg='#f0f0f0')
         self.ventana.transient(parent)  # Hacerla dependiente de la principal
-        self.ventana.grab_set()  # Modal
         self.ventana.focus_set()  # Enfocar esta ventana
 
         # Configurar atajos de teclado
-        self.ventana.bind('<Delete>', lambda e: self.eliminar_producto_seleccionado())
-        self.ventana.bind('<d>', lambda e: self.eliminar_producto_seleccionado())
+        self.ventana.bind('<Delete>', self.atajo_eliminar)
+        self.ventana.bind('<d>', self.atajo_eliminar)
         self.ventana.bind('<Escape>', lambda e: self.ventana.destroy())
 
         self.crear_widgets()
         self.actualizar_lista()
 
+        # Recibir los cambios hechos desde cualquier ventana sobre el mismo inventario
+        self.inventario.suscribir(self.on_cambio_inventario)
+        self.ventana.bind('<Destroy>', self.on_destruir)
+
     def crear_widgets(self):
         # Frame principal
         main_frame = ttk.Frame(self.ventana, padding="10")
@@ -79,15 +114,23 @@ class VentanaProductos:
         list_frame = ttk.LabelFrame(main_frame, text="Lista de Productos", padding="10")
         list_frame.grid(row=1, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
 
+        # Campo de búsqueda (filtra mientras se escribe)
+        busqueda_frame = ttk.Frame(list_frame)
+        busqueda_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        ttk.Label(busqueda_frame, text="Buscar:").pack(side=tk.LEFT, padx=(0, 5))
+        self.var_busqueda = tk.StringVar()
+        self.entry_busqueda = ttk.Entry(busqueda_frame, textvariable=self.var_busqueda)
+        self.entry_busqueda.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.var_busqueda.trace_add('write', lambda *args: self.programar_filtro())
+
         # TreeView para mostrar productos
         columns = ('ID', 'Nombre', 'Cantidad', 'Precio')
         self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
 
         # Configurar columnas
-        self.tree.heading('ID', text='ID')
-        self.tree.heading('Nombre', text='Nombre')
-        self.tree.heading('Cantidad', text='Cantidad')
-        self.tree.heading('Precio', text='Precio ($)')
+        for columna, titulo in self.TITULOS_COLUMNAS.items():
+            self.tree.heading(columna, text=titulo,
+                              command=lambda c=columna: self.ordenar_por(c))
 
         self.tree.column('ID', width=80)
         self.tree.column('Nombre', width=150)
@@ -98,8 +141,8 @@ class VentanaProductos:
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
         self.tree.configure(yscrollcommand=scrollbar.set)
 
-        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
 
         # Bind evento de selección
         self.tree.bind('<<TreeviewSelect>>', self.on_seleccion)
@@ -117,7 +160,7 @@ class VentanaProductos:
 
         # Configurar pesos de grid
         list_frame.columnconfigure(0, weight=1)
-        list_frame.rowconfigure(0, weight=1)
+        list_frame.rowconfigure(1, weight=1)
         main_frame.columnconfigure(1, weight=1)
         main_frame.rowconfigure(1, weight=1)
 
@@ -135,7 +178,6 @@ class VentanaProductos:
 
             producto = Producto(id_producto, nombre, cantidad, precio)
             self.inventario.agregar_producto(producto)
-            self.actualizar_lista()
             self.limpiar_formulario()
             messagebox.showinfo("Éxito", "Producto agregado correctamente")
 
@@ -163,7 +205,6 @@ class VentanaProductos:
                 return
 
             self.inventario.modificar_producto(id_actual, nombre, cantidad, precio)
-            self.actualizar_lista()
             self.limpiar_formulario()
             messagebox.showinfo("Éxito", "Producto modificado correctamente")
 
@@ -183,12 +224,17 @@ class VentanaProductos:
             id_producto = self.tree.item(item, 'values')[0]
 
             if self.inventario.eliminar_producto(id_producto):
-                self.actualizar_lista()
                 self.limpiar_formulario()
                 messagebox.showinfo("Éxito", "Producto eliminado correctamente")
             else:
                 messagebox.showerror("Error", "No se pudo eliminar el producto")
 
+    def atajo_eliminar(self, event):
+        # No interceptar la tecla cuando se está escribiendo en un campo de texto
+        if isinstance(event.widget, (tk.Entry, ttk.Entry)):
+            return
+        self.eliminar_producto_seleccionado()
+
     def on_seleccion(self, event):
         seleccion = self.tree.selection()
         if seleccion:
@@ -203,20 +249,230 @@ class VentanaProductos:
             self.entry_precio.delete(0, tk.END)
             self.entry_precio.insert(0, valores[3])
 
+    def on_destruir(self, event):
+        # <Destroy> también llega por cada widget hijo; solo interesa la ventana
+        if event.widget is self.ventana:
+            self.inventario.desuscribir(self.on_cambio_inventario)
+            self._cancelar_reubicacion()
+
+    def on_cambio_inventario(self, evento, producto):
+        # Actualiza solo la fila afectada: sus valores, si pasa el filtro y su lugar en el orden
+        self._completar_reubicacion()
+        iid = str(producto.id)
+
+        if evento == 'eliminado':
+            self.tree.delete(iid)
+            self._filas.remove(iid)
+            self._quitar_de_permutaciones(iid)
+            self._quitar_de_resultados(iid)
+            self._visibles.discard(iid)
+            return
+
+        valores = (producto.id, producto.nombre, producto.cantidad, f"{producto.precio:.2f}")
+        if evento == 'agregado':
+            self.tree.insert('', tk.END, iid=iid, values=valores)
+            self._filas.append(iid)
+            self._visibles.add(iid)
+        else:
+            self.tree.item(iid, values=valores)
+            self._quitar_de_permutaciones(iid)
+        self._insertar_en_permutaciones(iid, producto)
+
+        # Con una búsqueda activa, el producto entra o sale del resultado según coincida
+        if self._ultimos_resultados is not None:
+            self._quitar_de_resultados(iid)
+            if self.inventario.buscar_productos(self._ultima_consulta, [producto]):
+                self._ultimos_resultados.append(producto)
+            else:
+                if iid in self._visibles:
+                    self.tree.detach(iid)
+                    self._visibles.discard(iid)
+                return
+        self._ubicar_fila(iid)
+
+    def _quitar_de_resultados(self, iid):
+        if self._ultimos_resultados is not None:
+            self._ultimos_resultados = [p for p in self._ultimos_resultados if str(p.id) != iid]
+
+    def _ubicar_fila(self, iid):
+        # Coloca la fila justo antes de la siguiente fila visible según el orden actual
+        if self._orden is None:
+            posicion = self._filas.index(iid)
+            posteriores = (self._filas[i] for i in range(posicion + 1, len(self._filas)))
+        else:
+            columna, descendente = self._orden
+            permutacion = self._permutacion(columna)
+            posicion = bisect.bisect_left(permutacion, (self._claves[columna][iid], iid))
+            indices = range(posicion - 1, -1, -1) if descendente else range(posicion + 1, len(permutacion))
+            posteriores = (permutacion[i][1] for i in indices)
+        siguiente = next((fila for fila in posteriores if fila in self._visibles), '')
+
+        if iid in self._visibles:
+            if self.tree.next(iid) == siguiente:
+                return  # Ya está en su lugar
+            self.tree.detach(iid)
+        self._visibles.add(iid)
+        self.tree.move(iid, '', self.tree.index(siguiente) if siguiente else tk.END)
+
     def actualizar_lista(self):
         # Limpiar treeview
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
 
-        # Agregar productos
+        # Agregar productos (el iid de cada fila es el ID del producto)
+        self._filas = []
         productos = self.inventario.obtener_todos_productos()
         for producto in productos:
-            self.tree.insert('', tk.END, values=(
+            iid = str(producto.id)
+            self.tree.insert('', tk.END, iid=iid, values=(
                 producto.id,
                 producto.nombre,
                 producto.cantidad,
                 f"{producto.precio:.2f}"
             ))
+            self._filas.append(iid)
+
+        # Las permutaciones se reconstruyen al volver a ordenar
+        self._permutaciones = {}
+        self._claves = {}
+
+        # Los datos cambiaron: el resultado anterior ya no sirve de base
+        self._ultima_consulta = None
+        self._ultimos_resultados = None
+        self.aplicar_filtro()
+
+    def programar_filtro(self):
+        # Cancela la consulta pendiente (obsoleta) y programa una nueva
+        if self._filtro_pendiente is not None:
+            self.ventana.after_cancel(self._filtro_pendiente)
+        self._filtro_pendiente = self.ventana.after(self.RETARDO_FILTRO, self.aplicar_filtro)
+
+    def aplicar_filtro(self):
+        self._filtro_pendiente = None
+        if not self.ventana.winfo_exists():
+            return
+        consulta = self.var_busqueda.get().strip().lower()
+
+        if consulta == self._ultima_consulta:
+            return
+
+        if not consulta:
+            resultados = None
+        else:
+            # Si la consulta solo extiende la anterior, se filtra sobre el resultado previo
+            candidatos = None
+            if self._ultima_consulta and self._ultimos_resultados is not None \
+                    and consulta.startswith(self._ultima_consulta):
+                candidatos = self._ultimos_resultados
+            resultados = self.inventario.buscar_productos(consulta, candidatos)
+
+        self._ultima_consulta = consulta
+        self._ultimos_resultados = resultados
+        self.mostrar_coincidencias(resultados)
+
+    def ordenar_por(self, columna):
+        # Un segundo clic sobre la misma columna invierte el orden
+        descendente = self._orden == (columna, False)
+        self._orden = (columna, descendente)
+
+        for nombre, titulo in self.TITULOS_COLUMNAS.items():
+            if nombre == columna:
+                titulo += ' ▼' if descendente else ' ▲'
+            self.tree.heading(nombre, text=titulo)
+
+        self.mostrar_coincidencias(self._ultimos_resultados)
+
+    def _permutacion(self, columna):
+        # Se calcula una sola vez por columna y luego se mantiene incrementalmente
+        if columna not in self._permutaciones:
+            clave = self.CLAVES_ORDEN[columna]
+            claves = {}
+            for iid in self._filas:
+                producto = self.inventario.buscar_producto(iid)
+                if producto is not None:
+                    claves[iid] = clave(producto)
+            self._claves[columna] = claves
+            self._permutaciones[columna] = sorted((c, iid) for iid, c in claves.items())
+        return self._permutaciones[columna]
+
+    def _insertar_en_permutaciones(self, iid, producto):
+        for columna, permutacion in self._permutaciones.items():
+            clave = self.CLAVES_ORDEN[columna](producto)
+            self._claves[columna][iid] = clave
+            bisect.insort(permutacion, (clave, iid))
+
+    def _quitar_de_permutaciones(self, iid):
+        for columna, permutacion in self._permutaciones.items():
+            clave = self._claves[columna].pop(iid, None)
+            if clave is None:
+                continue
+            indice = bisect.bisect_left(permutacion, (clave, iid))
+            if indice < len(permutacion) and permutacion[indice][1] == iid:
+                del permutacion[indice]
+
+    def _filas_ordenadas(self):
+        if self._orden is None:
+            return self._filas
+        columna, descendente = self._orden
+        permutacion = self._permutacion(columna)
+        # Descendente reutiliza la misma permutación recorrida al revés
+        entradas = reversed(permutacion) if descendente else permutacion
+        return [iid for _, iid in entradas]
+
+    def mostrar_coincidencias(self, resultados):
+        # Actualiza el Treeview en sitio: oculta (detach) y reubica filas sin recrearlas
+        self._cancelar_reubicacion()
+        filas = self._filas_ordenadas()
+        if resultados is None:
+            visibles = filas
+        else:
+            ids = {str(producto.id) for producto in resultados}
+            visibles = [iid for iid in filas if iid in ids]
+
+        actuales = self.tree.get_children()
+        conjunto_visibles = set(visibles)
+        ocultar = [iid for iid in actuales if iid not in conjunto_visibles]
+        if ocultar:
+            self.tree.detach(*ocultar)
+
+        # Solo se reubican las filas visibles, y únicamente desde la primera fuera de lugar
+        self._visibles = conjunto_visibles
+        restantes = [iid for iid in actuales if iid in conjunto_visibles]
+        inicio = 0
+        while inicio < len(restantes) and restantes[inicio] == visibles[inicio]:
+            inicio += 1
+        if inicio < len(visibles):
+            # Se vuelve al inicio de la lista: basta reubicar ya las filas que caben en
+            # pantalla; las demás se reubican por tandas sin bloquear la ventana
+            self.tree.yview_moveto(0)
+            self._reubicar(visibles, inicio, max(inicio, self._filas_en_pantalla()))
+
+    def _filas_en_pantalla(self):
+        # Filas que caben en el área visible, según el alto del Treeview y el de cada fila
+        alto_fila = ttk.Style().lookup('Treeview', 'rowheight') or 20
+        return max(int(self.tree.cget('height')), self.tree.winfo_height() // int(alto_fila) + 1)
+
+    def _reubicar(self, filas, desde, hasta):
+        # Deja filas[desde:hasta] en su posición; las anteriores ya están en la suya
+        self._reubicacion = None
+        hasta = min(hasta, len(filas))
+        for indice in range(desde, hasta):
+            self.tree.move(filas[indice], '', indice)
+        if hasta < len(filas):
+            id_after = self.ventana.after(
+                1, self._reubicar, filas, hasta, hasta + self.REUBICACIONES_POR_TANDA)
+            self._reubicacion = (id_after, filas, hasta)
+
+    def _completar_reubicacion(self):
+        # Termina de una vez la reubicación pendiente (antes de tocar una fila suelta)
+        if self._reubicacion is not None:
+            _, filas, desde = self._reubicacion
+            self._cancelar_reubicacion()
+            self._reubicar(filas, desde, len(filas))
+
+    def _cancelar_reubicacion(self):
+        if self._reubicacion is not None:
+            self.ventana.after_cancel(self._reubicacion[0])
+            self._reubicacion = None
 
     def limpiar_formulario(self):
         self.entry_id.delete(0, tk.END)
@@ -1,24 +1,52 @@
-import json
 import os
 from producto import Producto
 
 
 class Inventario:
     def __init__(self, archivo='inventario.json'):
-        self._productos = {}
+        self._datos = None  # {id: Producto}, se carga del archivo en el primer acceso
         self._archivo = archivo
-        self.cargar_desde_archivo()
+        self._observadores = []  # Funciones avisadas en cada cambio: f(evento, producto)
+        # Índice de búsqueda: una línea "id\0nombre" en minúsculas por producto, en el orden del
+        # diccionario; unidas en un solo texto, str.find busca sin recorrer los productos en Python
+        self._lineas = None  # Se arma en la primera búsqueda ('' en la posición de un eliminado)
+        self._en_posicion = []  # Producto de cada línea
+        self._posiciones = {}  # {id: posición de su línea}
+        self._bloque = None  # Texto unido; se rearma en la búsqueda siguiente a un cambio
+
+    @property
+    def _productos(self):
+        if self._datos is None:
+            self.cargar_desde_archivo()
+        return self._datos
+
+    def suscribir(self, observador):
+        if observador not in self._observadores:
+            self._observadores.append(observador)
+
+    def desuscribir(self, observador):
+        if observador in self._observadores:
+            self._observadores.remove(observador)
+
+    def _notificar(self, evento, producto):
+        # evento: 'agregado', 'modificado' o 'eliminado'
+        for observador in list(self._observadores):
+            observador(evento, producto)
 
     def agregar_producto(self, producto):
         if producto.id in self._productos:
             raise ValueError(f"El producto con ID {producto.id} ya existe")
         self._productos[producto.id] = producto
+        self._indexar(producto)
         self.guardar_en_archivo()
+        self._notificar('agregado', producto)
 
     def eliminar_producto(self, id_producto):
         if id_producto in self._productos:
-            del self._productos[id_producto]
+            producto = self._productos.pop(id_producto)
+            self._desindexar(producto)
             self.guardar_en_archivo()
+            self._notificar('eliminado', producto)
             return True
         return False
 
@@ -34,7 +62,11 @@ class Inventario:
         if precio is not None:
             producto.precio = precio
 
+        if self._lineas is not None:
+            self._lineas[self._posiciones[id_producto]] = self._linea(producto)
+            self._bloque = None
         self.guardar_en_archivo()
+        self._notificar('modificado', producto)
         return producto
 
     def buscar_producto(self, id_producto):
@@ -43,7 +75,67 @@ class Inventario:
     def obtener_todos_productos(self):
         return list(self._productos.values())
 
+    def buscar_productos(self, texto, candidatos=None):
+        # Coincidencia parcial por ID o nombre; si se pasan candidatos se filtra solo sobre ellos
+        texto = texto.strip().lower()
+        productos = self._productos
+        if candidatos is None:
+            candidatos = productos.values()
+        if not texto:
+            return list(candidatos)
+        # Pocos candidatos se filtran directo; muchos, con el índice (da el mismo resultado, en el mismo orden)
+        if len(candidatos) * 8 > len(productos) and '\n' not in texto and '\0' not in texto:
+            bloque = self._bloque_busqueda()
+            # Si coincide más de la mitad, ubicarlas una por una cuesta más que recorrer los productos
+            if bloque.count(texto) * 2 <= len(productos):
+                return self._buscar_en_bloque(bloque, texto)
+        return [producto for producto in candidatos
+                if texto in producto.nombre.lower() or texto in str(producto.id).lower()]
+
+    def _linea(self, producto):
+        return f"{producto.id}\0{producto.nombre}".lower().replace('\n', '\0')
+
+    def _indexar(self, producto):
+        if self._lineas is not None:
+            self._posiciones[producto.id] = len(self._lineas)
+            self._lineas.append(self._linea(producto))
+            self._en_posicion.append(producto)
+            self._bloque = None
+
+    def _desindexar(self, producto):
+        if self._lineas is not None:
+            posicion = self._posiciones.pop(producto.id)
+            self._lineas[posicion] = ''
+            self._en_posicion[posicion] = None
+            self._bloque = None
+            if len(self._posiciones) * 2 < len(self._lineas):
+                self._lineas = None  # Muchas líneas vacías: se rearma en la próxima búsqueda
+
+    def _bloque_busqueda(self):
+        if self._lineas is None:
+            self._en_posicion = list(self._productos.values())
+            self._lineas = [self._linea(producto) for producto in self._en_posicion]
+            self._posiciones = {producto.id: i for i, producto in enumerate(self._en_posicion)}
+            self._bloque = None
+        if self._bloque is None:
+            self._bloque = '\n'.join(self._lineas) + '\n'
+        return self._bloque
+
+    def _buscar_en_bloque(self, bloque, texto):
+        resultados = []
+        posicion = linea = inicio_linea = 0
+        while True:
+            encontrado = bloque.find(texto, posicion)
+            if encontrado < 0:
+                return resultados
+            linea += bloque.count('\n', inicio_linea, encontrado)
+            resultados.append(self._en_posicion[linea])
+            # Sigue en la línea siguiente: cada producto aparece una sola vez
+            posicion = inicio_linea = bloque.index('\n', encontrado) + 1
+            linea += 1
+
     def guardar_en_archivo(self):
+        import json
         try:
             datos = {id: producto.to_dict() for id, producto in self._productos.items()}
             with open(self._archivo, 'w') as archivo:
@@ -52,12 +144,15 @@ class Inventario:
             print(f"Error al guardar en archivo: {e}")
 
     def cargar_desde_archivo(self):
+        import json
+        self._datos = {}
+        self._lineas = None
         try:
             if os.path.exists(self._archivo):
                 with open(self._archivo, 'r') as archivo:
                     datos = json.load(archivo)
-                    self._productos = {id: Producto.from_dict(producto_data)
-                                       for id, producto_data in datos.items()}
+                    self._datos = {id: Producto.from_dict(producto_data)
+                                   for id, producto_data in datos.items()}
         except Exception as e:
             print(f"Error al cargar desde archivo: {e}")
-            self._productos = {}
\ No newline at end of file
+            self._datos = {}
\ No newline at end of file
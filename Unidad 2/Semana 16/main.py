@@ -1,15 +1,40 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
-from gui_inventario import VentanaProductos
+import sys
+import time
+
+# tkinter se importa al crear la ventana principal, messagebox al salir y
+# gui_inventario e inventario al abrir "Gestionar Productos"
+tk = ttk = None
+
+# --perfil-arranque: muestra en consola cuánto tarda cada etapa del arranque
+PERFIL_ARRANQUE = '--perfil-arranque' in sys.argv[1:]
+
+
+def mostrar_tiempo(etapa, segundos):
+    if PERFIL_ARRANQUE:
+        print(f"{etapa:<35} {segundos * 1000:8.2f} ms")
+
+
+def importar_tk():
+    global tk, ttk
+    if tk is None:
+        inicio = time.perf_counter()
+        import tkinter
+        from tkinter import ttk as modulo_ttk
+        tk, ttk = tkinter, modulo_ttk
+        mostrar_tiempo("Importación de tkinter", time.perf_counter() - inicio)
 
 
 class SistemaInventario:
     def __init__(self):
+        importar_tk()
         self.root = tk.Tk()
         self.root.title("Sistema de Gestión de Inventario - UEA")
         self.root.geometry("600x400")
         self.root.configure(bg='#2c3e50')
 
+        # Inventario compartido por todas las ventanas; se carga al abrir la primera
+        self._inventario = None
+
         # Configurar atajo de teclado para salir
         self.root.bind('<Escape>', lambda e: self.salir())
 
@@ -74,10 +99,21 @@ class SistemaInventario:
         style = ttk.Style()
         style.configure('Accent.TButton', font=('Arial', 12, 'bold'))
 
+    @property
+    def inventario(self):
+        if self._inventario is None:
+            inicio = time.perf_counter()
+            from inventario import Inventario
+            self._inventario = Inventario()
+            mostrar_tiempo("Carga del inventario", time.perf_counter() - inicio)
+        return self._inventario
+
     def abrir_gestion_productos(self):
-        VentanaProductos(self.root)
+        from gui_inventario import VentanaProductos
+        VentanaProductos(self.root, self.inventario)
 
     def salir(self):
+        from tkinter import messagebox
         if messagebox.askyesno("Salir", "¿Está seguro de que desea salir del sistema?"):
             self.root.quit()
 
@@ -86,5 +122,7 @@ class SistemaInventario:
 
 
 if __name__ == "__main__":
+    inicio = time.perf_counter()
     app = SistemaInventario()
+    mostrar_tiempo("Creación de la ventana principal", time.perf_counter() - inicio)
     app.ejecutar()
\ No newline at end of file